@@ -0,0 +1,123 @@
+"""
+Page latency of the async views (RPCs fanned out with asyncio.gather)
+against the same RPCs awaited one after the other, as the sync views did.
+
+Needs the gRPC server running and a staff account. The catalogue replica
+is disabled so that every search is a real SearchBooks RPC. Pages are
+requested through django's AsyncClient, i.e. the ASGI handler of
+client_web/asgi.py.
+
+The RPC phase can add `rtt_ms` of simulated network round trip to each
+call (client interceptor), as with a server in another zone: sequential
+calls pay it once per RPC, gathered calls once per page.
+
+Usage: python benchmarks/async_views_benchmark.py <username> <password> [rounds] [query] [rtt_ms]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CLIENT_DIR)
+os.chdir(CLIENT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'client_web.settings')
+
+import django
+import grpc
+from django.conf import settings
+
+django.setup()
+settings.GRPC_INVENTORY_REPLICA = False
+
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment
+
+import library_pb2_grpc
+from client_app.grpc_aio_client import AsyncLibraryClient
+from client_app.grpc_client import SERVER_ADDRESS
+
+
+class UnaryRoundTripDelay(grpc.aio.UnaryUnaryClientInterceptor):
+    def __init__(self, rtt_ms):
+        self.delay = rtt_ms / 1000
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        await asyncio.sleep(self.delay)
+        return await continuation(client_call_details, request)
+
+
+# grpc.aio files each interceptor under a single call type: one class per type.
+class StreamRoundTripDelay(grpc.aio.UnaryStreamClientInterceptor):
+    def __init__(self, rtt_ms):
+        self.delay = rtt_ms / 1000
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        await asyncio.sleep(self.delay)
+        return await continuation(client_call_details, request)
+
+
+def timed(samples):
+    return f"p50 {statistics.median(samples):7.1f} ms   max {max(samples):7.1f} ms"
+
+
+async def rpc_phase(rounds, query, rtt_ms):
+    """The RPCs of issue_book_view and dashboard, sequential then concurrent."""
+    client = AsyncLibraryClient()
+    if rtt_ms:
+        channel = grpc.aio.insecure_channel(SERVER_ADDRESS, interceptors=[
+            UnaryRoundTripDelay(rtt_ms), StreamRoundTripDelay(rtt_ms),
+        ])
+        client.stub = library_pb2_grpc.LibraryServiceStub(channel)
+    pages = {
+        'issue_book': lambda: (client.get_all_members(), client.search_books("")),
+        'dashboard': lambda: (client.search_books(""), client.search_books(query)),
+    }
+    for page, calls in pages.items():
+        sequential, concurrent = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for call in calls():
+                await call
+            sequential.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            await asyncio.gather(*calls())
+            concurrent.append((time.perf_counter() - start) * 1000)
+        print(f"{page:<11} RPCs  sequential {timed(sequential)}")
+        print(f"{'':<11} RPCs  gather     {timed(concurrent)}")
+
+
+async def page_phase(cookies, rounds, query):
+    client = AsyncClient()
+    client.cookies = cookies
+    for url in ('/members/issue-book/', f'/dashboard/?q={query}'):
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = await client.get(url)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.status_code
+        print(f"page {url:<24} {timed(samples)}")
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    username, password = sys.argv[1:3]
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    query = sys.argv[4] if len(sys.argv) > 4 else "a"
+    rtt_ms = float(sys.argv[5]) if len(sys.argv) > 5 else 0
+
+    setup_test_environment()
+    login = Client()
+    response = login.post('/login/', {'username': username, 'password': password})
+    if response.status_code != 302 or not response.url.endswith('/dashboard/'):
+        sys.exit("Login refused.")
+
+    asyncio.run(rpc_phase(rounds, query, rtt_ms))
+    asyncio.run(page_phase(login.cookies, rounds, query))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Latency of BatchGetBooks / BatchGetMembers against the same lookups made
+as N sequential GetBook / GetMemberDetail calls, as the loan and member
+pages did before.
+
+Needs the gRPC server running. The keys are the ids of the first `n` books
+and members returned by SearchBooks / GetAllMembers, plus one unknown id to
+check the not-found entries. The client-side read cache is bypassed (the
+stubs are called directly) so that every lookup is a real RPC.
+
+Each call can pay `rtt_ms` of simulated network round trip (client
+interceptor), as with a server in another zone: N sequential calls pay it
+N times, a batch call once.
+
+Usage: python benchmarks/batch_get_benchmark.py [n] [rounds] [rtt_ms]
+"""
+import os
+import statistics
+import sys
+import time
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CLIENT_DIR)
+os.chdir(CLIENT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'client_web.settings')
+
+import django
+import grpc
+
+django.setup()
+
+import library_pb2
+import library_pb2_grpc
+from client_app.grpc_client import SERVER_ADDRESS, batch_get_request, batch_results
+
+UNKNOWN_ID = '999999999'
+
+
+class RoundTripDelay(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    def __init__(self, rtt_ms):
+        self.delay = rtt_ms / 1000
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        time.sleep(self.delay)
+        return continuation(client_call_details, request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        time.sleep(self.delay)
+        return continuation(client_call_details, request)
+
+
+def timed(samples):
+    return f"p50 {statistics.median(samples):8.1f} ms   max {max(samples):8.1f} ms"
+
+
+def found_or_none(call):
+    try:
+        return call()
+    except grpc.RpcError as e:
+        if e.code() != grpc.StatusCode.NOT_FOUND:
+            raise
+        return None
+
+
+def compare(label, rounds, sequential_call, batch_call):
+    sequential, batched = [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        one_by_one = sequential_call()
+        sequential.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        in_batch = batch_call()
+        batched.append((time.perf_counter() - start) * 1000)
+        assert one_by_one == in_batch, f"{label}: batch results differ from the sequential calls"
+    print(f"{label:<8} sequential {timed(sequential)}")
+    print(f"{'':<8} batch      {timed(batched)}   x{statistics.median(sequential) / statistics.median(batched):.1f}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rtt_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    interceptors = [RoundTripDelay(rtt_ms)] if rtt_ms else []
+    channel = grpc.intercept_channel(grpc.insecure_channel(SERVER_ADDRESS), *interceptors)
+    stub = library_pb2_grpc.LibraryServiceStub(channel)
+
+    book_ids = [str(book.id) for _, book in zip(range(n), stub.SearchBooks(library_pb2.SearchRequest(query="")))]
+    members = stub.GetAllMembers(library_pb2.MemberSearchRequest(page_size=n))
+    member_ids = [member.id for member in members]
+    if not book_ids or not member_ids:
+        sys.exit("No books or members on the server.")
+    book_ids.append(UNKNOWN_ID)
+    member_ids.append(UNKNOWN_ID)
+
+    def get_book(book_id):
+        return found_or_none(lambda: stub.GetBook(library_pb2.SearchRequest(query=book_id), timeout=5))
+
+    def get_member(member_id):
+        return found_or_none(lambda: stub.GetMemberDetail(library_pb2.UserIdRequest(user_id=member_id), timeout=5))
+
+    print(f"{len(book_ids)} books, {len(member_ids)} members per lookup, {rounds} rounds, rtt {rtt_ms:g} ms")
+    compare(
+        'books', rounds,
+        lambda: [get_book(book_id) for book_id in book_ids],
+        lambda: batch_results(stub.BatchGetBooks(batch_get_request(book_ids), timeout=5), 'book'),
+    )
+    compare(
+        'members', rounds,
+        lambda: [get_member(member_id) for member_id in member_ids],
+        lambda: batch_results(stub.BatchGetMembers(batch_get_request(member_ids), timeout=5), 'member'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Checks client-side load balancing: starts three gRPC server processes
+(ports 50061 to 50063) and points a LibraryClient at all of them through
+GRPC_SERVER_TARGETS.
+
+  1. calls are spread over the three servers (round_robin);
+  2. after SIGTERM, server 3 reports NOT_SERVING on the health service while
+     it drains: it must receive no call although it is still running;
+  3. after server 2 is killed, every call must still succeed, on server 1.
+
+Each server is recognised by the epoch of its GetDataVersion answer. The
+servers use the settings module in SERVER_SETTINGS_MODULE
+(library_server.settings by default) and the same database. Exits with
+status 1 on failure.
+
+Usage: python check_load_balancing.py [calls]
+"""
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+CLIENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.join(os.path.dirname(CLIENT_DIR), 'server')
+sys.path.insert(0, CLIENT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'client_web.settings')
+
+import django
+import grpc
+from django.conf import settings
+
+django.setup()
+
+import library_pb2
+import library_pb2_grpc
+from client_app.grpc_client import LibraryClient
+
+PORTS = (50061, 50062, 50063)
+
+
+def start_server(port):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('SERVER_SETTINGS_MODULE', 'library_server.settings'))
+    return subprocess.Popen(
+        [sys.executable, 'grpc_handler.py', '--port', str(port)],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def server_epoch(port, timeout=60):
+    """Waits for the server on `port` and returns its epoch."""
+    with grpc.insecure_channel(f'localhost:{port}') as channel:
+        stub = library_pb2_grpc.LibraryServiceStub(channel)
+        return stub.GetDataVersion(library_pb2.DataVersionRequest(), wait_for_ready=True, timeout=timeout).epoch
+
+
+def spread(client, ports_by_epoch, calls):
+    """Makes `calls` GetDataVersion calls; returns (Counter of ports, number of errors)."""
+    served, errors = Counter(), 0
+    for _ in range(calls):
+        try:
+            response = client.stub.GetDataVersion(library_pb2.DataVersionRequest(), timeout=5)
+            served[ports_by_epoch[response.epoch]] += 1
+        except grpc.RpcError:
+            errors += 1
+    return served, errors
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    settings.GRPC_SERVER_TARGETS = [f'localhost:{port}' for port in PORTS]
+    settings.GRPC_INVENTORY_REPLICA = False
+    failures = []
+
+    def check(label, ok, served, errors):
+        print(f"{label:<34} {dict(sorted(served.items()))}  errors: {errors}  {'OK' if ok else 'FAIL'}")
+        if not ok:
+            failures.append(label)
+
+    servers = {port: start_server(port) for port in PORTS}
+    try:
+        ports_by_epoch = {server_epoch(port): port for port in PORTS}
+        client = LibraryClient()
+        # Premier appel : la connexion aux trois serveurs et leur health check.
+        client.stub.GetDataVersion(library_pb2.DataVersionRequest(), wait_for_ready=True, timeout=10)
+        time.sleep(1)
+
+        served, errors = spread(client, ports_by_epoch, calls)
+        check("three servers", set(served) == set(PORTS) and min(served.values()) >= calls // 6 and not errors,
+              served, errors)
+
+        servers[PORTS[2]].terminate()
+        time.sleep(1)
+        served, errors = spread(client, ports_by_epoch, calls)
+        draining = servers[PORTS[2]].poll() is None
+        check("server 3 draining (NOT_SERVING)", draining and PORTS[2] not in served and not errors, served, errors)
+
+        servers[PORTS[1]].kill()
+        servers[PORTS[1]].wait()
+        served, errors = spread(client, ports_by_epoch, calls)
+        check("server 2 killed", set(served) == {PORTS[0]} and not errors, served, errors)
+    finally:
+        for server in servers.values():
+            server.kill()
+            server.wait()
+
+    if failures:
+        sys.exit(f"FAIL: {', '.join(failures)}")
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
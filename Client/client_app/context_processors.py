@@ -1,5 +1,18 @@
+from .resilience import read_status
+
+
 def global_images(request):
     return {
         'logo_image': "book_covers/ismac_logo.png",
         'bg_image': "book_covers/Background.jpg"
-    }
\ No newline at end of file
+    }
+
+
+def grpc_read_status(request):
+    """Expose whether the page was rendered from stale or missing server data."""
+    status = read_status()
+    return {
+        'serving_stale_data': bool(status and status['state'] == 'stale'),
+        'stale_data_age': int(status['age']) if status and status['age'] is not None else None,
+        'server_unavailable': bool(status and status['state'] == 'unavailable'),
+    }
@@ -0,0 +1,122 @@
+# In Client/client_app/fragment_cache.py
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# ----------------------------------------------------
+# Versioned fragment cache for the list pages
+# ----------------------------------------------------
+
+# NOTE: grpc_client et resilience (qui importent grpc) sont importés dans les
+# fonctions, comme dans views.py.
+
+# Stands for the CSRF token in cached fragments: each request gets its own.
+CSRF_PLACEHOLDER = 'csrf-token-placeholder'
+
+
+def request_data_versions(request):
+    """GetDataVersion response for this request (at most one RPC per request), or None."""
+    if not hasattr(request, '_data_versions'):
+        from .grpc_client import LibraryClient
+        request._data_versions = LibraryClient().get_data_version()
+    return request._data_versions
+
+
+async def arequest_data_versions(request):
+    """request_data_versions for async views (grpc.aio client)."""
+    if not hasattr(request, '_data_versions'):
+        from .grpc_aio_client import AsyncLibraryClient
+        request._data_versions = await AsyncLibraryClient().get_data_version()
+    return request._data_versions
+
+
+def data_version(versions, data_set):
+    """
+    Cache key part for `data_set` ('catalogue', 'members', 'users', 'loans')
+    from a GetDataVersion response, or None when the server did not answer.
+    """
+    if versions is None:
+        return None
+    return f"{versions.epoch}.{getattr(versions, data_set)}"
+
+
+def cached_for_version(name, version, build):
+    """
+    Returns `build()`, cached under (`name`, `version`). Nothing is cached
+    when `version` is None or when the data came from the stale read cache.
+    """
+    from .resilience import read_status
+    key = f"versioned:{name}:{version}"
+    value = cache.get(key) if version else None
+    if value is None:
+        value = build()
+        if version and read_status() is None:
+            cache.set(key, value, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 600))
+    return value
+
+
+def render_fragment(request, name, version, template_name, get_context):
+    """
+    Returns the rendering of `template_name`, cached under (`name`, `version`).
+
+    `get_context()` is only called on a cache miss, so a hit costs no RPC
+    beyond the version check. The fragment must not contain anything specific
+    to the staff member apart from {% csrf_token %}.
+    """
+    def render():
+        context = get_context()
+        context['csrf_token'] = CSRF_PLACEHOLDER
+        return render_to_string(template_name, context)
+
+    html = cached_for_version(f"fragment:{name}", version, render)
+    return mark_safe(html.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+
+# ----------------------------------------------------
+# Conditional GET (ETag)
+# ----------------------------------------------------
+
+def versioned_etag(request, data_sets, *parts):
+    """
+    Strong ETag for a response that only depends on the versions of
+    `data_sets` and on `parts` (query string, staff id...), or None when the
+    server did not give its versions. Used with django's @condition.
+    """
+    from .resilience import read_status
+    if read_status() is not None:
+        return None
+    return etag_for(request_data_versions(request), data_sets, *parts)
+
+
+def drop_stale_etag(response):
+    """
+    Removes the ETag of a response rendered (even partly) from the stale read
+    cache, like cached_for_version: the browser would otherwise revalidate it
+    into a 304 and keep the stale page once the server is back.
+    """
+    from .resilience import read_status
+    if read_status() is not None and response.has_header('ETag'):
+        del response.headers['ETag']
+    return response
+
+
+def fresh_etag_only(view):
+    """Decorator of a sync view, above @condition: see drop_stale_etag."""
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        return drop_stale_etag(view(request, *args, **kwargs))
+    return inner
+
+
+def etag_for(versions, data_sets, *parts):
+    """ETag from a GetDataVersion response (see versioned_etag)."""
+    if versions is None:
+        return None
+    key = [versions.epoch, *(str(getattr(versions, name)) for name in data_sets), *map(str, parts)]
+    return hashlib.sha1('|'.join(key).encode()).hexdigest()
@@ -0,0 +1,172 @@
+# In Client/client_app/grpc_aio_client.py
+
+import asyncio
+import weakref
+
+import grpc
+from django.conf import settings
+
+import library_pb2
+import library_pb2_grpc
+
+from .grpc_client import (
+    STREAMING_METHODS, ClientOptions, batch_get_request, batch_results, load_balanced,
+    member_search_request, server_target,
+    shared_breaker, shared_inventory_replica, shared_read_cache,
+)
+from .resilience import CircuitBreaker, mark_stale, mark_unavailable
+
+# ----------------------------------------------------
+# grpc.aio client for the async views
+# ----------------------------------------------------
+
+# grpc.aio channels belong to the event loop that created them: one channel
+# per loop (a single one under ASGI).
+_channels = weakref.WeakKeyDictionary()
+
+
+def _loop_channel(options):
+    loop = asyncio.get_running_loop()
+    channel = _channels.get(loop)
+    if channel is None:
+        channel = grpc.aio.insecure_channel(
+            server_target(), compression=options.compression, options=options.channel_options(),
+        )
+        _channels[loop] = channel
+    return channel
+
+
+class AsyncLibraryClient(ClientOptions):
+    """
+    Async counterpart of LibraryClient for the read RPCs that the async
+    views fan out with asyncio.gather, plus borrow/return.
+
+    Calls go through the same circuit breaker, deadlines, compression and
+    retry policy as LibraryClient. Reads fill the shared read cache, and
+    fall back to it (stale banner) when the server fails; there is no
+    hedging and no background refresh. Must be created inside a coroutine.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_cache = shared_read_cache()
+        self.inventory_replica = shared_inventory_replica()
+        self.breaker = shared_breaker(server_target())
+        self.stub = library_pb2_grpc.LibraryServiceStub(_loop_channel(self))
+
+    async def _call(self, method, request):
+        """Unary or streaming (drained into a list) call through the circuit breaker."""
+        self.breaker.before_call()
+        try:
+            call = getattr(self.stub, method)(request, **self._call_options(method, request))
+            if method in STREAMING_METHODS:
+                result = [message async for message in call]
+            else:
+                result = await call
+        except grpc.RpcError as e:
+            self.breaker.record(e)
+            raise
+        except Exception:
+            self.breaker.record()
+            raise
+        except BaseException:
+            # asyncio.CancelledError : la vue ou la requête a été abandonnée.
+            self.breaker.abandon()
+            raise
+        self.breaker.record()
+        return result
+
+    async def _read(self, method, request, key=''):
+        """Read RPC; on server failure, the cached response of LibraryClient's read cache."""
+        cache_key = (method, key)
+        try:
+            result = await self._call(method, request)
+        except grpc.RpcError as e:
+            cached = self.read_cache.get(cache_key)
+            if e.code() not in CircuitBreaker.FAILURE_CODES:
+                raise
+            if cached is None:
+                mark_unavailable()
+                raise
+            value, age = cached
+            mark_stale(age)
+            return value
+        self.read_cache.put(cache_key, result)
+        return result
+
+    # --- Reads ---
+    async def search_books(self, query):
+        if self.inventory_replica is not None and self.inventory_replica.ready:
+            books = self.inventory_replica.books(query)
+            # Sans correspondance exacte, SearchBooks tente la recherche tolérante aux fautes.
+            if books or not query.strip():
+                return books
+        try:
+            return await self._read('SearchBooks', library_pb2.SearchRequest(query=query), key=query)
+        except grpc.RpcError as e:
+            print(f"Error calling SearchBooks RPC: {e.details()}")
+            return []
+
+    async def get_all_members(self, query="", status="", page_size=0, page_token=""):
+        request = member_search_request(query, status, page_size, page_token)
+        try:
+            return await self._read('GetAllMembers', request, key=(query, status, page_size, page_token))
+        except grpc.RpcError as e:
+            print(f"Error calling GetAllMembers RPC: {e.details()}")
+            return []
+
+    async def batch_get_books(self, keys, key_type='id'):
+        """Voir LibraryClient.batch_get_books."""
+        request = batch_get_request(keys, key_type)
+        try:
+            response = await self._read('BatchGetBooks', request, key=(key_type, tuple(request.keys)))
+        except grpc.RpcError as e:
+            print(f"Error calling BatchGetBooks RPC: {e.details()}")
+            return [None] * len(request.keys)
+        return batch_results(response, 'book')
+
+    async def batch_get_members(self, keys, key_type='id'):
+        """Voir LibraryClient.batch_get_members."""
+        request = batch_get_request(keys, key_type)
+        try:
+            response = await self._read('BatchGetMembers', request, key=(key_type, tuple(request.keys)))
+        except grpc.RpcError as e:
+            print(f"Error calling BatchGetMembers RPC: {e.details()}")
+            return [None] * len(request.keys)
+        return batch_results(response, 'member')
+
+    async def get_data_version(self):
+        """Voir LibraryClient.get_data_version : None si le serveur ne répond pas."""
+        if load_balanced():
+            return None
+        try:
+            return await self._call('GetDataVersion', library_pb2.DataVersionRequest())
+        except grpc.RpcError as e:
+            print(f"Error calling GetDataVersion RPC: {e.details()}")
+            return None
+
+    # --- Borrow & Return ---
+    async def borrow_book(self, member_id, book_id):
+        request = library_pb2.BorrowRequest(member_id=str(member_id), book_id=int(book_id))
+        try:
+            return await self._sync_replica(await self._call('BorrowBook', request))
+        except grpc.RpcError as e:
+            print(f"Erreur gRPC : {e.details()}")
+            return library_pb2.StatusResponse(success=False, message="Le serveur gRPC ne répond pas.")
+
+    async def return_book(self, member_id, book_id):
+        request = library_pb2.BorrowRequest(member_id=str(member_id), book_id=int(book_id))
+        try:
+            return await self._sync_replica(await self._call('ReturnBook', request))
+        except grpc.RpcError as e:
+            print(f"Erreur gRPC : {e.details()}")
+            return library_pb2.StatusResponse(success=False, message="Erreur de connexion au serveur.")
+
+    async def _sync_replica(self, response):
+        """Read-your-writes, as LibraryClient._sync_replica, without blocking the event loop."""
+        if self.inventory_replica is not None and response.success and response.inventory_version:
+            await asyncio.to_thread(
+                self.inventory_replica.wait_for,
+                response.inventory_version, getattr(settings, 'GRPC_REPLICA_WRITE_WAIT', 0.5),
+            )
+        return response
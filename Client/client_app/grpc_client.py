@@ -1,8 +1,16 @@
 # In Client/client_app/grpc_client.py
 
+import contextvars
 import grpc
+import json
 import sys
 import os
+import socket
+import threading
+from concurrent import futures
+from functools import lru_cache
+
+from django.conf import settings
 
 # ----------------------------------------------------
 # 1. PYTHON PATH FIX (CRITICAL for Django Client)
@@ -19,15 +27,370 @@ sys.path.insert(0, project_root_client)
 import library_pb2
 import library_pb2_grpc
 
-SERVER_ADDRESS = 'localhost:50051' 
+from .inventory_replica import InventoryReplica
+from .middleware import current_staff_id
+from .resilience import (
+    BreakerStub, CircuitBreaker, ReadCache, mark_stale, mark_unavailable,
+)
+
+SERVER_ADDRESS = 'localhost:50051'
+
+COMPRESSION_ALGORITHMS = {
+    None: grpc.Compression.NoCompression,
+    '': grpc.Compression.NoCompression,
+    'none': grpc.Compression.NoCompression,
+    'gzip': grpc.Compression.Gzip,
+    'deflate': grpc.Compression.Deflate,
+}
+
+def compression_algorithm(name):
+    """Traduit 'gzip' / 'deflate' / None en valeur grpc.Compression."""
+    if isinstance(name, grpc.Compression):
+        return name
+    try:
+        return COMPRESSION_ALGORITHMS[name.lower() if name else name]
+    except KeyError:
+        raise ValueError(f"Unknown compression algorithm: {name!r}")
+
+SERVICE_NAME = 'library_system.LibraryService'
+
+# Lectures idempotentes : relancées automatiquement (retry policy) et
+# éventuellement doublées (hedging) si le serveur tarde à répondre.
+IDEMPOTENT_METHODS = (
+    'SearchBooks', 'GetBook', 'BatchGetBooks', 'GetAvailability', 'GetMemberDetail', 'BatchGetMembers',
+    'GetAllMembers', 'GetDataVersion',
+)
+
+# Budget (en secondes) de chaque RPC. Les écritures échouent vite : pas de
+# retry, délai court.
+DEFAULT_TIMEOUT = 5.0
+RPC_TIMEOUTS = {
+    'UserLogin': 5.0,
+    'SearchBooks': 10.0,
+    'GetAllMembers': 10.0,
+    'GetAllUsers': 10.0,
+    'GetBook': 2.0,
+    'GetMemberDetail': 2.0,
+    'BatchGetBooks': 2.0,
+    'BatchGetMembers': 2.0,
+    'GetAvailability': 2.0,
+    'GetUserDetail': 2.0,
+    'CreateBook': 3.0,
+    'UpdateBookAvailability': 3.0,
+    'DeleteBook': 3.0,
+    'CreateMember': 3.0,
+    'UpdateMember': 3.0,
+    'DeleteMember': 3.0,
+    'BorrowBook': 3.0,
+    'ReturnBook': 3.0,
+    'ScanCheckout': 3.0,
+    'ScanReturn': 3.0,
+    'DeleteUser': 3.0,
+    'UpdateStaffProfile': 5.0,
+    'GetDataVersion': 1.0,
+}
+
+DEFAULT_RETRY_POLICY = {
+    'maxAttempts': 3,
+    'initialBackoff': '0.1s',
+    'maxBackoff': '1s',
+    'backoffMultiplier': 2,
+    'retryableStatusCodes': ['UNAVAILABLE', 'RESOURCE_EXHAUSTED'],
+}
+
+STREAMING_METHODS = ('SearchBooks', 'GetAllMembers', 'GetAllUsers')
+
+MEMBER_STATUSES = {
+    '': library_pb2.MemberSearchRequest.ALL,
+    'active': library_pb2.MemberSearchRequest.ACTIVE,
+    'inactive': library_pb2.MemberSearchRequest.INACTIVE,
+}
+
+
+def member_search_request(query="", status="", page_size=0, page_token=""):
+    return library_pb2.MemberSearchRequest(
+        query=query, status=MEMBER_STATUSES.get(status, library_pb2.MemberSearchRequest.ALL),
+        page_size=page_size, page_token=page_token,
+    )
+
+
+BATCH_KEY_TYPES = {
+    'id': library_pb2.BatchGetRequest.ID,
+    'isbn': library_pb2.BatchGetRequest.ISBN,
+    'member_code': library_pb2.BatchGetRequest.MEMBER_CODE,
+}
+
 
-class LibraryClient:
+def batch_get_request(keys, key_type='id'):
+    return library_pb2.BatchGetRequest(keys=[str(key) for key in keys], key_type=BATCH_KEY_TYPES[key_type])
+
+
+def batch_results(response, field):
+    """Messages of a BatchGet* response in key order, None for the keys not found."""
+    return [getattr(result, field) if result.found else None for result in response.results]
+
+# Threads used to run hedged attempts of idempotent reads.
+_hedging_pool = futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='grpc-hedge')
+# Threads used to refresh the read cache in the background.
+_refresh_pool = futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='grpc-refresh')
+
+# LibraryClient is instantiated per request: the breaker and the read cache
+# are shared by the whole process.
+_shared_lock = threading.Lock()
+_breakers = {}
+_read_cache = None
+_inventory_replica = None
+
+def server_targets():
+    """GRPC_SERVER_TARGETS as a tuple ('localhost:50051' when unset)."""
+    targets = getattr(settings, 'GRPC_SERVER_TARGETS', [SERVER_ADDRESS])
+    return (targets,) if isinstance(targets, str) else tuple(targets)
+
+@lru_cache(maxsize=None)
+def _channel_target(targets):
+    if len(targets) == 1:
+        return targets[0]
+    addresses = []
+    for target in targets:
+        host, port = target.rsplit(':', 1)
+        address = socket.getaddrinfo(host, int(port), socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+        addresses.append(f'{address}:{port}')
+    return 'ipv4:' + ','.join(addresses)
+
+def server_target():
+    """
+    gRPC target of the server tier. A single entry of GRPC_SERVER_TARGETS is
+    used as is ('localhost:50051', or 'dns:///library-grpc:50051' for a DNS
+    name resolving to several servers). Several 'host:port' entries are
+    resolved once to a static 'ipv4:a:port,b:port' list.
+    """
+    return _channel_target(server_targets())
+
+def load_balanced():
+    """
+    True when RPCs may reach several server processes (several targets or a
+    DNS name). Each server has its own WatchInventory feed and data versions,
+    so the catalogue replica and the version-keyed caches are then disabled.
+    """
+    targets = server_targets()
+    return len(targets) > 1 or targets[0].startswith('dns:')
+
+def shared_breaker(target):
+    with _shared_lock:
+        if target not in _breakers:
+            _breakers[target] = CircuitBreaker(**getattr(settings, 'GRPC_CIRCUIT_BREAKER', {}))
+        return _breakers[target]
+
+def shared_read_cache():
+    global _read_cache
+    with _shared_lock:
+        if _read_cache is None:
+            _read_cache = ReadCache(
+                max_staleness=getattr(settings, 'GRPC_READ_CACHE_MAX_STALENESS', 300.0),
+                max_entries=getattr(settings, 'GRPC_READ_CACHE_MAX_ENTRIES', 256),
+            )
+        return _read_cache
+
+def shared_inventory_replica():
+    """
+    Process-wide catalogue replica fed by WatchInventory, started on first
+    use. Returns None when GRPC_INVENTORY_REPLICA is disabled or when the
+    client is load balanced across several servers.
+    """
+    global _inventory_replica
+    if not getattr(settings, 'GRPC_INVENTORY_REPLICA', True) or load_balanced():
+        return None
+    with _shared_lock:
+        if _inventory_replica is None:
+            # Dedicated channel: the watch stream has no deadline.
+            channel = grpc.insecure_channel(server_target())
+            _inventory_replica = InventoryReplica(library_pb2_grpc.LibraryServiceStub(channel)).start()
+        return _inventory_replica
+
+def service_config(retry_policy):
+    """
+    gRPC service config: retry policy on idempotent reads only, load
+    balancing policy across the addresses of the target (GRPC_LOAD_BALANCING)
+    and client-side health checking, which stops picking a server whose
+    health service does not report SERVING.
+    """
+    config = {
+        'methodConfig': [{
+            'name': [{'service': SERVICE_NAME, 'method': m} for m in IDEMPOTENT_METHODS],
+            'retryPolicy': retry_policy,
+        }],
+        'loadBalancingConfig': [{getattr(settings, 'GRPC_LOAD_BALANCING', 'round_robin'): {}}],
+    }
+    if getattr(settings, 'GRPC_HEALTH_CHECK', True):
+        config['healthCheckConfig'] = {'serviceName': SERVICE_NAME}
+    return json.dumps(config)
+
+
+class ClientOptions:
+    """
+    Settings shared by LibraryClient and AsyncLibraryClient (grpc_aio_client):
+    per-RPC deadlines and compression, retry policy, staff-id metadata.
+    Unset arguments fall back to the GRPC_* settings.
+    """
+    def __init__(self, compression=None, compression_threshold=None, method_compression=None,
+                 timeouts=None, retry_policy=None, hedging_delay=None, stale_after=None):
+        if compression is None:
+            compression = getattr(settings, 'GRPC_COMPRESSION', None)
+        if compression_threshold is None:
+            compression_threshold = getattr(settings, 'GRPC_COMPRESSION_THRESHOLD', 1024)
+        if method_compression is None:
+            method_compression = getattr(settings, 'GRPC_METHOD_COMPRESSION', {})
+        if timeouts is None:
+            timeouts = getattr(settings, 'GRPC_TIMEOUTS', {})
+        if retry_policy is None:
+            retry_policy = getattr(settings, 'GRPC_RETRY_POLICY', DEFAULT_RETRY_POLICY)
+        if hedging_delay is None:
+            hedging_delay = getattr(settings, 'GRPC_HEDGING_DELAY', None)
+        if stale_after is None:
+            stale_after = getattr(settings, 'GRPC_READ_STALE_AFTER', 1.0)
+
+        self.compression = compression_algorithm(compression)
+        self.compression_threshold = compression_threshold
+        self.method_compression = {
+            method: compression_algorithm(name) for method, name in method_compression.items()
+        }
+        self.timeouts = {**RPC_TIMEOUTS, **timeouts}
+        self.default_timeout = getattr(settings, 'GRPC_DEFAULT_TIMEOUT', DEFAULT_TIMEOUT)
+        self.hedging_delay = hedging_delay
+        self.stale_after = stale_after
+        self.retry_policy = retry_policy
+
+    def channel_options(self):
+        return [
+            ('grpc.enable_retries', 1),
+            ('grpc.service_config', service_config(self.retry_policy)),
+        ]
+
+    def _call_options(self, method, request):
+        """Keyword arguments passed to every stub call (deadline, compression, staff id)."""
+        options = {'timeout': self.timeouts.get(method, self.default_timeout)}
+        staff_id = current_staff_id()
+        if staff_id:
+            options['metadata'] = (('x-staff-id', str(staff_id)),)
+        if request.ByteSize() < self.compression_threshold:
+            options['compression'] = grpc.Compression.NoCompression
+        else:
+            options['compression'] = self.method_compression.get(method, self.compression)
+        return options
+
+
+class LibraryClient(ClientOptions):
     """
     Client-side wrapper to manage remote calls (RPCs) to the gRPC Server.
+
+    `compression` is the default algorithm for outgoing requests ('gzip',
+    'deflate' or None) and `method_compression` overrides it per RPC name.
+    Requests smaller than `compression_threshold` bytes are sent uncompressed.
+
+    Every RPC carries a deadline: `timeouts` overrides RPC_TIMEOUTS per RPC
+    name. Idempotent reads are retried with exponential backoff following
+    `retry_policy`; if `hedging_delay` (seconds) is set, a second attempt is
+    started when the first one has not answered within that delay and the
+    fastest successful answer wins.
+
+    While the WatchInventory replica is in sync, search_books is answered
+    locally without any RPC; after a book write the client waits briefly for
+    the replica to apply it, so the next page shows the change.
+
+    Read RPCs are served stale-while-revalidate: when the server fails or
+    takes longer than `stale_after` seconds, the last good response (if not
+    older than GRPC_READ_CACHE_MAX_STALENESS) is returned and refreshed in
+    the background. A circuit breaker shared per server target stops
+    calling a failing server tier for a while.
+
+    With several GRPC_SERVER_TARGETS (or a DNS name), calls are spread over
+    the servers (GRPC_LOAD_BALANCING) and a server reporting NOT_SERVING on
+    the gRPC health service is skipped until it recovers.
+
+    Unset arguments fall back to the GRPC_* settings.
     """
-    def __init__(self):
-        self.channel = grpc.insecure_channel(SERVER_ADDRESS) 
-        self.stub = library_pb2_grpc.LibraryServiceStub(self.channel)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_cache = shared_read_cache()
+        self.inventory_replica = shared_inventory_replica()
+        target = server_target()
+        self.channel = grpc.insecure_channel(
+            target,
+            compression=self.compression,
+            options=self.channel_options(),
+        )
+        self.stub = BreakerStub(
+            library_pb2_grpc.LibraryServiceStub(self.channel),
+            shared_breaker(target),
+            STREAMING_METHODS,
+        )
+
+    def _hedged(self, method, call):
+        """
+        Runs `call()` for a read. For idempotent reads with hedging enabled, a
+        second attempt is started after `hedging_delay` seconds and the first
+        successful result is returned; the slower attempt ends at its deadline.
+        """
+        if self.hedging_delay is None or method not in IDEMPOTENT_METHODS:
+            return call()
+        first = _hedging_pool.submit(call)
+        done, _ = futures.wait([first], timeout=self.hedging_delay)
+        if done:
+            return first.result()
+        pending = {first, _hedging_pool.submit(call)}
+        error = None
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                error = attempt.exception()
+        raise error
+
+    def _sync_replica(self, response):
+        """Read-your-writes: waits until the replica has applied a successful book write."""
+        if self.inventory_replica is not None and response.success and response.inventory_version:
+            self.inventory_replica.wait_for(
+                response.inventory_version, getattr(settings, 'GRPC_REPLICA_WRITE_WAIT', 0.5)
+            )
+        return response
+
+    def _read(self, method, call, key=''):
+        """
+        Runs a read RPC through the shared stale-while-revalidate cache.
+        Without a cached response the call is made inline. Otherwise a refresh
+        is started in the background and the cached response is returned if
+        the refresh fails or takes longer than `stale_after` seconds.
+        """
+        cache_key = (method, key)
+        # Les threads des pools (couverture, rafraîchissement) n'héritent pas
+        # des contextvars : chaque tentative s'exécute dans une copie du
+        # contexte de la requête, pour garder son x-staff-id.
+        context = contextvars.copy_context()
+        in_context = lambda: context.copy().run(call)
+        fetch = lambda: self._hedged(method, in_context)
+        cached = self.read_cache.get(cache_key)
+        if cached is None:
+            try:
+                result = fetch()
+            except grpc.RpcError as e:
+                if e.code() in CircuitBreaker.FAILURE_CODES:
+                    mark_unavailable()
+                raise
+            self.read_cache.put(cache_key, result)
+            return result
+
+        value, age = cached
+        attempt = self.read_cache.refresh(cache_key, fetch, _refresh_pool)
+        try:
+            return attempt.result(timeout=self.stale_after)
+        except futures.TimeoutError:
+            pass
+        except grpc.RpcError as e:
+            if e.code() not in CircuitBreaker.FAILURE_CODES:
+                raise
+        mark_stale(age)
+        return value
 
     # ----------------------------------------------------
     # A. Authentication (Librarian Login)
@@ -36,7 +399,7 @@ class LibraryClient:
         """Calls the remote UserLogin RPC for staff authentication."""
         request = library_pb2.LoginRequest(username=username, password=password)
         try:
-            response = self.stub.UserLogin(request)
+            response = self.stub.UserLogin(request, **self._call_options('UserLogin', request))
             return response
         except grpc.RpcError as e:
             print(f"Error calling UserLogin RPC: {e.details()}")
@@ -50,11 +413,22 @@ class LibraryClient:
     # ----------------------------------------------------
     
     def search_books(self, query):
-        """Calls the remote SearchBooks RPC to retrieve a stream of books."""
+        """
+        Returns the books matching `query`: from the local replica when it is
+        in sync, otherwise by calling the remote SearchBooks RPC. A query the
+        replica does not find goes to SearchBooks too, for its typo-tolerant
+        fallback ("Dumass").
+        """
+        if self.inventory_replica is not None and self.inventory_replica.ready:
+            books = self.inventory_replica.books(query)
+            if books or not query.strip():
+                return books
         request = library_pb2.SearchRequest(query=query)
         
         try:
-            return list(self.stub.SearchBooks(request))
+            return self._read('SearchBooks', lambda: list(
+                self.stub.SearchBooks(request, **self._call_options('SearchBooks', request))
+            ), key=query)
         except grpc.RpcError as e:
             print(f"Error calling SearchBooks RPC: {e.details()}")
             return []
@@ -74,8 +448,8 @@ class LibraryClient:
         )
         
         try:
-            response = self.stub.CreateBook(book_request)
-            return response
+            response = self.stub.CreateBook(book_request, **self._call_options('CreateBook', book_request))
+            return self._sync_replica(response)
         except grpc.RpcError as e:
             status_code = e.code()
             details = e.details()
@@ -106,7 +480,7 @@ class LibraryClient:
         )
 
         try:
-            response = self.stub.UpdateStaffProfile(request)
+            response = self.stub.UpdateStaffProfile(request, **self._call_options('UpdateStaffProfile', request))
             return response
             
         except grpc.RpcError as e:
@@ -120,17 +494,73 @@ class LibraryClient:
                 message=f"RPC Failed ({status_code.name}): {details}"
             )
     def delete_member(self, m_id):
-        return self.stub.DeleteMember(library_pb2.UserIdRequest(user_id=str(m_id)))
-    def update_member(self, m_id, name, email, phone):
+        req = library_pb2.UserIdRequest(user_id=str(m_id))
+        try:
+            return self.stub.DeleteMember(req, **self._call_options('DeleteMember', req))
+        except grpc.RpcError as e:
+            print(f"Error calling DeleteMember RPC: {e.details()}")
+            return library_pb2.StatusResponse(success=False, message=e.details())
+    def update_member(self, m_id, name, email, phone, fields=None):
+        """`fields` : champs modifiés (full_name, email, phone) ; None = tous."""
         req = library_pb2.Member(id=str(m_id), full_name=name, email=email, phone=phone)
-        return self.stub.UpdateMember(req)
+        if fields is not None:
+            req.update_mask.paths.extend(fields)
+        try:
+            return self.stub.UpdateMember(req, **self._call_options('UpdateMember', req))
+        except grpc.RpcError as e:
+            print(f"Error calling UpdateMember RPC: {e.details()}")
+            return library_pb2.StatusResponse(success=False, message=e.details())
+    def batch_get_members(self, keys, key_type='id'):
+        """Membres des `keys` (ids, ou codes carte avec key_type='member_code'), comme batch_get_books."""
+        request = batch_get_request(keys, key_type)
+        try:
+            response = self._read('BatchGetMembers', lambda: self.stub.BatchGetMembers(
+                request, **self._call_options('BatchGetMembers', request)
+            ), key=(key_type, tuple(request.keys)))
+        except grpc.RpcError as e:
+            print(f"Error calling BatchGetMembers RPC: {e.details()}")
+            return [None] * len(request.keys)
+        return batch_results(response, 'member')
+
     def get_member_detail(self, m_id):
-        return self.stub.GetMemberDetail(library_pb2.UserIdRequest(user_id=str(m_id)))
+        req = library_pb2.UserIdRequest(user_id=str(m_id))
+        try:
+            return self._read('GetMemberDetail', lambda: self.stub.GetMemberDetail(
+                req, **self._call_options('GetMemberDetail', req)
+            ), key=str(m_id))
+        except grpc.RpcError as e:
+            print(f"Error calling GetMemberDetail RPC: {e.details()}")
+            return None
     def create_member(self, full_name, email, phone):
         req = library_pb2.Member(full_name=full_name, email=email, phone=phone)
-        return self.stub.CreateMember(req)        
-    def get_all_members(self):
-        return list(self.stub.GetAllMembers(library_pb2.SearchRequest(query="")))
+        try:
+            return self.stub.CreateMember(req, **self._call_options('CreateMember', req))
+        except grpc.RpcError as e:
+            print(f"Error calling CreateMember RPC: {e.details()}")
+            return library_pb2.StatusResponse(success=False, message=e.details())
+    def get_all_members(self, query="", status="", page_size=0, page_token=""):
+        """
+        Members matching `query` (prefix of the name, email, phone or member
+        code, filtered on the server), newest first. `status` is '', 'active'
+        or 'inactive'; page_size=0 returns every match.
+        """
+        req = member_search_request(query, status, page_size, page_token)
+        try:
+            return self._read('GetAllMembers', lambda: list(
+                self.stub.GetAllMembers(req, **self._call_options('GetAllMembers', req))
+            ), key=(query, status, page_size, page_token))
+        except grpc.RpcError as e:
+            print(f"Error calling GetAllMembers RPC: {e.details()}")
+            return []
+
+    def search_members(self, query="", status="", page_token=""):
+        """One page of get_all_members: (members, token of the next page or "")."""
+        page_size = getattr(settings, 'MEMBERS_PAGE_SIZE', 50)
+        # Un membre de plus que la page : indique s'il y a une page suivante.
+        members = self.get_all_members(query, status, page_size + 1, page_token)
+        if len(members) > page_size:
+            return members[:page_size], members[page_size - 1].id
+        return members, ""
     #D2. Creation Wrapper (Uses update_staff_profile for detournement)
     def create_user(self, username, email, password):
         """Crée un nouvel utilisateur staff en détournant le RPC UpdateStaffProfile."""
@@ -150,10 +580,15 @@ class LibraryClient:
     # F. Book Management (Update & Delete) 🚀 NOUVEAU 🚀
     # ----------------------------------------------------
 
-    def update_book(self, book_obj):
-        """Appelle le RPC UpdateBookAvailability pour mettre à jour les infos d'un livre."""
+    def update_book(self, book_obj, fields=None):
+        """
+        Appelle le RPC UpdateBookAvailability pour mettre à jour les infos d'un livre.
+        `fields` : champs modifiés (le serveur n'écrit que ceux-là) ; None = tous.
+        """
+        if fields is not None:
+            book_obj.update_mask.paths.extend(fields)
         try:
-            return self.stub.UpdateBookAvailability(book_obj)
+            return self._sync_replica(self.stub.UpdateBookAvailability(book_obj, **self._call_options('UpdateBookAvailability', book_obj)))
         except grpc.RpcError as e:
             print(f"Error calling UpdateBookAvailability: {e.details()}")
             return library_pb2.StatusResponse(success=False, message=e.details())
@@ -162,18 +597,55 @@ class LibraryClient:
         """Appelle le RPC DeleteBook pour supprimer un livre via son ID."""
         request = library_pb2.SearchRequest(query=str(book_id))
         try:
-            return self.stub.DeleteBook(request)
+            return self._sync_replica(self.stub.DeleteBook(request, **self._call_options('DeleteBook', request)))
         except grpc.RpcError as e:
             # Si vous avez l'erreur UNIMPLEMENTED ici, c'est que le serveur 
             # n'a pas encore redémarré avec le nouveau .proto
             print(f"Error calling DeleteBook RPC: {e.details()}")
             return library_pb2.StatusResponse(success=False, message=e.details())
 
+    def batch_get_books(self, keys, key_type='id'):
+        """
+        Livres des `keys` (ids, ou ISBN avec key_type='isbn') en un seul appel :
+        un Book par clé, dans l'ordre, ou None si la clé est introuvable.
+        """
+        request = batch_get_request(keys, key_type)
+        try:
+            response = self._read('BatchGetBooks', lambda: self.stub.BatchGetBooks(
+                request, **self._call_options('BatchGetBooks', request)
+            ), key=(key_type, tuple(request.keys)))
+        except grpc.RpcError as e:
+            print(f"Error calling BatchGetBooks RPC: {e.details()}")
+            return [None] * len(request.keys)
+        return batch_results(response, 'book')
+
+    def get_availability(self, book_ids=()):
+        """
+        Stock des livres `book_ids` (tous si vide), lu dans l'index en mémoire
+        du serveur : {book_id: (available_copies, total_copies)}, sans les ids
+        inconnus. None si le serveur ne répond pas.
+        """
+        request = library_pb2.AvailabilityRequest(book_ids=[int(book_id) for book_id in book_ids])
+        try:
+            response = self._read('GetAvailability', lambda: self.stub.GetAvailability(
+                request, **self._call_options('GetAvailability', request)
+            ), key=tuple(request.book_ids))
+        except grpc.RpcError as e:
+            print(f"Error calling GetAvailability RPC: {e.details()}")
+            return None
+        return {
+            book_id: (available, total)
+            for book_id, available, total in zip(response.book_ids, response.available_copies, response.total_copies)
+            if total >= 0
+        }
+
     def get_book_detail(self, book_id):
         """Appelle le RPC GetBook pour récupérer les données d'un livre spécifique."""
         request = library_pb2.SearchRequest(query=str(book_id))
         try:
-            return self.stub.GetBook(request)
+            return self._read('GetBook', lambda: self.stub.GetBook(
+                request, **self._call_options('GetBook', request)
+            ), key=str(book_id))
         except grpc.RpcError as e:
             print(f"Error calling GetBook RPC: {e.details()}")
             return None
@@ -184,7 +656,7 @@ class LibraryClient:
             book_id=int(book_id)
         )
         try:
-            return self.stub.ReturnBook(request)
+            return self._sync_replica(self.stub.ReturnBook(request, **self._call_options('ReturnBook', request)))
         except grpc.RpcError as e:
             return library_pb2.StatusResponse(success=False, message="Erreur de connexion au serveur.")
     def borrow_book(self, member_id, book_id):
@@ -194,15 +666,35 @@ class LibraryClient:
             book_id=int(book_id)
         )
         try:
-            return self.stub.BorrowBook(request)
+            return self._sync_replica(self.stub.BorrowBook(request, **self._call_options('BorrowBook', request)))
         except grpc.RpcError as e:
             print(f"Erreur gRPC : {e.details()}")
             return library_pb2.StatusResponse(success=False, message="Le serveur gRPC ne répond pas.")
+    def scan_checkout(self, member_code, isbn):
+        """Emprunt au comptoir à partir des codes scannés (carte MEM-… et ISBN)."""
+        request = library_pb2.ScanRequest(member_code=member_code, isbn=isbn)
+        try:
+            return self._sync_replica(self.stub.ScanCheckout(request, **self._call_options('ScanCheckout', request)))
+        except grpc.RpcError as e:
+            print(f"Erreur gRPC : {e.details()}")
+            return library_pb2.StatusResponse(success=False, message="Le serveur gRPC ne répond pas.")
+
+    def scan_return(self, member_code, isbn):
+        """Retour au comptoir à partir des codes scannés."""
+        request = library_pb2.ScanRequest(member_code=member_code, isbn=isbn)
+        try:
+            return self._sync_replica(self.stub.ScanReturn(request, **self._call_options('ScanReturn', request)))
+        except grpc.RpcError as e:
+            print(f"Erreur gRPC : {e.details()}")
+            return library_pb2.StatusResponse(success=False, message="Le serveur gRPC ne répond pas.")
+
     def get_all_users(self):
         """Appelle le RPC GetAllUsers pour récupérer tous les utilisateurs."""
         request = library_pb2.SearchRequest(query="")
         try:
-            return list(self.stub.GetAllUsers(request))
+            return self._read('GetAllUsers', lambda: list(
+                self.stub.GetAllUsers(request, **self._call_options('GetAllUsers', request))
+            ))
         except grpc.RpcError as e:
             print(f"Error calling GetAllUsers RPC: {e.details()}")
             return []
@@ -211,7 +703,9 @@ class LibraryClient:
         """Appelle le RPC GetUserDetail pour récupérer un seul utilisateur (pour l'édition)."""
         request = library_pb2.UserIdRequest(user_id=str(user_id))
         try:
-            response = self.stub.GetUserDetail(request)
+            response = self._read('GetUserDetail', lambda: self.stub.GetUserDetail(
+                request, **self._call_options('GetUserDetail', request)
+            ), key=str(user_id))
             if response and response.user_id:
                 return response
             return None
@@ -223,7 +717,23 @@ class LibraryClient:
         """Appelle le RPC DeleteUser pour désactiver un compte."""
         request = library_pb2.UserIdRequest(user_id=str(user_id))
         try:
-            return self.stub.DeleteUser(request)
+            return self.stub.DeleteUser(request, **self._call_options('DeleteUser', request))
         except grpc.RpcError as e:
             details = e.details()
-            return library_pb2.StatusResponse(success=False, message=f"Échec RPC: {details}")
\ No newline at end of file
+            return library_pb2.StatusResponse(success=False, message=f"Échec RPC: {details}")
+
+    # --- Data versions ---
+    def get_data_version(self):
+        """
+        Appelle le RPC GetDataVersion. Retourne None si le serveur ne répond
+        pas : une version périmée ne doit jamais servir de clé de cache.
+        Toujours None en répartition de charge (versions propres à chaque serveur).
+        """
+        if load_balanced():
+            return None
+        request = library_pb2.DataVersionRequest()
+        try:
+            return self.stub.GetDataVersion(request, **self._call_options('GetDataVersion', request))
+        except grpc.RpcError as e:
+            print(f"Error calling GetDataVersion RPC: {e.details()}")
+            return None
@@ -0,0 +1,102 @@
+# In Client/client_app/inventory_replica.py
+
+import threading
+import time
+
+import grpc
+
+import library_pb2
+
+Event = library_pb2.InventoryEvent
+
+
+class InventoryReplica:
+    """
+    Local, thread-safe copy of the book catalogue fed by the WatchInventory
+    stream. A daemon thread keeps the stream open; after a disconnect it
+    reconnects with the last applied (epoch, version) so the server only
+    sends the changes it missed, or a new snapshot if it cannot.
+
+    `ready` is True only while the stream is connected and caught up; callers
+    must fall back to regular RPCs otherwise.
+    """
+
+    def __init__(self, stub, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.stub = stub
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.epoch = ''
+        self.version = 0
+        self.ready = False
+        self._books = {}
+        self._snapshot = None
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='inventory-replica', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    # --- Reads ---
+    def books(self, query=""):
+        """Books whose title or author contains `query` (case-insensitive), ordered by title."""
+        needle = query.casefold()
+        with self._changed:
+            books = list(self._books.values())
+        if needle:
+            books = [b for b in books if needle in b.title.casefold() or needle in b.author.casefold()]
+        return sorted(books, key=lambda b: b.title.casefold())
+
+    def get(self, book_id):
+        with self._changed:
+            return self._books.get(int(book_id))
+
+    def wait_for(self, version, timeout):
+        """Waits until the change of `version` has been applied (read-your-writes)."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.version >= version, timeout=timeout)
+
+    # --- Feed ---
+    def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            request = library_pb2.WatchInventoryRequest(epoch=self.epoch, since_version=self.version)
+            try:
+                for event in self.stub.WatchInventory(request):
+                    self._apply(event)
+                    delay = self.reconnect_delay
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    print("WatchInventory is not implemented by the server, replica disabled.")
+                    self._set_ready(False)
+                    return
+                print(f"WatchInventory stream interrupted: {e.code().name}")
+            self._set_ready(False)
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _set_ready(self, ready):
+        with self._changed:
+            self.ready = ready
+            self._snapshot = None
+
+    def _apply(self, event):
+        with self._changed:
+            if event.kind == Event.RESET:
+                self._snapshot = {}
+            # While a snapshot is being received, changes apply to it and the
+            # (epoch, version) to resume from stays the one of the old copy.
+            books = self._snapshot if self._snapshot is not None else self._books
+            if event.kind == Event.SYNCED:
+                if self._snapshot is not None:
+                    self._books = self._snapshot
+                    self._snapshot = None
+                self.ready = True
+            elif event.kind == Event.DELETED:
+                books.pop(event.book.id, None)
+            elif event.kind != Event.RESET:
+                books[event.book.id] = event.book
+            if self._snapshot is None:
+                self.epoch = event.epoch
+                self.version = event.version
+                self._changed.notify_all()
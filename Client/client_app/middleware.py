@@ -0,0 +1,58 @@
+import contextvars
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .resilience import reset_read_status
+
+# Staff member of the current request, sent to the server as 'x-staff-id'
+# metadata (read-your-writes routing on the server side).
+_staff_id = contextvars.ContextVar('staff_id', default=None)
+
+def current_staff_id():
+    return _staff_id.get()
+
+
+class ReadStatusMiddleware:
+    """Clears the stale/unavailable read flag at the start of every request."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        reset_read_status()
+        return self.get_response(request)
+
+
+class StaffContextMiddleware:
+    """
+    Makes the logged-in staff id available to LibraryClient for the request.
+    Both middlewares are async-capable so that, under ASGI, async views run
+    on the event loop without a thread hop in the middle of the chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _staff_id.set(request.session.get('staff_id'))
+        try:
+            return self.get_response(request)
+        finally:
+            _staff_id.reset(token)
+
+    async def __acall__(self, request):
+        token = _staff_id.set(request.session.get('staff_id'))
+        try:
+            return await self.get_response(request)
+        finally:
+            _staff_id.reset(token)
@@ -0,0 +1,203 @@
+# In Client/client_app/resilience.py
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+
+import grpc
+
+# ----------------------------------------------------
+# 1. Read status of the current request (for the UI banner)
+# ----------------------------------------------------
+
+# {} (fresh so far), or {'state': 'stale' | 'unavailable', 'age': seconds}.
+# The dict is updated in place: asyncio tasks started by an async view run in
+# a copy of the request context but still share the same status.
+_read_status = contextvars.ContextVar('grpc_read_status', default=None)
+
+def reset_read_status():
+    _read_status.set({})
+
+def read_status():
+    return _read_status.get() or None
+
+def _status():
+    status = _read_status.get()
+    if status is None:
+        status = {}
+        _read_status.set(status)
+    return status
+
+def mark_stale(age):
+    status = _status()
+    if status.get('state') == 'unavailable':
+        return
+    age = max(age, status['age']) if status else age
+    status.update(state='stale', age=age)
+
+def mark_unavailable():
+    _status().update(state='unavailable', age=None)
+
+
+# ----------------------------------------------------
+# 2. Circuit breaker
+# ----------------------------------------------------
+
+class CircuitOpenError(grpc.RpcError):
+    """Raised instead of calling the server while the circuit is open."""
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "Serveur gRPC indisponible (circuit ouvert), nouvel essai plus tard."
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures: calls are then
+    rejected locally for `reset_timeout` seconds, after which a single trial
+    call is let through (half-open). Its outcome closes or re-opens the circuit.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    # Codes that mean "the server is in trouble", not "the request was wrong".
+    FAILURE_CODES = (
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+    )
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError()
+
+    def record(self, error=None):
+        with self._lock:
+            if error is None or error.code() not in self.FAILURE_CODES:
+                self.state = self.CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def abandon(self):
+        """
+        The call let through by before_call() ended without an outcome
+        (cancelled): the half-open trial slot goes to the next call.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+
+class BreakerStub:
+    """
+    Wraps a LibraryServiceStub so every RPC goes through the circuit breaker.
+    Streaming RPCs are drained inside the wrapper (the result is a list) so
+    that errors raised while iterating are counted too.
+    """
+
+    def __init__(self, stub, breaker, streaming_methods):
+        self._stub = stub
+        self._breaker = breaker
+        self._streaming_methods = streaming_methods
+
+    def __getattr__(self, name):
+        rpc = getattr(self._stub, name)
+        breaker = self._breaker
+        streaming = name in self._streaming_methods
+
+        def call(request, **kwargs):
+            breaker.before_call()
+            try:
+                result = rpc(request, **kwargs)
+                if streaming:
+                    result = list(result)
+            except grpc.RpcError as e:
+                breaker.record(e)
+                raise
+            except Exception:
+                breaker.record()
+                raise
+            except BaseException:
+                breaker.abandon()
+                raise
+            breaker.record()
+            return result
+        return call
+
+
+# ----------------------------------------------------
+# 3. Stale-while-revalidate cache for read RPCs
+# ----------------------------------------------------
+
+class ReadCache:
+    """
+    Last good response of each read RPC, kept for `max_staleness` seconds.
+    Bounded to `max_entries` keys (least recently used evicted first).
+    """
+
+    def __init__(self, max_staleness=300.0, max_entries=256):
+        self.max_staleness = max_staleness
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        """Returns (value, age in seconds), or None if missing or too old."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age > self.max_staleness:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, age
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key, fetch, executor):
+        """
+        Runs `fetch()` in `executor` and stores its result under `key`.
+        If a refresh of `key` is already running, its future is returned
+        instead, so one slow key never piles several calls on the server.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = executor.submit(fetch)
+                self._inflight[key] = future
+                future.add_done_callback(lambda f: self._refreshed(key, f))
+            return future
+
+    def _refreshed(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self.put(key, future.result())
@@ -1,3 +1,391 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from concurrent import futures
+from unittest import mock
 
-# Create your tests here.
+import grpc
+from django.conf import settings
+from django.test import Client, RequestFactory, SimpleTestCase, override_settings
+
+import library_pb2
+from . import grpc_client, views
+from .grpc_aio_client import AsyncLibraryClient
+from .grpc_client import LibraryClient
+from .inventory_replica import InventoryReplica
+from .middleware import _staff_id, current_staff_id
+from .resilience import CircuitBreaker, CircuitOpenError, ReadCache, mark_stale, reset_read_status
+
+
+class FakeRpcError(grpc.RpcError):
+
+    def __init__(self, code=grpc.StatusCode.UNAVAILABLE):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+# ----------------------------------------------------
+# Circuit breaker
+# ----------------------------------------------------
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def open_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record(FakeRpcError())
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        return breaker
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = self.open_breaker()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_client_errors_do_not_count(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record(FakeRpcError(grpc.StatusCode.NOT_FOUND))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        breaker.before_call()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record(FakeRpcError(grpc.StatusCode.DEADLINE_EXCEEDED))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_abandoned_trial_frees_the_slot(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.abandon()
+        breaker.before_call()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+
+class ReadCacheTests(SimpleTestCase):
+
+    def test_stale_entries_expire(self):
+        cache = ReadCache(max_staleness=0.05)
+        cache.put('book', 'v1')
+        value, age = cache.get('book')
+        self.assertEqual(value, 'v1')
+        self.assertLess(age, 0.05)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('book'))
+        self.assertIsNone(cache.get('missing'))
+
+    def test_least_recently_used_evicted(self):
+        cache = ReadCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([cache.get(key)[0] for key in ('a', 'c')], [1, 3])
+
+    def test_concurrent_refreshes_share_one_call(self):
+        cache = ReadCache()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return 'fresh'
+
+        with futures.ThreadPoolExecutor(max_workers=2) as executor:
+            first = cache.refresh('book', fetch, executor)
+            self.assertIs(cache.refresh('book', fetch, executor), first)
+            release.set()
+            self.assertEqual(first.result(2), 'fresh')
+        self.assertEqual(calls, [1])
+        self.assertEqual(cache.get('book')[0], 'fresh')
+
+    def test_failed_refresh_keeps_the_last_value(self):
+        cache = ReadCache()
+        cache.put('book', 'cached')
+
+        def fetch():
+            raise FakeRpcError()
+
+        with futures.ThreadPoolExecutor(max_workers=1) as executor:
+            failed = cache.refresh('book', fetch, executor)
+        self.assertIsInstance(failed.exception(), FakeRpcError)
+        self.assertEqual(cache.get('book')[0], 'cached')
+        # Le refresh suivant relance un appel.
+        with futures.ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertIsNot(cache.refresh('book', lambda: 'fresh', executor), failed)
+        self.assertEqual(cache.get('book')[0], 'fresh')
+
+
+@override_settings(GRPC_INVENTORY_REPLICA=False)
+class AsyncBreakerTests(SimpleTestCase):
+    """A half-open trial cancelled with its view must not leave the circuit stuck."""
+
+    def test_cancelled_trial(self):
+        async def scenario():
+            client = AsyncLibraryClient()
+            client.breaker = breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+            breaker.record(FakeRpcError())
+            started = asyncio.Event()
+
+            class HangingStub:
+                def GetBook(self, request, **kwargs):
+                    async def call():
+                        started.set()
+                        await asyncio.sleep(10)
+                    return call()
+
+            client.stub = HangingStub()
+            trial = asyncio.ensure_future(client._call('GetBook', library_pb2.SearchRequest(query='1')))
+            await started.wait()
+            trial.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await trial
+            return breaker
+
+        breaker = asyncio.run(scenario())
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        breaker.before_call()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+
+# ----------------------------------------------------
+# LibraryClient reads
+# ----------------------------------------------------
+
+@override_settings(GRPC_INVENTORY_REPLICA=False)
+class StaffIdPropagationTests(SimpleTestCase):
+    """Hedged attempts and background refreshes run on pool threads but keep x-staff-id."""
+
+    def setUp(self):
+        self.client = LibraryClient(hedging_delay=0.0, stale_after=0.0)
+        self.client.read_cache = ReadCache()
+        self.token = _staff_id.set(7)
+        self.addCleanup(_staff_id.reset, self.token)
+        self.seen = []
+        self.calls = threading.Semaphore(0)
+
+    def call(self):
+        self.seen.append(current_staff_id())
+        self.calls.release()
+        time.sleep(0.05)
+        return 'book'
+
+    def wait_calls(self, count):
+        for _ in range(count):
+            self.assertTrue(self.calls.acquire(timeout=2))
+
+    def test_hedged_attempts(self):
+        self.assertEqual(self.client._read('GetBook', self.call, key='hedged'), 'book')
+        self.wait_calls(2)
+        self.assertEqual(self.seen, [7, 7])
+
+    def test_background_refresh(self):
+        self.client.hedging_delay = None
+        self.client.read_cache.put(('GetBook', 'refresh'), 'cached')
+        self.client._read('GetBook', self.call, key='refresh')
+        self.wait_calls(1)
+        self.assertEqual(self.seen, [7])
+
+
+# ----------------------------------------------------
+# Book search with the inventory replica
+# ----------------------------------------------------
+
+DUMAS = library_pb2.Book(id=1, title="Les Trois Mousquetaires", author="Alexandre Dumas")
+
+
+class FuzzySearchStub:
+    """SearchBooks of the server, reduced to its typo-tolerant fallback."""
+
+    def __init__(self):
+        self.queries = []
+
+    def SearchBooks(self, request, **kwargs):
+        self.queries.append(request.query)
+        return iter([DUMAS] if request.query == 'Dumass' else [])
+
+
+@override_settings(GRPC_INVENTORY_REPLICA=False)
+class ReplicaSearchTests(SimpleTestCase):
+    """The replica only matches substrings: a query it does not find goes to SearchBooks."""
+
+    def setUp(self):
+        self.replica = InventoryReplica(stub=None)
+        self.replica._books = {DUMAS.id: DUMAS}
+        self.replica.ready = True
+        self.stub = FuzzySearchStub()
+
+    def library_client(self):
+        client = LibraryClient()
+        client.read_cache = ReadCache()
+        client.inventory_replica, client.stub = self.replica, self.stub
+        return client
+
+    def test_replica_hits_stay_local(self):
+        self.assertEqual(self.library_client().search_books('dumas'), [DUMAS])
+        self.assertEqual(self.library_client().search_books(''), [DUMAS])
+        self.assertEqual(self.stub.queries, [])
+
+    def test_typo_while_replica_ready(self):
+        self.assertEqual(self.library_client().search_books('Dumass'), [DUMAS])
+        self.assertEqual(self.stub.queries, ['Dumass'])
+
+    def test_typo_while_replica_ready_async(self):
+        class AsyncStub:
+            def SearchBooks(stub, request, **kwargs):
+                books = self.stub.SearchBooks(request)
+
+                async def stream():
+                    for book in books:
+                        yield book
+                return stream()
+
+        async def search():
+            client = AsyncLibraryClient()
+            client.read_cache = ReadCache()
+            client.inventory_replica, client.stub = self.replica, AsyncStub()
+            return await client.search_books('Dumass')
+
+        self.assertEqual(asyncio.run(search()), [DUMAS])
+
+
+# ----------------------------------------------------
+# Several gRPC servers (client-side load balancing)
+# ----------------------------------------------------
+
+class ServerTargetsTests(SimpleTestCase):
+
+    def target(self, targets):
+        with override_settings(GRPC_SERVER_TARGETS=targets):
+            return grpc_client.server_targets(), grpc_client.server_target(), grpc_client.load_balanced()
+
+    def test_single_target_used_as_is(self):
+        self.assertEqual(self.target('localhost:50051'), (('localhost:50051',), 'localhost:50051', False))
+        self.assertEqual(self.target(['localhost:50051']), (('localhost:50051',), 'localhost:50051', False))
+
+    def test_dns_name(self):
+        target = 'dns:///library-grpc:50051'
+        self.assertEqual(self.target([target]), ((target,), target, True))
+
+    def test_static_list_resolved_to_ipv4(self):
+        targets, target, balanced = self.target(['localhost:50061', '127.0.0.2:50062'])
+        self.assertEqual(targets, ('localhost:50061', '127.0.0.2:50062'))
+        self.assertEqual(target, 'ipv4:127.0.0.1:50061,127.0.0.2:50062')
+        self.assertTrue(balanced)
+
+    def test_unset(self):
+        with self.settings():
+            del settings.GRPC_SERVER_TARGETS
+            self.assertEqual(grpc_client.server_target(), grpc_client.SERVER_ADDRESS)
+
+    def test_service_config(self):
+        policy = {'maxAttempts': 2}
+        config = json.loads(grpc_client.service_config(policy))
+        self.assertEqual(config['loadBalancingConfig'], [{'round_robin': {}}])
+        self.assertEqual(config['healthCheckConfig'], {'serviceName': grpc_client.SERVICE_NAME})
+        [method_config] = config['methodConfig']
+        self.assertEqual(method_config['retryPolicy'], policy)
+        self.assertEqual({name['method'] for name in method_config['name']}, set(grpc_client.IDEMPOTENT_METHODS))
+
+        with override_settings(GRPC_LOAD_BALANCING='pick_first', GRPC_HEALTH_CHECK=False):
+            config = json.loads(grpc_client.service_config(policy))
+        self.assertEqual(config['loadBalancingConfig'], [{'pick_first': {}}])
+        self.assertNotIn('healthCheckConfig', config)
+
+
+# ----------------------------------------------------
+# Stateless client tier
+# ----------------------------------------------------
+
+class SignedCookieSessionTests(SimpleTestCase):
+    """A session opened on one client node is read by another node sharing its SECRET_KEY."""
+
+    def log_in(self):
+        node_1 = Client()
+        login = mock.Mock(staff_login=lambda username, password: library_pb2.LoginResponse(success=True, user_id='7'))
+        with mock.patch.object(views, 'LibraryClient', lambda: login):
+            response = node_1.post('/login/', {'username': 'desk', 'password': 'secret'})
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+        return node_1.cookies[settings.SESSION_COOKIE_NAME].value
+
+    def open_login_page(self, session_cookie):
+        node_2 = Client()
+        node_2.cookies[settings.SESSION_COOKIE_NAME] = session_cookie
+        return node_2.get('/login/')
+
+    def test_other_node_reads_the_session(self):
+        # Un membre du personnel déjà connecté est renvoyé vers le tableau de bord.
+        response = self.open_login_page(self.log_in())
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+
+    def test_other_secret_key_rejects_the_session(self):
+        session_cookie = self.log_in()
+        with override_settings(SECRET_KEY='another-deployment'):
+            self.assertEqual(self.open_login_page(session_cookie).status_code, 200)
+
+
+# ----------------------------------------------------
+# Conditional GET (ETag)
+# ----------------------------------------------------
+
+class StaleEtagTests(SimpleTestCase):
+    """A page rendered from the stale read cache gets no ETag, so it is never revalidated into a 304."""
+
+    def request(self, path, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        request = RequestFactory().get(path, **headers)
+        request.session = {'staff_id': '1'}
+        request._data_versions = library_pb2.DataVersionResponse(epoch='e', catalogue=3)
+        reset_read_status()
+        return request
+
+    def search_books(self, stale):
+        def search_books(query):
+            if stale:
+                mark_stale(60)
+            return [DUMAS]
+        return mock.Mock(search_books=search_books)
+
+    def api_books(self, stale, etag=None):
+        with mock.patch.object(views, 'LibraryClient', lambda: self.search_books(stale)):
+            return views.api_books(self.request(f'/api/books/?q=stale-etag-{stale}', etag))
+
+    def test_sync_view(self):
+        self.assertNotIn('ETag', self.api_books(stale=True))
+        fresh = self.api_books(stale=False)
+        self.assertIn('ETag', fresh)
+        self.assertEqual(self.api_books(stale=False, etag=fresh['ETag']).status_code, 304)
+
+    def test_async_view(self):
+        @views.async_page_condition('catalogue')
+        async def page(request):
+            if request.GET.get('stale'):
+                mark_stale(60)
+            return views.JsonResponse({})
+
+        async def get(path, etag=None):
+            return await page(self.request(path, etag))
+
+        self.assertNotIn('ETag', asyncio.run(get('/dashboard/?stale=1')))
+        fresh = asyncio.run(get('/dashboard/'))
+        self.assertIn('ETag', fresh)
+        self.assertEqual(asyncio.run(get('/dashboard/', fresh['ETag'])).status_code, 304)
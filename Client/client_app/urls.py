@@ -22,7 +22,12 @@ urlpatterns = [
     path('members/edit/<int:member_id>/', views.edit_member, name='edit_member'),
     path('members/issue-book/', views.issue_book_view, name='issue_book'),
     path('members/return-book/', views.return_book_view, name='return_book'),
+    path('desk/scan/', views.scan_desk, name='scan_desk'),
     path('manage-books/', views.books_list, name='books_list'),
 path('delete-book/<int:book_id>/', views.delete_book, name='delete_book'),
 path('edit-book/<int:book_id>/', views.edit_book_view, name='edit_book'),
+
+    # API JSON en lecture seule (écrans kiosques), avec ETag / If-None-Match
+    path('api/books/', views.api_books, name='api_books'),
+    path('api/books/<int:book_id>/', views.api_book_detail, name='api_book_detail'),
 ]
\ No newline at end of file
@@ -1,14 +1,83 @@
 # In Client/client_app/views.py
+import asyncio
+from functools import wraps
 import library_pb2
 from django.shortcuts import render, redirect
-from django.http import HttpRequest
+from django.http import HttpRequest, JsonResponse, Http404
 from django.urls import reverse
 from django.contrib import messages
-from django.core.files.storage import FileSystemStorage 
-from .grpc_client import LibraryClient 
+from django.core.files.storage import default_storage
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag, urlencode
 from datetime import timedelta
-# NOTE: LibraryClient est importé ici et non dans les fonctions individuelles
+from .fragment_cache import (
+    arequest_data_versions, cached_for_version, data_version, drop_stale_etag, etag_for, fresh_etag_only,
+    render_fragment, request_data_versions, versioned_etag,
+)
+
+
+def LibraryClient(*args, **kwargs):
+    # NOTE: grpc_client (et donc grpc) n'est importé qu'au premier appel :
+    # les commandes manage.py qui chargent les URLs (migrate, check...) ne
+    # paient plus l'import de grpc ni la création des canaux.
+    from .grpc_client import LibraryClient
+    return LibraryClient(*args, **kwargs)
+
+
+def AsyncLibraryClient(*args, **kwargs):
+    # Client grpc.aio des vues async, importé au premier appel lui aussi.
+    from .grpc_aio_client import AsyncLibraryClient
+    return AsyncLibraryClient(*args, **kwargs)
+
+
+def page_etag_parts(request):
+    return (
+        request.path, request.GET.urlencode(),
+        request.session.get('staff_id'), request.session.get('username'),
+    )
+
+
+def page_etag(*data_sets):
+    """
+    ETag function (for @condition) of a page built from `data_sets`: it also
+    covers the staff member and the query string. No ETag while flash messages
+    are pending, since they must be displayed.
+    """
+    def etag(request, *args, **kwargs):
+        if len(messages.get_messages(request)):
+            return None
+        return versioned_etag(request, data_sets, *page_etag_parts(request))
+    return etag
+
+
+def async_page_condition(*data_sets):
+    """
+    @cache_control(private=True, no_cache=True) and
+    @condition(etag_func=page_etag(*data_sets)) for async views: django
+    4.2's decorators only wrap sync views. Like @fresh_etag_only, a page
+    rendered from the stale read cache gets no ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag = None
+            if request.method in ('GET', 'HEAD') and not len(messages.get_messages(request)):
+                etag = etag_for(await arequest_data_versions(request), data_sets, *page_etag_parts(request))
+                etag = quote_etag(etag) if etag else None
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if etag:
+                response.headers.setdefault('ETag', etag)
+            drop_stale_etag(response)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return inner
+    return decorator
+
 
 # ----------------------------------------------------
 # A. Authentication Views 
@@ -59,19 +128,23 @@ def staff_logout(request: HttpRequest):
 
 # in client_app/views.py
 
-def dashboard(request: HttpRequest):
+# Les navigateurs gardent la page mais la revalident à chaque affichage : tant
+# que le catalogue n'a pas changé, la réponse est un 304 sans aucun stream gRPC.
+@async_page_condition('catalogue')
+async def dashboard(request: HttpRequest):
     staff_id = request.session.get('staff_id')
     if not staff_id:
         return redirect('staff_login')
 
     query = request.GET.get('q', '')
-    client = LibraryClient()
+    client = AsyncLibraryClient()
     
     # 1. On récupère TOUS les livres pour les stats réelles (indépendant de la recherche)
-    all_books = list(client.search_books("")) 
-    
-    # 2. On récupère les résultats de la recherche pour l'affichage
-    book_results = list(client.search_books(query)) if query else all_books
+    # 2. et, en même temps, les résultats de la recherche pour l'affichage
+    if query:
+        all_books, book_results = await asyncio.gather(client.search_books(""), client.search_books(query))
+    else:
+        all_books = book_results = await client.search_books("")
 
     total_available = sum(b.available_copies for b in all_books)
     # Calcul basé sur la réalité physique des livres existants
@@ -123,6 +196,13 @@ def dashboard(request: HttpRequest):
 #         'username': request.session.get('username'),
 #         'logo_image': "book_covers/ismac_logo.png"
 #     })
+def changed_fields(data, names):
+    """
+    Champs du formulaire dont la valeur diffère de la valeur affichée, que le
+    template renvoie dans un champ caché `original_<nom>`.
+    """
+    return [name for name in names if data.get(name, '').strip() != data.get(f'original_{name}', '').strip()]
+
 def edit_book_view(request, book_id):
     client = LibraryClient()
     
@@ -133,8 +213,7 @@ def edit_book_view(request, book_id):
         # Vérification si une nouvelle image est téléchargée
         image_file = request.FILES.get('image')
         if image_file:
-            fs = FileSystemStorage()
-            new_image_path = fs.save(f'book_covers/{image_file.name}', image_file)
+            new_image_path = default_storage.save(f'book_covers/{image_file.name}', image_file)
         else:
             new_image_path = current_image_url
 
@@ -149,7 +228,15 @@ def edit_book_view(request, book_id):
             image_url=new_image_path  # Ajout de l'image
         )
         
-        response = client.stub.UpdateBookAvailability(updated_book)
+        # Seuls les champs modifiés dans le formulaire sont envoyés (FieldMask) :
+        # un emprunt fait pendant l'édition n'est pas écrasé par l'ancien stock.
+        changed = changed_fields(request.POST, ('title', 'author', 'isbn', 'total_copies', 'available_copies'))
+        if image_file:
+            changed.append('image_url')
+        if not changed:
+            messages.success(request, "Aucune modification.")
+            return redirect('books_list')
+        response = client.update_book(updated_book, fields=changed)
         
         if response.success:
             messages.success(request, f"L'ouvrage '{updated_book.title}' a été mis à jour.")
@@ -158,9 +245,8 @@ def edit_book_view(request, book_id):
             messages.error(request, f"Échec de la mise à jour : {response.message}")
 
     # Récupération des données pour l'affichage
-    try:
-        book_to_edit = client.stub.GetBook(library_pb2.SearchRequest(query=str(book_id)))
-    except Exception:
+    book_to_edit = client.get_book_detail(book_id)
+    if book_to_edit is None:
         messages.error(request, "Erreur lors de la récupération du livre.")
         return redirect('books_list')
 
@@ -168,31 +254,32 @@ def edit_book_view(request, book_id):
 def delete_book(request, book_id):
     client = LibraryClient()
     
-    # On utilise SearchRequest pour envoyer l'ID au serveur via le champ 'query'
-    # comme défini dans votre fichier .proto
-    delete_request = library_pb2.SearchRequest(query=str(book_id))
+    # Appel de la méthode RPC DeleteBook (l'ID passe par le champ 'query')
+    response = client.delete_book(book_id)
     
-    try:
-        # Appel de la méthode RPC DeleteBook
-        response = client.stub.DeleteBook(delete_request)
-        
-        if response.success:
-            messages.success(request, f"Succès : {response.message}")
-        else:
-            messages.error(request, f"Erreur : {response.message}")
-            
-    except Exception as e:
-        messages.error(request, f"Erreur de communication avec le serveur gRPC : {e}")
+    if response.success:
+        messages.success(request, f"Succès : {response.message}")
+    else:
+        messages.error(request, f"Erreur : {response.message}")
     
     # Redirection immédiate vers la liste des livres
     return redirect('books_list')
+@fresh_etag_only
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=page_etag('catalogue'))
 def books_list(request):
     client = LibraryClient()
-    books = list(client.search_books(query=""))
-    return render(request, 'client_app/books_list.html', {'books': books})
-
-def return_book_view(request):
-    client = LibraryClient()
+    # Les lignes du tableau ne sont recalculées (RPC + rendu) que si le
+    # catalogue a changé depuis la dernière fois.
+    rows = render_fragment(
+        request, 'books_rows', data_version(request_data_versions(request), 'catalogue'),
+        'client_app/fragments/books_rows.html',
+        lambda: {'books': client.search_books(query="")},
+    )
+    return render(request, 'client_app/books_list.html', {'rows': rows})
+
+async def return_book_view(request):
+    client = AsyncLibraryClient()
     # On récupère l'ID du livre si on vient du bouton "Return" du Dashboard
     book_id = request.GET.get('book_id')
     
@@ -201,15 +288,15 @@ def return_book_view(request):
         book_id = request.POST.get('book_id')
         
         # Appel gRPC pour traiter le retour
-        response = client.return_book(member_id, book_id)
+        response = await client.return_book(member_id, book_id)
         if response.success:
             messages.success(request, response.message)
             return redirect('dashboard')
         else:
             messages.error(request, response.message)
 
-    members = list(client.get_all_members())
-    books = list(client.search_books(query=""))
+    # Les deux listes sont indépendantes : demandées en parallèle.
+    members, books = await asyncio.gather(client.get_all_members(), client.search_books(query=""))
     
     return render(request, 'client_app/issue_book.html', {
         'members': members,
@@ -295,8 +382,7 @@ def add_book(request: HttpRequest):
         image_file = request.FILES.get('image')
         image_path_string = None
         if image_file:
-            fs = FileSystemStorage()
-            image_path_string = fs.save(f'book_covers/{image_file.name}', image_file)
+            image_path_string = default_storage.save(f'book_covers/{image_file.name}', image_file)
 
         client = LibraryClient()
         response = client.create_book(
@@ -314,13 +400,13 @@ def add_book(request: HttpRequest):
     return render(request, 'client_app/add_book.html', {'title': "Add New Book"})
 
 # --- Section Membres dans client_app/views.py ---
-def issue_book_view(request):
-    client = LibraryClient()
+async def issue_book_view(request):
+    client = AsyncLibraryClient()
     book_id = request.GET.get('book_id')
     member_id = request.GET.get('member_id') 
     
-    members = list(client.get_all_members())
-    books = list(client.search_books(query=""))
+    # Les deux listes sont indépendantes : demandées en parallèle.
+    members, books = await asyncio.gather(client.get_all_members(), client.search_books(query=""))
     
     target_book = next((b for b in books if str(b.id) == str(book_id)), None)
     
@@ -334,9 +420,9 @@ def issue_book_view(request):
         b_id = request.POST.get('book_id')
 
         if action == "borrow":
-            response = client.borrow_book(m_id, int(b_id))
+            response = await client.borrow_book(m_id, int(b_id))
         elif action == "return":
-            response = client.return_book(m_id, int(b_id))
+            response = await client.return_book(m_id, int(b_id))
         
         if response.success:
             messages.success(request, response.message)
@@ -351,17 +437,68 @@ def issue_book_view(request):
         'is_return_mode': is_return_mode,
         'default_due_date': (timezone.now() + timedelta(days=14)).strftime('%Y-%m-%d')
     })
+def scan_desk(request):
+    """
+    Comptoir à douchette : la carte du membre puis les ISBN, chacun validé par
+    la touche Entrée du scanner. Un seul appel gRPC par livre (ScanCheckout ou
+    ScanReturn) ; le code membre reste rempli pour les livres suivants.
+    """
+    if not request.session.get('staff_id'):
+        return redirect('staff_login')
+
+    mode = 'return' if request.POST.get('mode', request.GET.get('mode')) == 'return' else 'checkout'
+    member_code = request.POST.get('member_code', request.GET.get('member', '')).strip()
+
+    if request.method == 'POST':
+        client = LibraryClient()
+        scan = client.scan_return if mode == 'return' else client.scan_checkout
+        response = scan(member_code, request.POST.get('isbn', '').strip())
+        if response.success:
+            messages.success(request, response.message)
+        else:
+            messages.error(request, response.message)
+        return redirect(f"{reverse('scan_desk')}?{urlencode({'mode': mode, 'member': member_code})}")
+
+    return render(request, 'client_app/scan_desk.html', {
+        'mode': mode,
+        'member_code': member_code,
+        'username': request.session.get('username'),
+    })
+
 def members_list(request):
-    """Affiche la liste complète des membres récupérée via gRPC."""
+    """
+    Liste des membres, page par page. La recherche (?q=, préfixe du nom, de
+    l'email, du téléphone ou du code membre) et le filtre ?status=active|inactive
+    sont faits par le serveur ; ?page= est le jeton de la page demandée.
+    """
     if not request.session.get('staff_id'):
         return redirect('staff_login')
-        
-    client = LibraryClient()
-    
-    members_grpc = list(client.get_all_members()) 
-    
+
+    query = request.GET.get('q', '').strip()
+    status = request.GET.get('status', '')
+    if status not in ('active', 'inactive'):
+        status = ''
+    page_token = request.GET.get('page', '')
+
+    def get_context():
+        members, next_token = LibraryClient().search_members(query, status, page_token)
+        next_page_url = ''
+        if next_token:
+            next_page_url = '?' + urlencode({'q': query, 'status': status, 'page': next_token})
+        return {'members': members, 'next_page_url': next_page_url, 'query': query}
+
+    # Une entrée de cache par recherche et par page (urlencode : clé sans espaces).
+    name = 'members_rows:' + urlencode({'q': query, 'status': status, 'page': page_token})
+    rows = render_fragment(
+        request, name, data_version(request_data_versions(request), 'members'),
+        'client_app/fragments/members_rows.html', get_context,
+    )
+
     context = {
-        'members': members_grpc,
+        'rows': rows,
+        'query': query,
+        'status': status,
+        'first_page': not page_token,
         'title': "Gestion des Membres",
         'username': request.session.get('username'), # Pour le panel de profil
         'logo_image': "book_covers/ismac_logo.png",
@@ -401,12 +538,15 @@ def edit_member(request, member_id):
     client = LibraryClient()
     
     if request.method == 'POST':
-        client.update_member(
-            m_id=str(member_id), # gRPC attend souvent des strings pour les IDs
-            name=request.POST.get('full_name'),
-            email=request.POST.get('email'),
-            phone=request.POST.get('phone')
-        )
+        changed = changed_fields(request.POST, ('full_name', 'email', 'phone'))
+        if changed:
+            client.update_member(
+                m_id=str(member_id), # gRPC attend souvent des strings pour les IDs
+                name=request.POST.get('full_name'),
+                email=request.POST.get('email'),
+                phone=request.POST.get('phone'),
+                fields=changed,
+            )
         return redirect('members_list')
     
     # Si GET : on récupère les détails pour remplir le formulaire
@@ -497,7 +637,11 @@ def users_list(request: HttpRequest):
         return redirect('staff_login')
         
     client = LibraryClient()
-    user_results = client.get_all_users()
+    rows = render_fragment(
+        request, 'users_rows', data_version(request_data_versions(request), 'users'),
+        'client_app/fragments/users_rows.html',
+        lambda: {'user_results': client.get_all_users()},
+    )
     
     list_message = request.session.pop('list_message', None)
     list_error = request.session.pop('list_error', None)
@@ -505,7 +649,7 @@ def users_list(request: HttpRequest):
     context = {
         'username_session': request.session.get('username'),
         'title': "Liste des Utilisateurs Staff",
-        'user_results': user_results,
+        'rows': rows,
         'message': list_message,
         'error_message': list_error
     }
@@ -646,4 +790,50 @@ def staff_profile(request: HttpRequest):
 
 
     # Re-render the page with success/error messages
-    return render(request, 'client_app/staff_profile.html', context)
\ No newline at end of file
+    return render(request, 'client_app/staff_profile.html', context)
+
+
+# ----------------------------------------------------
+# E. Kiosk JSON API (lecture seule)
+# ----------------------------------------------------
+
+def book_to_dict(book):
+    return {
+        'id': book.id, 'title': book.title, 'author': book.author, 'isbn': book.isbn,
+        'total_copies': book.total_copies, 'available_copies': book.available_copies,
+        'image_url': book.image_url,
+    }
+
+
+def catalogue_etag(request, *args, **kwargs):
+    return versioned_etag(request, ('catalogue',), request.path, request.GET.urlencode())
+
+
+@require_GET
+@fresh_etag_only
+@cache_control(no_cache=True)
+@condition(etag_func=catalogue_etag)
+def api_books(request):
+    """Catalogue (filtré par ?q=) au format JSON, pour les écrans kiosques."""
+    query = request.GET.get('q', '')
+    version = data_version(request_data_versions(request), 'catalogue')
+    # Le contenu de la réponse est gardé en cache pour cette version du catalogue.
+    payload = cached_for_version(f"api:books:{query}", version, lambda: {
+        'version': version,
+        'books': [book_to_dict(b) for b in LibraryClient().search_books(query)],
+    })
+    return JsonResponse(payload)
+
+
+@require_GET
+@fresh_etag_only
+@cache_control(no_cache=True)
+@condition(etag_func=catalogue_etag)
+def api_book_detail(request, book_id):
+    book = LibraryClient().get_book_detail(book_id)
+    if book is None or not book.id:
+        raise Http404("Livre introuvable.")
+    return JsonResponse({
+        'version': data_version(request_data_versions(request), 'catalogue'),
+        'book': book_to_dict(book),
+    })
@@ -3,6 +3,11 @@ ASGI config for client_web project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. `uvicorn client_web.asgi:application`)
+so that the async views (dashboard, issue_book_view, return_book_view) run
+on the event loop and fan their RPCs out concurrently. Under WSGI they
+still work, but each request then gets its own event loop and channel.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -21,10 +21,8 @@ ALLOWED_HOSTS = ['127.0.0.1', 'localhost'] # Added localhost for clarity
 
 INSTALLED_APPS = [
     # Django Built-in Apps
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
+    # Pas d'admin/auth/contenttypes/sessions : le client n'a pas de base de
+    # données, l'authentification est faite par le serveur gRPC (UserLogin).
     'django.contrib.messages',
     'django.contrib.staticfiles',
     
@@ -37,9 +35,10 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'client_app.middleware.ReadStatusMiddleware',
+    'client_app.middleware.StaffContextMiddleware',
 ]
 
 ROOT_URLCONF = 'client_web.urls'
@@ -53,11 +52,11 @@ TEMPLATES = [
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 # Custom context processor for media URL visibility in all templates
                  
                 'client_app.context_processors.global_images', # 👈 AJOUTEZ ÇA
+                'client_app.context_processors.grpc_read_status',
             ],
         },
     },
@@ -66,13 +65,22 @@ TEMPLATES = [
 WSGI_APPLICATION = 'client_web.wsgi.application'
 
 
-# Database (Used for sessions, auth, and client-side functionality)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Database
+# Aucune : toutes les données viennent du serveur gRPC et la session est
+# stockée dans un cookie signé. Le client est donc sans état et plusieurs
+# instances peuvent tourner derrière un load balancer (voir README, "Multi-node
+# client"), à condition de partager SECRET_KEY et le stockage des médias.
+DATABASES = {}
+
+# Sessions
+# Cookie signé avec SECRET_KEY (contenu lisible, non modifiable). Pour des
+# sessions révocables côté serveur, utiliser un cache partagé :
+#   SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+#   CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#                         'LOCATION': 'redis://cache-host:6379'}}
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+SESSION_COOKIE_AGE = 8 * 60 * 60  # une journée de travail
+SESSION_COOKIE_HTTPONLY = True
 
 
 # Password validation
@@ -102,6 +110,78 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # e.g., files will be accessed via http://127.0.0.1:8000/media/...
 MEDIA_URL = '/media/'
 
+# 3. Storage backend used for uploads (views use default_storage). With several
+# client nodes, MEDIA_ROOT must be a shared volume, or this backend an object
+# store (e.g. django-storages).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 
 # Default primary key field type
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# gRPC client
+# Serveurs gRPC : une adresse, une liste statique ('host:port', résolue au
+# démarrage) ou un nom DNS à plusieurs adresses ('dns:///library-grpc:50051').
+# Les appels sont répartis selon GRPC_LOAD_BALANCING ; avec GRPC_HEALTH_CHECK,
+# un serveur qui ne répond pas SERVING au health check gRPC (base injoignable,
+# arrêt en cours) est écarté. Avec plusieurs serveurs, le réplica du catalogue
+# et les caches indexés par GetDataVersion sont désactivés (versions propres
+# à chaque serveur).
+GRPC_SERVER_TARGETS = ['localhost:50051']
+GRPC_LOAD_BALANCING = 'round_robin'
+GRPC_HEALTH_CHECK = True
+
+# Compression des requêtes envoyées au serveur ('gzip', 'deflate' ou None).
+
+GRPC_COMPRESSION = None
+GRPC_COMPRESSION_THRESHOLD = 1024
+GRPC_METHOD_COMPRESSION = {}
+
+# Délais (secondes) par RPC, en complément de grpc_client.RPC_TIMEOUTS,
+# retry policy des lectures idempotentes et délai de hedging (None = désactivé).
+GRPC_DEFAULT_TIMEOUT = 5.0
+GRPC_TIMEOUTS = {}
+GRPC_RETRY_POLICY = {
+    'maxAttempts': 3,
+    'initialBackoff': '0.1s',
+    'maxBackoff': '1s',
+    'backoffMultiplier': 2,
+    'retryableStatusCodes': ['UNAVAILABLE', 'RESOURCE_EXHAUSTED'],
+}
+GRPC_HEDGING_DELAY = None
+
+# Lectures servies depuis le cache quand le serveur échoue ou répond en plus de
+# GRPC_READ_STALE_AFTER secondes (données de moins de MAX_STALENESS secondes).
+GRPC_READ_STALE_AFTER = 1.0
+GRPC_READ_CACHE_MAX_STALENESS = 300.0
+GRPC_READ_CACHE_MAX_ENTRIES = 256
+GRPC_CIRCUIT_BREAKER = {
+    'failure_threshold': 5,
+    'reset_timeout': 10.0,
+}
+
+# Réplica local du catalogue alimenté par le flux WatchInventory : les listes
+# de livres sont lues en mémoire. Après une écriture, attente maximale (s) de
+# l'événement correspondant avant d'afficher la page suivante.
+GRPC_INVENTORY_REPLICA = True
+GRPC_REPLICA_WRITE_WAIT = 0.5
+
+# Cache des fragments de listes (livres, membres, utilisateurs), indexé par la
+# version des données renvoyée par GetDataVersion. En mode multi-nœuds, un
+# cache partagé (Redis, Memcached) évite de recalculer les fragments par nœud.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+FRAGMENT_CACHE_TIMEOUT = 600
+
+# Liste des membres : nombre de membres par page (recherche côté serveur).
+MEMBERS_PAGE_SIZE = 50
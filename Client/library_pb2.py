@@ -22,35 +22,88 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rlibrary.proto\x12\x0elibrary_system\"2\n\x0cLoginRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"B\n\rLoginResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"Z\n\x06Member\x12\n\n\x02id\x18\x01 \x01(\t\x12\x11\n\tfull_name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\r\n\x05phone\x18\x04 \x01(\t\x12\x13\n\x0b\x64\x61te_joined\x18\x05 \x01(\t\"\x82\x01\n\x04\x42ook\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x03 \x01(\t\x12\x0c\n\x04isbn\x18\x04 \x01(\t\x12\x14\n\x0ctotal_copies\x18\x05 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x06 \x01(\x05\x12\x11\n\timage_url\x18\x07 \x01(\t\"\x1e\n\rSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\"E\n\x0eStatusResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tentity_id\x18\x03 \x01(\x05\"3\n\rBorrowRequest\x12\x11\n\tmember_id\x18\x01 \x01(\t\x12\x0f\n\x07\x62ook_id\x18\x02 \x01(\x05\"\x81\x01\n\x14UpdateProfileRequest\x12\x10\n\x08staff_id\x18\x01 \x01(\t\x12\x14\n\x0cnew_username\x18\x02 \x01(\t\x12\x11\n\tnew_email\x18\x03 \x01(\t\x12\x18\n\x10\x63urrent_password\x18\x04 \x01(\t\x12\x14\n\x0cnew_password\x18\x05 \x01(\t\"\x8e\x01\n\nUserDetail\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x10\n\x08is_staff\x18\x04 \x01(\x08\x12\x11\n\tis_active\x18\x05 \x01(\x08\x12\x13\n\x0b\x64\x61te_joined\x18\x06 \x01(\t\x12\x14\n\x0cis_superuser\x18\x07 \x01(\x08\" \n\rUserIdRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t2\x8f\n\n\x0eLibraryService\x12H\n\tUserLogin\x12\x1c.library_system.LoginRequest\x1a\x1d.library_system.LoginResponse\x12\x46\n\x0c\x43reateMember\x12\x16.library_system.Member\x1a\x1e.library_system.StatusResponse\x12\x46\n\x0cUpdateMember\x12\x16.library_system.Member\x1a\x1e.library_system.StatusResponse\x12M\n\x0c\x44\x65leteMember\x12\x1d.library_system.UserIdRequest\x1a\x1e.library_system.StatusResponse\x12H\n\rGetAllMembers\x12\x1d.library_system.SearchRequest\x1a\x16.library_system.Member0\x01\x12H\n\x0fGetMemberDetail\x12\x1d.library_system.UserIdRequest\x1a\x16.library_system.Member\x12\x42\n\nCreateBook\x12\x14.library_system.Book\x1a\x1e.library_system.StatusResponse\x12\x44\n\x0bSearchBooks\x12\x1d.library_system.SearchRequest\x1a\x14.library_system.Book0\x01\x12>\n\x07GetBook\x12\x1d.library_system.SearchRequest\x1a\x14.library_system.Book\x12N\n\x16UpdateBookAvailability\x12\x14.library_system.Book\x1a\x1e.library_system.StatusResponse\x12K\n\nDeleteBook\x12\x1d.library_system.SearchRequest\x1a\x1e.library_system.StatusResponse\x12K\n\nBorrowBook\x12\x1d.library_system.BorrowRequest\x1a\x1e.library_system.StatusResponse\x12K\n\nReturnBook\x12\x1d.library_system.BorrowRequest\x1a\x1e.library_system.StatusResponse\x12J\n\x0bGetAllUsers\x12\x1d.library_system.SearchRequest\x1a\x1a.library_system.UserDetail0\x01\x12J\n\rGetUserDetail\x12\x1d.library_system.UserIdRequest\x1a\x1a.library_system.UserDetail\x12K\n\nDeleteUser\x12\x1d.library_system.UserIdRequest\x1a\x1e.library_system.StatusResponse\x12Z\n\x12UpdateStaffProfile\x12$.library_system.UpdateProfileRequest\x1a\x1e.library_system.StatusResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rlibrary.proto\x12\x0elibrary_system\x1a google/protobuf/field_mask.proto\"2\n\x0cLoginRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"W\n\rLoginResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x13\n\x0bstaff_token\x18\x04 \x01(\t\"\xb1\x01\n\x06Member\x12\n\n\x02id\x18\x01 \x01(\t\x12\x11\n\tfull_name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\r\n\x05phone\x18\x04 \x01(\t\x12\x13\n\x0b\x64\x61te_joined\x18\x05 \x01(\t\x12\x11\n\tmember_id\x18\x06 \x01(\t\x12\x11\n\tis_active\x18\x07 \x01(\x08\x12/\n\x0bupdate_mask\x18\x08 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"\xb3\x01\n\x04\x42ook\x12\n\n\x02id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x03 \x01(\t\x12\x0c\n\x04isbn\x18\x04 \x01(\t\x12\x14\n\x0ctotal_copies\x18\x05 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x06 \x01(\x05\x12\x11\n\timage_url\x18\x07 \x01(\t\x12/\n\x0bupdate_mask\x18\x08 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"\x1e\n\rSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\"\xb4\x01\n\x13MemberSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12:\n\x06status\x18\x02 \x01(\x0e\x32*.library_system.MemberSearchRequest.Status\x12\x11\n\tpage_size\x18\x03 \x01(\x05\x12\x12\n\npage_token\x18\x04 \x01(\t\"+\n\x06Status\x12\x07\n\x03\x41LL\x10\x00\x12\n\n\x06\x41\x43TIVE\x10\x01\x12\x0c\n\x08INACTIVE\x10\x02\"`\n\x0eStatusResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tentity_id\x18\x03 \x01(\x05\x12\x19\n\x11inventory_version\x18\x04 \x01(\x03\"3\n\rBorrowRequest\x12\x11\n\tmember_id\x18\x01 \x01(\t\x12\x0f\n\x07\x62ook_id\x18\x02 \x01(\x05\"0\n\x0bScanRequest\x12\x13\n\x0bmember_code\x18\x01 \x01(\t\x12\x0c\n\x04isbn\x18\x02 \x01(\t\"\x81\x01\n\x14UpdateProfileRequest\x12\x10\n\x08staff_id\x18\x01 \x01(\t\x12\x14\n\x0cnew_username\x18\x02 \x01(\t\x12\x11\n\tnew_email\x18\x03 \x01(\t\x12\x18\n\x10\x63urrent_password\x18\x04 \x01(\t\x12\x14\n\x0cnew_password\x18\x05 \x01(\t\"\x8e\x01\n\nUserDetail\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x10\n\x08is_staff\x18\x04 \x01(\x08\x12\x11\n\tis_active\x18\x05 \x01(\x08\x12\x13\n\x0b\x64\x61te_joined\x18\x06 \x01(\t\x12\x14\n\x0cis_superuser\x18\x07 \x01(\x08\" \n\rUserIdRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"=\n\x15WatchInventoryRequest\x12\r\n\x05\x65poch\x18\x01 \x01(\t\x12\x15\n\rsince_version\x18\x02 \x01(\x03\"\xee\x01\n\x0eInventoryEvent\x12\x31\n\x04kind\x18\x01 \x01(\x0e\x32#.library_system.InventoryEvent.Kind\x12\x0f\n\x07version\x18\x02 \x01(\x03\x12\r\n\x05\x65poch\x18\x03 \x01(\t\x12\"\n\x04\x62ook\x18\x04 \x01(\x0b\x32\x14.library_system.Book\"e\n\x04Kind\x12\t\n\x05RESET\x10\x00\x12\x0c\n\x08SNAPSHOT\x10\x01\x12\n\n\x06SYNCED\x10\x02\x12\x0b\n\x07\x43REATED\x10\x03\x12\x0b\n\x07UPDATED\x10\x04\x12\x0b\n\x07\x44\x45LETED\x10\x05\x12\x11\n\rSTOCK_CHANGED\x10\x06\" \n\x0eMetricsRequest\x12\x0e\n\x06prefix\x18\x01 \x01(\t\"}\n\x0fMetricsResponse\x12;\n\x06values\x18\x01 \x03(\x0b\x32+.library_system.MetricsResponse.ValuesEntry\x1a-\n\x0bValuesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"\x14\n\x12\x44\x61taVersionRequest\"f\n\x13\x44\x61taVersionResponse\x12\r\n\x05\x65poch\x18\x01 \x01(\t\x12\x11\n\tcatalogue\x18\x02 \x01(\x03\x12\x0f\n\x07members\x18\x03 \x01(\x03\x12\r\n\x05users\x18\x04 \x01(\x03\x12\r\n\x05loans\x18\x05 \x01(\x03\"\x88\x01\n\x0f\x42\x61tchGetRequest\x12\x0c\n\x04keys\x18\x01 \x03(\t\x12\x39\n\x08key_type\x18\x02 \x01(\x0e\x32\'.library_system.BatchGetRequest.KeyType\",\n\x07KeyType\x12\x06\n\x02ID\x10\x00\x12\x08\n\x04ISBN\x10\x01\x12\x0f\n\x0bMEMBER_CODE\x10\x02\"L\n\nBookResult\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05\x66ound\x18\x02 \x01(\x08\x12\"\n\x04\x62ook\x18\x03 \x01(\x0b\x32\x14.library_system.Book\"D\n\x15\x42\x61tchGetBooksResponse\x12+\n\x07results\x18\x01 \x03(\x0b\x32\x1a.library_system.BookResult\"R\n\x0cMemberResult\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05\x66ound\x18\x02 \x01(\x08\x12&\n\x06member\x18\x03 \x01(\x0b\x32\x16.library_system.Member\"H\n\x17\x42\x61tchGetMembersResponse\x12-\n\x07results\x18\x01 \x03(\x0b\x32\x1c.library_system.MemberResult\"\'\n\x13\x41vailabilityRequest\x12\x10\n\x08\x62ook_ids\x18\x01 \x03(\x05\"X\n\x14\x41vailabilityResponse\x12\x10\n\x08\x62ook_ids\x18\x01 \x03(\x05\x12\x18\n\x10\x61vailable_copies\x18\x02 \x03(\x05\x12\x14\n\x0ctotal_copies\x18\x03 \x03(\x05\"6\n\x0eProfileRequest\x12\x0f\n\x07seconds\x18\x01 \x01(\x01\x12\x13\n\x0binterval_ms\x18\x02 \x01(\x05\"M\n\x0fProfileResponse\x12\x18\n\x10\x63ollapsed_stacks\x18\x01 \x01(\t\x12\x0f\n\x07samples\x18\x02 \x01(\x05\x12\x0f\n\x07seconds\x18\x03 \x01(\x01\"\xa5\x01\n\x12MemoryTraceRequest\x12\x39\n\x06\x61\x63tion\x18\x01 \x01(\x0e\x32).library_system.MemoryTraceRequest.Action\x12\x0b\n\x03top\x18\x02 \x01(\x05\x12\x0e\n\x06\x66rames\x18\x03 \x01(\x05\"7\n\x06\x41\x63tion\x12\n\n\x06STATUS\x10\x00\x12\t\n\x05START\x10\x01\x12\x0c\n\x08SNAPSHOT\x10\x02\x12\x08\n\x04STOP\x10\x03\"c\n\x0e\x41llocationSite\x12\x10\n\x08location\x18\x01 \x01(\t\x12\x17\n\x0fsize_diff_bytes\x18\x02 \x01(\x03\x12\x12\n\nsize_bytes\x18\x03 \x01(\x03\x12\x12\n\ncount_diff\x18\x04 \x01(\x03\"\x80\x01\n\x13MemoryTraceResponse\x12\x0f\n\x07tracing\x18\x01 \x01(\x08\x12\x15\n\rcurrent_bytes\x18\x02 \x01(\x03\x12\x12\n\npeak_bytes\x18\x03 \x01(\x03\x12-\n\x05sites\x18\x04 \x03(\x0b\x32\x1e.library_system.AllocationSite2\xf7\x10\n\x0eLibraryService\x12H\n\tUserLogin\x12\x1c.library_system.LoginRequest\x1a\x1d.library_system.LoginResponse\x12\x46\n\x0c\x43reateMember\x12\x16.library_system.Member\x1a\x1e.library_system.StatusResponse\x12\x46\n\x0cUpdateMember\x12\x16.library_system.Member\x1a\x1e.library_system.StatusResponse\x12M\n\x0c\x44\x65leteMember\x12\x1d.library_system.UserIdRequest\x1a\x1e.library_system.StatusResponse\x12N\n\rGetAllMembers\x12#.library_system.MemberSearchRequest\x1a\x16.library_system.Member0\x01\x12H\n\x0fGetMemberDetail\x12\x1d.library_system.UserIdRequest\x1a\x16.library_system.Member\x12[\n\x0f\x42\x61tchGetMembers\x12\x1f.library_system.BatchGetRequest\x1a\'.library_system.BatchGetMembersResponse\x12\x42\n\nCreateBook\x12\x14.library_system.Book\x1a\x1e.library_system.StatusResponse\x12\x44\n\x0bSearchBooks\x12\x1d.library_system.SearchRequest\x1a\x14.library_system.Book0\x01\x12>\n\x07GetBook\x12\x1d.library_system.SearchRequest\x1a\x14.library_system.Book\x12W\n\rBatchGetBooks\x12\x1f.library_system.BatchGetRequest\x1a%.library_system.BatchGetBooksResponse\x12\\\n\x0fGetAvailability\x12#.library_system.AvailabilityRequest\x1a$.library_system.AvailabilityResponse\x12N\n\x16UpdateBookAvailability\x12\x14.library_system.Book\x1a\x1e.library_system.StatusResponse\x12K\n\nDeleteBook\x12\x1d.library_system.SearchRequest\x1a\x1e.library_system.StatusResponse\x12K\n\nBorrowBook\x12\x1d.library_system.BorrowRequest\x1a\x1e.library_system.StatusResponse\x12K\n\nReturnBook\x12\x1d.library_system.BorrowRequest\x1a\x1e.library_system.StatusResponse\x12K\n\x0cScanCheckout\x12\x1b.library_system.ScanRequest\x1a\x1e.library_system.StatusResponse\x12I\n\nScanReturn\x12\x1b.library_system.ScanRequest\x1a\x1e.library_system.StatusResponse\x12J\n\x0bGetAllUsers\x12\x1d.library_system.SearchRequest\x1a\x1a.library_system.UserDetail0\x01\x12J\n\rGetUserDetail\x12\x1d.library_system.UserIdRequest\x1a\x1a.library_system.UserDetail\x12K\n\nDeleteUser\x12\x1d.library_system.UserIdRequest\x1a\x1e.library_system.StatusResponse\x12Z\n\x12UpdateStaffProfile\x12$.library_system.UpdateProfileRequest\x1a\x1e.library_system.StatusResponse\x12Y\n\x0eWatchInventory\x12%.library_system.WatchInventoryRequest\x1a\x1e.library_system.InventoryEvent0\x01\x12S\n\x10GetServerMetrics\x12\x1e.library_system.MetricsRequest\x1a\x1f.library_system.MetricsResponse\x12Y\n\x0eGetDataVersion\x12\".library_system.DataVersionRequest\x1a#.library_system.DataVersionResponse\x12Q\n\x0e\x43\x61ptureProfile\x12\x1e.library_system.ProfileRequest\x1a\x1f.library_system.ProfileResponse\x12V\n\x0bTraceMemory\x12\".library_system.MemoryTraceRequest\x1a#.library_system.MemoryTraceResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'library_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_LOGINREQUEST']._serialized_start=33
-  _globals['_LOGINREQUEST']._serialized_end=83
-  _globals['_LOGINRESPONSE']._serialized_start=85
-  _globals['_LOGINRESPONSE']._serialized_end=151
-  _globals['_MEMBER']._serialized_start=153
-  _globals['_MEMBER']._serialized_end=243
-  _globals['_BOOK']._serialized_start=246
-  _globals['_BOOK']._serialized_end=376
-  _globals['_SEARCHREQUEST']._serialized_start=378
-  _globals['_SEARCHREQUEST']._serialized_end=408
-  _globals['_STATUSRESPONSE']._serialized_start=410
-  _globals['_STATUSRESPONSE']._serialized_end=479
-  _globals['_BORROWREQUEST']._serialized_start=481
-  _globals['_BORROWREQUEST']._serialized_end=532
-  _globals['_UPDATEPROFILEREQUEST']._serialized_start=535
-  _globals['_UPDATEPROFILEREQUEST']._serialized_end=664
-  _globals['_USERDETAIL']._serialized_start=667
-  _globals['_USERDETAIL']._serialized_end=809
-  _globals['_USERIDREQUEST']._serialized_start=811
-  _globals['_USERIDREQUEST']._serialized_end=843
-  _globals['_LIBRARYSERVICE']._serialized_start=846
-  _globals['_LIBRARYSERVICE']._serialized_end=2141
+  _globals['_METRICSRESPONSE_VALUESENTRY']._loaded_options = None
+  _globals['_METRICSRESPONSE_VALUESENTRY']._serialized_options = b'8\001'
+  _globals['_LOGINREQUEST']._serialized_start=67
+  _globals['_LOGINREQUEST']._serialized_end=117
+  _globals['_LOGINRESPONSE']._serialized_start=119
+  _globals['_LOGINRESPONSE']._serialized_end=206
+  _globals['_MEMBER']._serialized_start=209
+  _globals['_MEMBER']._serialized_end=386
+  _globals['_BOOK']._serialized_start=389
+  _globals['_BOOK']._serialized_end=568
+  _globals['_SEARCHREQUEST']._serialized_start=570
+  _globals['_SEARCHREQUEST']._serialized_end=600
+  _globals['_MEMBERSEARCHREQUEST']._serialized_start=603
+  _globals['_MEMBERSEARCHREQUEST']._serialized_end=783
+  _globals['_MEMBERSEARCHREQUEST_STATUS']._serialized_start=740
+  _globals['_MEMBERSEARCHREQUEST_STATUS']._serialized_end=783
+  _globals['_STATUSRESPONSE']._serialized_start=785
+  _globals['_STATUSRESPONSE']._serialized_end=881
+  _globals['_BORROWREQUEST']._serialized_start=883
+  _globals['_BORROWREQUEST']._serialized_end=934
+  _globals['_SCANREQUEST']._serialized_start=936
+  _globals['_SCANREQUEST']._serialized_end=984
+  _globals['_UPDATEPROFILEREQUEST']._serialized_start=987
+  _globals['_UPDATEPROFILEREQUEST']._serialized_end=1116
+  _globals['_USERDETAIL']._serialized_start=1119
+  _globals['_USERDETAIL']._serialized_end=1261
+  _globals['_USERIDREQUEST']._serialized_start=1263
+  _globals['_USERIDREQUEST']._serialized_end=1295
+  _globals['_WATCHINVENTORYREQUEST']._serialized_start=1297
+  _globals['_WATCHINVENTORYREQUEST']._serialized_end=1358
+  _globals['_INVENTORYEVENT']._serialized_start=1361
+  _globals['_INVENTORYEVENT']._serialized_end=1599
+  _globals['_INVENTORYEVENT_KIND']._serialized_start=1498
+  _globals['_INVENTORYEVENT_KIND']._serialized_end=1599
+  _globals['_METRICSREQUEST']._serialized_start=1601
+  _globals['_METRICSREQUEST']._serialized_end=1633
+  _globals['_METRICSRESPONSE']._serialized_start=1635
+  _globals['_METRICSRESPONSE']._serialized_end=1760
+  _globals['_METRICSRESPONSE_VALUESENTRY']._serialized_start=1715
+  _globals['_METRICSRESPONSE_VALUESENTRY']._serialized_end=1760
+  _globals['_DATAVERSIONREQUEST']._serialized_start=1762
+  _globals['_DATAVERSIONREQUEST']._serialized_end=1782
+  _globals['_DATAVERSIONRESPONSE']._serialized_start=1784
+  _globals['_DATAVERSIONRESPONSE']._serialized_end=1886
+  _globals['_BATCHGETREQUEST']._serialized_start=1889
+  _globals['_BATCHGETREQUEST']._serialized_end=2025
+  _globals['_BATCHGETREQUEST_KEYTYPE']._serialized_start=1981
+  _globals['_BATCHGETREQUEST_KEYTYPE']._serialized_end=2025
+  _globals['_BOOKRESULT']._serialized_start=2027
+  _globals['_BOOKRESULT']._serialized_end=2103
+  _globals['_BATCHGETBOOKSRESPONSE']._serialized_start=2105
+  _globals['_BATCHGETBOOKSRESPONSE']._serialized_end=2173
+  _globals['_MEMBERRESULT']._serialized_start=2175
+  _globals['_MEMBERRESULT']._serialized_end=2257
+  _globals['_BATCHGETMEMBERSRESPONSE']._serialized_start=2259
+  _globals['_BATCHGETMEMBERSRESPONSE']._serialized_end=2331
+  _globals['_AVAILABILITYREQUEST']._serialized_start=2333
+  _globals['_AVAILABILITYREQUEST']._serialized_end=2372
+  _globals['_AVAILABILITYRESPONSE']._serialized_start=2374
+  _globals['_AVAILABILITYRESPONSE']._serialized_end=2462
+  _globals['_PROFILEREQUEST']._serialized_start=2464
+  _globals['_PROFILEREQUEST']._serialized_end=2518
+  _globals['_PROFILERESPONSE']._serialized_start=2520
+  _globals['_PROFILERESPONSE']._serialized_end=2597
+  _globals['_MEMORYTRACEREQUEST']._serialized_start=2600
+  _globals['_MEMORYTRACEREQUEST']._serialized_end=2765
+  _globals['_MEMORYTRACEREQUEST_ACTION']._serialized_start=2710
+  _globals['_MEMORYTRACEREQUEST_ACTION']._serialized_end=2765
+  _globals['_ALLOCATIONSITE']._serialized_start=2767
+  _globals['_ALLOCATIONSITE']._serialized_end=2866
+  _globals['_MEMORYTRACERESPONSE']._serialized_start=2869
+  _globals['_MEMORYTRACERESPONSE']._serialized_end=2997
+  _globals['_LIBRARYSERVICE']._serialized_start=3000
+  _globals['_LIBRARYSERVICE']._serialized_end=5167
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,140 @@
+import threading
+from array import array
+from bisect import bisect_left
+
+# ----------------------------------------------------
+# In-memory availability index (used by the GetAvailability RPC)
+# ----------------------------------------------------
+
+MISSING = -1
+
+
+class AvailabilityIndex:
+    """
+    Stock of every book in three parallel columns: the book ids, sorted
+    (array of int64), and their available / total copies (arrays of int32).
+    A book is found by bisection on the ids, so the index costs 16 bytes per
+    book, against ~130 for a dict of tuples and ~450 for a Book instance
+    (benchmarks/availability_benchmark.py).
+
+    The write handlers set the committed values of a book once their
+    transaction has committed, in commit order (inventory_feed.book_locks).
+    load() reads the database without blocking them nor the lookups, then
+    swaps the new columns in and applies again the writes made meanwhile: the
+    scan may have read a row before or after such a write.
+    """
+
+    def __init__(self):
+        self._ids = array('q')
+        self._available = array('i')
+        self._total = array('i')
+        self.loaded = False
+        # Écritures faites pendant un load() : id -> (available, total), None = supprimé.
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def load(self, rows=None):
+        """
+        Replaces the content with `rows` of (id, available, total) ordered by
+        id, by default every Book row.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._pending = {}
+        try:
+            if rows is None:
+                from library_admin.models import Book
+                rows = Book.objects.order_by('id').values_list('id', 'available_copies', 'total_copies').iterator()
+            ids, available, total = array('q'), array('i'), array('i')
+            for book_id, book_available, book_total in rows:
+                ids.append(book_id)
+                available.append(book_available)
+                total.append(book_total)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._ids, self._available, self._total = ids, available, total
+            for book_id, values in self._pending.items():
+                if values is None:
+                    self._remove(book_id)
+                else:
+                    self._set(book_id, *values)
+            self._pending = None
+            self.loaded = True
+
+    def _position(self, book_id):
+        position = bisect_left(self._ids, book_id)
+        if position < len(self._ids) and self._ids[position] == book_id:
+            return position
+        return None
+
+    def _set(self, book_id, available, total):
+        position = bisect_left(self._ids, book_id)
+        if position < len(self._ids) and self._ids[position] == book_id:
+            self._available[position] = available
+            self._total[position] = total
+        else:
+            # Ids are auto-incremented: a new book is nearly always appended.
+            self._ids.insert(position, book_id)
+            self._available.insert(position, available)
+            self._total.insert(position, total)
+
+    def _remove(self, book_id):
+        position = self._position(book_id)
+        if position is not None:
+            del self._ids[position]
+            del self._available[position]
+            del self._total[position]
+
+    def set(self, book_id, available, total):
+        """Committed stock of a book (new book, borrow, return, update)."""
+        with self._lock:
+            self._set(book_id, available, total)
+            if self._pending is not None:
+                self._pending[book_id] = (available, total)
+
+    def remove(self, book_id):
+        with self._lock:
+            self._remove(book_id)
+            if self._pending is not None:
+                self._pending[book_id] = None
+
+    def get(self, book_id):
+        """(available, total), or None for an unknown book."""
+        with self._lock:
+            position = self._position(book_id)
+            if position is None:
+                return None
+            return self._available[position], self._total[position]
+
+    def get_many(self, book_ids):
+        """(available, total) columns for `book_ids`, MISSING for the unknown ones."""
+        available, total = array('i'), array('i')
+        with self._lock:
+            for book_id in book_ids:
+                position = self._position(book_id)
+                if position is None:
+                    available.append(MISSING)
+                    total.append(MISSING)
+                else:
+                    available.append(self._available[position])
+                    total.append(self._total[position])
+        return available, total
+
+    def columns(self):
+        """Copies of the three columns (every book, by id)."""
+        with self._lock:
+            return array('q', self._ids), array('i', self._available), array('i', self._total)
+
+    def memory(self):
+        """Bytes used by the columns (allocated capacity not included)."""
+        return sum(column.itemsize * len(column) for column in (self._ids, self._available, self._total))
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,117 @@
+"""
+Memory per book and lookup rate of the availability index
+(availability_index.AvailabilityIndex, GetAvailability RPC).
+
+  1. memory per book of the index filled with `books` synthetic books,
+     against a dict {id: (available, total)} and Book instances;
+  2. lookups per second in that index: single books, batches of 100, and
+     the GetAvailability handler (protobuf response included);
+  3. on the database of DJANGO_SETTINGS_MODULE: load time of the index and
+     batches of 100 books read from the index against the same batches read
+     with the ORM (values_list, id__in).
+
+Usage: python benchmarks/availability_benchmark.py [books] [lookups]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+from grpc_handler import LibraryServicer
+from availability_index import AvailabilityIndex, availability_index
+from library_admin.models import Book
+
+import library_pb2
+
+BATCH = 100
+
+
+def allocated(build):
+    """(result of build(), bytes allocated by it)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def rate(label, count, run):
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {count / elapsed:>12,.0f} /s   ({elapsed * 1e6 / count:.2f} µs each)")
+
+
+def rows(books):
+    return ((book_id, book_id % 4, 3) for book_id in range(1, books + 1))
+
+
+def memory_phase(books):
+    index = AvailabilityIndex()
+    index.load(rows(books))
+    _, dict_bytes = allocated(lambda: {book_id: (available, total) for book_id, available, total in rows(books)})
+    sample = min(books, 20000)
+    _, orm_bytes = allocated(lambda: [
+        Book(id=book_id, title=f"Book {book_id}", author="Author", isbn=f"{book_id:013d}",
+             total_copies=total, available_copies=available)
+        for book_id, available, total in rows(sample)
+    ])
+    print(f"{books:,} books")
+    print(f"{'index (array columns)':<40} {index.memory() / books:>8.1f} bytes/book")
+    print(f"{'dict {id: (available, total)}':<40} {dict_bytes / books:>8.1f} bytes/book")
+    print(f"{'Book instances':<40} {orm_bytes / sample:>8.1f} bytes/book")
+    return index
+
+
+def lookup_phase(index, books, lookups):
+    ids = [random.randint(1, books) for _ in range(lookups)]
+    batches = [ids[i:i + BATCH] for i in range(0, lookups, BATCH)]
+    rate("index.get (one book)", lookups, lambda: [index.get(book_id) for book_id in ids])
+    rate(f"index.get_many ({BATCH} books), per book", lookups, lambda: [index.get_many(batch) for batch in batches])
+
+    servicer = LibraryServicer()
+    availability_index.load(rows(books))
+    requests = [library_pb2.AvailabilityRequest(book_ids=batch) for batch in batches]
+    rate(f"GetAvailability ({BATCH} books), per book", lookups,
+         lambda: [servicer.GetAvailability(request, None) for request in requests])
+    started = time.perf_counter()
+    response = servicer.GetAvailability(library_pb2.AvailabilityRequest(), None)
+    size = response.ByteSize()
+    print(f"{'GetAvailability (all books)':<40} {(time.perf_counter() - started) * 1000:>9.1f} ms   "
+          f"({size / 1024:,.0f} KiB, {size / books:.1f} bytes/book)")
+
+
+def database_phase(lookups):
+    index = AvailabilityIndex()
+    started = time.perf_counter()
+    index.load()
+    print(f"database: {len(index):,} books, index loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+    if not len(index):
+        return
+    known = list(index.columns()[0])
+    ids = [random.choice(known) for _ in range(lookups)]
+    batches = [ids[i:i + BATCH] for i in range(0, lookups, BATCH)]
+    rate(f"index.get_many ({BATCH} books), per book", lookups, lambda: [index.get_many(batch) for batch in batches])
+    orm_batches = batches[:max(1, len(batches) // 20)]
+    rate(f"ORM id__in ({BATCH} books), per book", len(orm_batches) * BATCH, lambda: [
+        list(Book.objects.filter(id__in=batch).values_list('id', 'available_copies', 'total_copies'))
+        for batch in orm_batches
+    ])
+
+
+def main():
+    books = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    random.seed(0)
+    index = memory_phase(books)
+    lookup_phase(index, books, lookups)
+    database_phase(lookups)
+
+
+if __name__ == '__main__':
+    main()
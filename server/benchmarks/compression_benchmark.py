@@ -0,0 +1,87 @@
+"""
+Bytes on the wire vs. CPU cost of gRPC message compression for
+catalogue-sized SearchBooks / GetAllMembers streams.
+
+gRPC compresses every message of a stream on its own, so this benchmark
+serializes and compresses message by message, applying the same size
+threshold as interceptors.CompressionInterceptor.
+
+Usage: python benchmarks/compression_benchmark.py [n_books] [threshold]
+"""
+import gzip
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import library_pb2
+
+GRPC_FRAME_HEADER = 5  # 1 byte compressed-flag + 4 bytes length
+
+AUTHORS = ["Alexandre Dumas", "Albert Camus", "Victor Hugo", "Émile Zola", "Gustave Flaubert",
+           "Honoré de Balzac", "Marguerite Duras", "Jules Verne"]
+WORDS = ["Le", "La", "Les", "Comte", "Misérables", "Peste", "Étranger", "Voyage", "Terre",
+         "Lune", "Nuit", "Mer", "Tome", "Histoire", "Amour", "Guerre"]
+
+COMPRESSORS = {
+    'none': None,
+    'gzip': lambda data: gzip.compress(data, mtime=0),
+    'deflate': zlib.compress,
+}
+
+
+def make_books(n):
+    rnd = random.Random(42)
+    return [
+        library_pb2.Book(
+            id=i, title=" ".join(rnd.choices(WORDS, k=4)), author=rnd.choice(AUTHORS),
+            isbn=f"978{i:010d}", total_copies=rnd.randint(1, 10), available_copies=rnd.randint(0, 5),
+            image_url=f"book_covers/{rnd.randint(1000000, 99999999)}-L_{rnd.randbytes(4).hex()}.jpg",
+        )
+        for i in range(n)
+    ]
+
+
+def make_members(n):
+    rnd = random.Random(7)
+    return [
+        library_pb2.Member(
+            id=str(i), full_name=f"{rnd.choice(WORDS)} {rnd.choice(AUTHORS)}",
+            email=f"member{i}@example.org", phone=f"06{rnd.randint(10000000, 99999999)}",
+            date_joined="2025-01-01T10:00:00+00:00",
+        )
+        for i in range(n)
+    ]
+
+
+def run(label, messages, threshold):
+    payloads = [m.SerializeToString() for m in messages]
+    raw = sum(len(p) for p in payloads)
+    print(f"\n{label}: {len(payloads)} messages, {raw} bytes serialized")
+    print(f"{'algorithm':<10}{'wire bytes':>14}{'ratio':>8}{'compressed':>12}{'cpu ms':>10}")
+    for name, compress in COMPRESSORS.items():
+        wire = compressed = 0
+        start = time.process_time()
+        for data in payloads:
+            if compress and len(data) >= threshold:
+                data = compress(data)
+                compressed += 1
+            wire += len(data) + GRPC_FRAME_HEADER
+        cpu = (time.process_time() - start) * 1000
+        print(f"{name:<10}{wire:>14}{wire / (raw + GRPC_FRAME_HEADER * len(payloads)):>8.2f}"
+              f"{compressed:>12}{cpu:>10.1f}")
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    print(f"threshold = {threshold} bytes")
+    run("SearchBooks stream", make_books(n), threshold)
+    run("GetAllMembers stream", make_members(n), threshold)
+    if threshold:
+        print("\nSame streams with every message compressed (threshold = 0):")
+        run("SearchBooks stream", make_books(n), 0)
+        run("GetAllMembers stream", make_members(n), 0)
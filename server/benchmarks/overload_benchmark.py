@@ -0,0 +1,78 @@
+"""
+Synthetic overload against a running gRPC server.
+
+`clients` threads loop on full-catalogue SearchBooks streams, waiting the
+`grpc-retry-pushback-ms` hint after a rejection, while one desk thread
+loops on BorrowBook (a short unary call exempt from shedding; an unknown
+book id keeps it read-only). The report shows how many streams were shed
+with RESOURCE_EXHAUSTED and the desk-call latency under that load.
+
+Usage: python benchmarks/overload_benchmark.py [clients] [seconds] [target]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+
+import grpc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import library_pb2
+import library_pb2_grpc
+
+
+def stream_client(stub, deadline, results):
+    while time.monotonic() < deadline:
+        try:
+            list(stub.SearchBooks(library_pb2.SearchRequest(query=""), timeout=30))
+            results['ok'] += 1
+        except grpc.RpcError as e:
+            results[e.code().name] += 1
+            pushback = dict(e.trailing_metadata() or ()).get('grpc-retry-pushback-ms')
+            if pushback:
+                time.sleep(int(pushback) / 1000)
+
+
+def desk_client(stub, deadline, latencies):
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            stub.BorrowBook(library_pb2.BorrowRequest(member_id="0", book_id=0), timeout=30)
+            latencies.append(time.monotonic() - start)
+        except grpc.RpcError:
+            pass
+        time.sleep(0.05)
+
+
+if __name__ == '__main__':
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    target = sys.argv[3] if len(sys.argv) > 3 else 'localhost:50051'
+
+    # Disable client retries: we want to see every rejection.
+    channel = grpc.insecure_channel(target, options=[('grpc.enable_retries', 0)])
+    stub = library_pb2_grpc.LibraryServiceStub(channel)
+    deadline = time.monotonic() + seconds
+    results, latencies = Counter(), []
+
+    threads = [threading.Thread(target=stream_client, args=(stub, deadline, results)) for _ in range(clients)]
+    threads.append(threading.Thread(target=desk_client, args=(stub, deadline, latencies)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"{clients} stream clients for {seconds:.0f}s against {target}")
+    for outcome, count in results.most_common():
+        print(f"  SearchBooks {outcome:<20}{count:>8}")
+    if latencies:
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if len(latencies) >= 100 else latencies[-1]
+        print(f"  BorrowBook p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"max/p99 {p99 * 1000:.1f} ms over {len(latencies)} calls")
+    metrics = stub.GetServerMetrics(library_pb2.MetricsRequest(prefix='admission.')).values
+    for name in sorted(metrics):
+        print(f"  {name} = {metrics[name]:g}")
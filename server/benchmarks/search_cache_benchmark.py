@@ -0,0 +1,96 @@
+"""
+SearchBooks with and without the result cache (search_cache.SearchCache),
+in process, on the database of DJANGO_SETTINGS_MODULE.
+
+  1. per query: time of a miss (ORM + serialization, stored in the cache)
+     and of a hit (cached bytes), and the size of the entry;
+  2. a desk workload: `searches` searches drawn from `distinct` queries
+     (a few popular ones, Zipf-like), with a Book write (a version bump of
+     the inventory feed) every `write_every` searches: hit rate, bytes kept
+     and total time against the same searches with the cache disabled.
+
+The queries are words taken from the titles and authors of the catalogue.
+
+Usage: python benchmarks/search_cache_benchmark.py [searches] [distinct] [write_every]
+"""
+import os
+import random
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+import grpc_handler
+from grpc_handler import LibraryServicer
+from inventory_feed import inventory_feed
+from library_admin.models import Book
+from search_cache import SearchCache
+
+import library_pb2
+
+InventoryEvent = library_pb2.InventoryEvent
+
+
+def search(servicer, query):
+    return sum(1 for _ in servicer.SearchBooks(library_pb2.SearchRequest(query=query), None))
+
+
+def catalogue_words(count):
+    words = set()
+    for title, author in Book.objects.values_list('title', 'author').iterator():
+        words.update(word.lower() for word in f"{title} {author}".split() if len(word) >= 4)
+    words = sorted(words)
+    random.shuffle(words)
+    return words[:count]
+
+
+def per_query_phase(servicer, queries):
+    print(f"{'query':<20} {'books':>7} {'miss ms':>9} {'hit ms':>9} {'entry KiB':>10}")
+    for query in queries:
+        grpc_handler.search_cache.clear()
+        started = time.perf_counter()
+        books = search(servicer, query)
+        miss = (time.perf_counter() - started) * 1000
+        before = grpc_handler.search_cache.bytes
+        started = time.perf_counter()
+        search(servicer, query)
+        hit = (time.perf_counter() - started) * 1000
+        print(f"{query!r:<20} {books:>7} {miss:>9.2f} {hit:>9.3f} {before / 1024:>10.1f}")
+
+
+def workload(servicer, queries, searches, write_every):
+    """Runs the desk workload; returns its duration in seconds."""
+    weights = [1 / rank for rank in range(1, len(queries) + 1)]
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for i in range(searches):
+        if write_every and i and i % write_every == 0:
+            inventory_feed.publish(InventoryEvent.STOCK_CHANGED, book_id=0)
+        search(servicer, rng.choices(queries, weights)[0])
+    return time.perf_counter() - started
+
+
+def main():
+    searches = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    write_every = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    random.seed(0)
+    servicer = LibraryServicer()
+    queries = [''] + catalogue_words(distinct - 1)
+    print(f"database: {Book.objects.count():,} books")
+    per_query_phase(servicer, queries[:8])
+
+    cache = grpc_handler.search_cache = SearchCache(grpc_handler.settings.SEARCH_CACHE_MAX_BYTES)
+    cached = workload(servicer, queries, searches, write_every)
+    grpc_handler.search_cache = SearchCache(0)
+    uncached = workload(servicer, queries, searches, write_every)
+    print(f"\n{searches} searches over {distinct} queries, a write every {write_every} searches")
+    print(f"  hit rate      {cache.hit_rate():>8.1%}   ({cache.hits} hits, {cache.misses} misses)")
+    print(f"  cache         {cache.bytes / 1024:>8,.0f} KiB, {len(cache)} entries, {cache.evictions} evictions")
+    print(f"  with cache    {cached:>8.2f} s   ({cached * 1000 / searches:.2f} ms per search)")
+    print(f"  without cache {uncached:>8.2f} s   ({uncached * 1000 / searches:.2f} ms per search)")
+
+
+if __name__ == '__main__':
+    main()
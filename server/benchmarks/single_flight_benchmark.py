@@ -0,0 +1,92 @@
+"""
+Opening-time load against a running gRPC server: `clients` threads send
+the same SearchBooks(query) at the same moment (a barrier per round), as
+staff terminals loading the dashboard together, for `rounds` rounds.
+
+The report compares the SQL statements the server ran for these calls
+(metric sql.SearchBooks.queries) with the calls made: without single-flight
+every call runs its own query. single_flight.SearchBooks.executions /
+.shared show how the calls were grouped (SINGLE_FLIGHT setting). Every
+client must receive the same number of books.
+
+Usage: python benchmarks/single_flight_benchmark.py [clients] [rounds] [query] [target]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+
+import grpc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import library_pb2
+import library_pb2_grpc
+
+METRICS = (
+    'sql.SearchBooks.calls', 'sql.SearchBooks.queries',
+    'single_flight.SearchBooks.executions', 'single_flight.SearchBooks.shared',
+)
+
+
+def server_metrics(stub):
+    values = stub.GetServerMetrics(library_pb2.MetricsRequest(), timeout=5).values
+    return {name: values.get(name, 0) for name in METRICS}
+
+
+def client(stub, query, rounds, barrier, latencies, sizes, errors):
+    for _ in range(rounds):
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            books = list(stub.SearchBooks(library_pb2.SearchRequest(query=query), timeout=120))
+        except grpc.RpcError as e:
+            errors[e.code().name] += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.add(len(books))
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    query = sys.argv[3] if len(sys.argv) > 3 else ""
+    target = sys.argv[4] if len(sys.argv) > 4 else 'localhost:50051'
+
+    # One channel per client, as separate terminals (and separate HTTP/2 connections).
+    stubs = [library_pb2_grpc.LibraryServiceStub(grpc.insecure_channel(target)) for _ in range(clients)]
+    before = server_metrics(stubs[0])
+    barrier = threading.Barrier(clients)
+    latencies, sizes, errors = [], set(), Counter()
+    threads = [
+        threading.Thread(target=client, args=(stub, query, rounds, barrier, latencies, sizes, errors))
+        for stub in stubs
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    after = server_metrics(stubs[0])
+    delta = {name: after[name] - before[name] for name in METRICS}
+
+    calls = clients * rounds - sum(errors.values())
+    queries = delta['sql.SearchBooks.queries']
+    print(f"{clients} clients x {rounds} rounds of SearchBooks({query!r}) against {target}")
+    print(f"  calls answered        {calls:>8}")
+    print(f"  SQL queries           {queries:>8.0f}   ({queries / calls:.2f} per call, "
+          f"{100 * (1 - queries / calls):.0f}% fewer than one per call)")
+    print(f"  executions / shared   {delta['single_flight.SearchBooks.executions']:>8.0f} / "
+          f"{delta['single_flight.SearchBooks.shared']:.0f}")
+    for code, count in errors.most_common():
+        print(f"  {code:<21} {count:>8}")
+    print(f"  latency p50 {statistics.median(latencies):.0f} ms, max {max(latencies):.0f} ms")
+    if len(sizes) != 1:
+        print(f"FAIL: clients received different result sizes: {sorted(sizes)}")
+        sys.exit(1)
+    print(f"  every client received {sizes.pop()} books")
+
+
+if __name__ == '__main__':
+    main()
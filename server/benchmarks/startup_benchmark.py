@@ -0,0 +1,87 @@
+"""
+Cold start of the gRPC server, checked against a time budget.
+
+Starts `grpc_handler.py` in a new process, sends GetServerMetrics with
+wait_for_ready until it is answered, then reads the server's own
+`startup.*` metrics (duration of each boot phase and time to the first
+served RPC). Exits with status 1 if the median time from launch to the
+first RPC is over `budget_ms`. The test suite checks a single start against
+STARTUP_BUDGET_MS (library_admin.tests.StartupBudgetTests) with cold_start().
+
+The server uses the environment of this script (DJANGO_SETTINGS_MODULE...)
+and listens on `--port` (by default a free port, so a dev server already
+running on GRPC_PORT is not measured by mistake).
+
+Usage: python benchmarks/startup_benchmark.py [budget_ms] [runs] [--port N]
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import grpc
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+import library_pb2
+import library_pb2_grpc
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def cold_start(port, timeout=30):
+    """Returns (ms from launch to first answered RPC, server startup metrics)."""
+    launched = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, 'grpc_handler.py', '--port', str(port)], cwd=SERVER_DIR,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # Short reconnect backoff: the default (1 s) would dominate the measure.
+        options = [('grpc.initial_reconnect_backoff_ms', 20), ('grpc.max_reconnect_backoff_ms', 50)]
+        with grpc.insecure_channel(f'localhost:{port}', options=options) as channel:
+            stub = library_pb2_grpc.LibraryServiceStub(channel)
+            stub.GetServerMetrics(library_pb2.MetricsRequest(), wait_for_ready=True, timeout=timeout)
+            first_rpc_ms = (time.perf_counter() - launched) * 1000
+            values = stub.GetServerMetrics(library_pb2.MetricsRequest(prefix='startup.'), timeout=timeout).values
+    finally:
+        # SIGTERM would drain for GRPC_DRAIN_SECONDS, still holding the port.
+        server.kill()
+        server.wait()
+    return first_rpc_ms, dict(values)
+
+
+def main():
+    args = sys.argv[1:]
+    port = None
+    if '--port' in args:
+        position = args.index('--port')
+        port = int(args[position + 1])
+        del args[position:position + 2]
+    budget_ms = float(args[0]) if len(args) > 0 else 3000
+    runs = int(args[1]) if len(args) > 1 else 3
+
+    samples = []
+    for run in range(runs):
+        first_rpc_ms, values = cold_start(port or free_port())
+        samples.append(first_rpc_ms)
+        phases = ", ".join(f"{name[len('startup.'):-3]} {ms:.0f}" for name, ms in sorted(values.items(), key=lambda kv: kv[1]))
+        print(f"run {run + 1}: first RPC after {first_rpc_ms:.0f} ms  (server: {phases})")
+
+    median_ms = statistics.median(samples)
+    print(f"median time to first RPC: {median_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    if median_ms > budget_ms:
+        print("FAIL: startup budget exceeded")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Latency and memory of the trigram index (trigram_index.TrigramIndex, the
+typo-tolerant fallback of SearchBooks) on a synthetic catalogue of `books`
+books: French author names and titles drawn from a vocabulary of made-up
+words.
+
+  1. build time and memory of the index (tracemalloc);
+  2. search latency (p50 / p95 / max over `queries` searches) for:
+     a misspelled author name ("Dumass"), a misspelled title word and
+     author name of one book (that book must be found: recall), and a
+     frequent word;
+  3. the same misspelled author searches answered by scanning every book
+     and comparing its words (what the posting lists avoid), on a few queries;
+  4. incremental writes: set / remove of single books.
+
+Usage: python benchmarks/trigram_benchmark.py [books] [queries]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trigram_index import TrigramIndex, normalize_text, similarity, trigrams
+
+FIRST_NAMES = (
+    'Alexandre', 'Albert', 'Victor', 'Émile', 'Gustave', 'Honoré', 'Marguerite', 'Simone', 'Jean-Paul',
+    'Marcel', 'Antoine', 'George', 'Colette', 'Annie', 'Patrick', 'Michel', 'Amélie', 'Jules', 'Guy',
+)
+LAST_NAMES = (
+    'Dumas', 'Camus', 'Hugo', 'Zola', 'Flaubert', 'Balzac', 'Duras', 'Beauvoir', 'Sartre', 'Proust',
+    'Saint-Exupéry', 'Sand', 'Ernaux', 'Modiano', 'Houellebecq', 'Nothomb', 'Verne', 'Maupassant',
+    'Stendhal', 'Voltaire', 'Rousseau', 'Céline', 'Yourcenar', 'Queneau', 'Pagnol', 'Giono', 'Gide',
+)
+STOP_WORDS = ('le', 'la', 'les', 'de', 'du', 'des', 'et', 'un', 'une', 'au')
+SYLLABLES = (
+    'ma', 'ri', 'on', 'tel', 'cha', 'peau', 'mer', 'vil', 'lon', 'gar', 'ré', 'bel', 'cor', 'san', 'tre',
+    'lu', 'mi', 'è', 're', 'nu', 'it', 'four', 'ble', 'pas', 'sion', 'ver', 'té', 'ro', 'man', 'deau',
+)
+
+
+def make_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_catalogue(books, rng):
+    vocabulary = make_vocabulary(max(1000, books // 10), rng)
+    authors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(max(100, books // 50))]
+    for book_id in range(1, books + 1):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 4))]
+        if rng.random() < 0.6:
+            words.insert(rng.randrange(len(words)), rng.choice(STOP_WORDS))
+        yield book_id, ' '.join(words).capitalize(), rng.choice(authors)
+
+
+def misspell(word, rng):
+    """One typo: a letter doubled, dropped or replaced."""
+    position = rng.randrange(len(word))
+    kind = rng.choice(('double', 'drop', 'replace')) if len(word) > 4 else 'double'
+    if kind == 'double':
+        return word[:position + 1] + word[position:]
+    if kind == 'drop':
+        return word[:position] + word[position + 1:]
+    return word[:position] + rng.choice('aeiourstln') + word[position + 1:]
+
+
+def timed(index, queries):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(index.search(query))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, results
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(f"{label:<36} p50 {statistics.median(latencies):>7.2f} ms   p95 {p95:>7.2f} ms   "
+          f"max {latencies[-1]:>7.2f} ms")
+
+
+def scan(catalogue, query, threshold=0.3):
+    """Books matching `query` found by comparing every word of every book."""
+    query_grams = [trigrams(word) for word in normalize_text(query).split()]
+    found = []
+    for book_id, title, author in catalogue:
+        book_grams = [trigrams(word) for word in normalize_text(f"{title} {author}").split()]
+        scores = [max(similarity(grams, other) for other in book_grams) for grams in query_grams]
+        if min(scores) >= threshold:
+            found.append((book_id, sum(scores) / len(scores)))
+    return found
+
+
+def main():
+    books = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    rng = random.Random(0)
+    catalogue = list(make_catalogue(books, rng))
+
+    index = TrigramIndex()
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.load(iter(catalogue))
+    build = time.perf_counter() - started
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{books:,} books, {len(index._word_ids):,} distinct words, {len(index._trigrams):,} trigrams")
+    print(f"build {build:.1f} s   memory {allocated / 2**20:,.0f} MiB ({allocated / books:.0f} bytes/book, "
+          f"posting lists {index.memory() / 2**20:,.0f} MiB)")
+
+    authors = [misspell(rng.choice(LAST_NAMES).lower(), rng) for _ in range(queries)]
+    latencies, results = timed(index, authors)
+    report("misspelled author ('dumass')", latencies)
+    print(f"{'':<36} {statistics.mean(len(r) for r in results):.0f} books returned (limit 50)")
+
+    targets = [rng.choice(catalogue) for _ in range(queries)]
+    precise = []
+    for _, title, author in targets:
+        word = max(normalize_text(title).split(), key=len)
+        precise.append(f"{misspell(word, rng)} {misspell(normalize_text(author).split()[-1], rng)}")
+    latencies, results = timed(index, precise)
+    found = sum(any(book_id == target[0] for book_id, _ in result) for target, result in zip(targets, results))
+    report("misspelled title word + author", latencies)
+    print(f"{'':<36} recall {found / queries:.1%} (the misspelled book among the results)")
+
+    latencies, _ = timed(index, [rng.choice(STOP_WORDS) for _ in range(queries)])
+    report("frequent word ('les')", latencies)
+
+    sample = authors[:3]
+    started = time.perf_counter()
+    for query in sample:
+        scan(catalogue, query)
+    print(f"{'full scan, misspelled author':<36} {(time.perf_counter() - started) * 1000 / len(sample):>11.0f} ms "
+          f"per search")
+
+    latencies = []
+    for book_id in range(books + 1, books + 1 + queries):
+        started = time.perf_counter()
+        index.set(book_id, 'Le nouveau livre', 'Annie Ernaux')
+        index.remove(book_id - books)
+        latencies.append((time.perf_counter() - started) * 1000)
+    report("set + remove of one book", latencies)
+
+
+if __name__ == '__main__':
+    main()
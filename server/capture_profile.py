@@ -0,0 +1,61 @@
+"""
+Captures a CPU profile of the running gRPC server (CaptureProfile RPC) and
+writes it as collapsed stacks, for flamegraph.pl or https://www.speedscope.app:
+
+    python capture_profile.py admin 10 > profile.folded
+    flamegraph.pl profile.folded > profile.svg
+
+`username` must be an active superuser: the script asks for its password and
+logs in (UserLogin) to get the signed staff token the RPC requires. Only the
+threads running an RPC during the capture appear in the profile: run the
+load to analyse (slow SearchBooks, list pages...) at the same time.
+
+Usage: python capture_profile.py <username> [seconds] [interval_ms] [address]
+"""
+import getpass
+import sys
+
+import grpc
+
+import library_pb2
+import library_pb2_grpc
+
+
+def login(stub, username):
+    """Metadata of the superuser-only RPCs: the staff token of `username` (password asked on the terminal)."""
+    password = getpass.getpass(f"Password for {username}: ")
+    try:
+        response = stub.UserLogin(library_pb2.LoginRequest(username=username, password=password), timeout=10)
+    except grpc.RpcError as e:
+        sys.exit(f"UserLogin failed: {e.code().name} {e.details()}")
+    if not response.success:
+        sys.exit(response.message)
+    return (('x-staff-token', response.staff_token),)
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    username = sys.argv[1]
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    interval_ms = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    address = sys.argv[4] if len(sys.argv) > 4 else 'localhost:50051'
+
+    with grpc.insecure_channel(address) as channel:
+        stub = library_pb2_grpc.LibraryServiceStub(channel)
+        metadata = login(stub, username)
+        try:
+            response = stub.CaptureProfile(
+                library_pb2.ProfileRequest(seconds=seconds, interval_ms=interval_ms),
+                metadata=metadata, timeout=seconds + 10,
+            )
+        except grpc.RpcError as e:
+            sys.exit(f"CaptureProfile failed: {e.code().name} {e.details()}")
+
+    print(response.collapsed_stacks)
+    stacks = len(response.collapsed_stacks.splitlines())
+    print(f"{response.samples} samples in {response.seconds:.1f} s, {stacks} distinct stacks", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
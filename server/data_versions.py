@@ -0,0 +1,38 @@
+import threading
+
+import library_pb2
+
+# ----------------------------------------------------
+# Data versions (used by the GetDataVersion RPC)
+# ----------------------------------------------------
+
+
+class DataVersions:
+    """
+    One write counter per data set, bumped by the write handlers once their
+    transaction has committed. Clients key their caches on (epoch, counter).
+    The catalogue counter is the version of the inventory change feed, which
+    every book write already publishes to, and its epoch is shared so that
+    counters of a previous server process never match.
+    """
+    DATA_SETS = ('members', 'users', 'loans')
+
+    def __init__(self, feed):
+        self.feed = feed
+        self._versions = dict.fromkeys(self.DATA_SETS, 0)
+        self._lock = threading.Lock()
+
+    def bump(self, *data_sets):
+        with self._lock:
+            for name in data_sets:
+                self._versions[name] += 1
+
+    def message(self):
+        with self._lock:
+            versions = dict(self._versions)
+        return library_pb2.DataVersionResponse(epoch=self.feed.epoch, catalogue=self.feed.version, **versions)
+
+    def key(self):
+        """Hashable snapshot of every counter: changes at each committed write."""
+        with self._lock:
+            return (self.feed.epoch, self.feed.version, *self._versions.values())
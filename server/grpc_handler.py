@@ -1,14 +1,24 @@
+from startup import print_import_profile, startup_timer
+
 import grpc
 from concurrent import futures
 import os
 import django
+import signal
 import sys
-from django.contrib.auth import authenticate 
-from django.contrib.auth.hashers import check_password, make_password
+import threading
+import time
+from contextlib import ExitStack
+# Les imports de django.contrib.auth (authenticate, hashers) sont faits dans
+# les RPC qui s'en servent : importés ici, ils chargent tout django.http avant
+# même django.setup().
 from django.db.models import Q 
 from django.db.utils import OperationalError
 from django.db import IntegrityError
 from django.db import transaction
+from django.db import connections
+
+startup_timer.mark('imports')
 
 # ----------------------------------------------------
 # 1. ROBUST DJANGO ENVIRONMENT SETUP 
@@ -24,14 +34,279 @@ except Exception as e:
     print(f"FATAL: Django setup failed. Details: {e}") 
     sys.exit(1)
 
+startup_timer.mark('django.setup')
+
 # ----------------------------------------------------
 # 2. Generated Code Imports
 # ----------------------------------------------------
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core import signing
 from library_admin.models import Book, Loan, Member 
 
 import library_pb2
 import library_pb2_grpc
+from interceptors import (
+    AdmissionControlInterceptor, CompressionInterceptor, ConnectionLifecycleInterceptor,
+    DatabaseRoutingInterceptor, FirstRpcInterceptor, LaneInterceptor, QueryCountInterceptor,
+    PreSerializedInterceptor, ScopedInterceptor, SingleFlightInterceptor, StreamMemoryInterceptor,
+    compression_algorithm,
+)
+from grpc_health.v1 import health_pb2_grpc
+from library_server.db_router import current_read_alias, replicas
+from metrics import metrics
+from inventory_feed import book_locks, inventory_feed
+from data_versions import DataVersions
+from profiler import DEFAULT_INTERVAL, DEFAULT_SECONDS, SamplingProfiler, collapsed
+from memory_trace import DEFAULT_TOP, memory_tracer
+from health import ReadinessProbe
+from availability_index import availability_index
+from search_cache import SearchCache, normalize_query
+from trigram_index import trigram_index
+
+data_versions = DataVersions(inventory_feed)
+search_cache = SearchCache(settings.SEARCH_CACHE_MAX_BYTES, max_age=settings.SEARCH_CACHE_MAX_AGE_SECONDS or None)
+
+startup_timer.mark('app.imports')
+
+InventoryEvent = library_pb2.InventoryEvent
+BatchGetRequest = library_pb2.BatchGetRequest
+SERVICE_NAME = library_pb2.DESCRIPTOR.services_by_name['LibraryService'].full_name
+
+# RPC en lecture seule, servies par un réplica de la base si DATABASE_REPLICAS
+# en définit. WatchInventory reste sur le primaire : son snapshot doit contenir
+# toutes les écritures déjà publiées dans le flux.
+READ_ONLY_RPCS = (
+    'SearchBooks', 'GetBook', 'BatchGetBooks', 'GetAllMembers', 'GetMemberDetail', 'BatchGetMembers',
+    'GetAllUsers', 'GetUserDetail',
+)
+
+# RPC dont le handler peut renvoyer des messages déjà sérialisés (bytes).
+PRE_SERIALIZED_RPCS = ('SearchBooks',)
+
+# Intervalle (secondes) auquel WatchInventory vérifie que le client est
+# toujours connecté lorsqu'aucun événement n'arrive.
+WATCH_POLL_SECONDS = 5.0
+
+
+def book_to_message(book):
+    return library_pb2.Book(
+        id=book.id, title=book.title, author=book.author, isbn=book.isbn,
+        total_copies=book.total_copies, available_copies=book.available_copies,
+        image_url=str(book.image) if book.image else ""
+    )
+
+
+def member_to_message(member):
+    return library_pb2.Member(
+        id=str(member.id), full_name=member.full_name, email=member.email, phone=member.phone or "",
+        date_joined=member.date_joined.isoformat() if member.date_joined else "",
+        member_id=member.member_id, is_active=member.is_active,
+    )
+
+
+STAFF_TOKEN_SALT = 'library_system.staff_token'
+
+
+def staff_token(user):
+    """Token returned by UserLogin: the user id, signed and timestamped with SECRET_KEY."""
+    return signing.dumps(user.id, salt=STAFF_TOKEN_SALT)
+
+
+def require_superuser(context):
+    """
+    Aborts with PERMISSION_DENIED unless the 'x-staff-token' metadata is a
+    token issued by UserLogin less than STAFF_TOKEN_MAX_AGE seconds ago to a
+    user who is still an active superuser. The 'x-staff-id' metadata is set
+    by the client: it only routes and groups calls, it never authorises them.
+    """
+    token = dict(context.invocation_metadata()).get('x-staff-token', '')
+    try:
+        user_id = signing.loads(token, salt=STAFF_TOKEN_SALT, max_age=settings.STAFF_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        user_id = None
+    if user_id is None or not User.objects.filter(id=user_id, is_superuser=True, is_active=True).exists():
+        context.abort(grpc.StatusCode.PERMISSION_DENIED, "Superuser only.")
+
+
+# Champs modifiables par FieldMask : chemin du masque -> champ du modèle.
+BOOK_MASK_FIELDS = {
+    'title': 'title', 'author': 'author', 'isbn': 'isbn', 'total_copies': 'total_copies',
+    'available_copies': 'available_copies', 'image_url': 'image',
+}
+MEMBER_MASK_FIELDS = {'full_name': 'full_name', 'email': 'email', 'phone': 'phone'}
+
+
+def update_masked_fields(instance, message, paths, mask_fields):
+    """
+    Copies the fields of `message` named by `paths` to `instance` and saves
+    only those columns (save(update_fields=...)), so that a concurrent write
+    to another column (e.g. available_copies by BorrowBook) is not overwritten.
+    Raises ValueError for a path that is not in `mask_fields`.
+    """
+    unknown = [path for path in paths if path not in mask_fields]
+    if unknown:
+        raise ValueError(f"Invalid update_mask path(s): {', '.join(unknown)}")
+    for path in paths:
+        value = getattr(message, path)
+        if path == 'image_url':
+            value = value or None  # "" retire l'image
+        setattr(instance, mask_fields[path], value)
+    instance.save(update_fields=[mask_fields[path] for path in paths])
+
+
+class LoanRefused(Exception):
+    """Borrow or return refused; the message is shown at the desk."""
+
+
+def borrow_copy(book_lookup, member_lookup):
+    """
+    Lends one copy of the book matching `book_lookup` (e.g. {'id': 3} or
+    {'isbn': '978...'}) to the member matching `member_lookup`, in one
+    transaction: the book row stays locked from the stock check to the
+    update. Returns (book, member, feed version); raises LoanRefused.
+    """
+    from django.utils import timezone
+    from datetime import timedelta
+    with ExitStack() as held:
+        with transaction.atomic():
+            book = Book.objects.select_for_update().filter(**book_lookup).first()
+            if book is None:
+                raise LoanRefused("Livre introuvable.")
+            held.enter_context(book_locks(book.id))
+            if book.available_copies <= 0:
+                raise LoanRefused("Stock épuisé.")
+            member = Member.objects.filter(**member_lookup).first()
+            if member is None:
+                raise LoanRefused("Membre introuvable.")
+            if not member.is_active:
+                raise LoanRefused(f"Le compte de {member.full_name} est désactivé.")
+            Loan.objects.create(book=book, member=member, due_date=timezone.now().date() + timedelta(days=14))
+            book.available_copies -= 1
+            book.save()
+        version = loan_changed(book)
+    return book, member, version
+
+
+def return_copy(**loan_lookup):
+    """
+    Closes the active loan matching `loan_lookup` and puts the copy back
+    (loan and book rows locked). Returns (loan, feed version).
+    """
+    from django.utils import timezone
+    with ExitStack() as held:
+        with transaction.atomic():
+            loan = Loan.objects.select_for_update().select_related('book', 'member').filter(
+                returned_date__isnull=True, **loan_lookup
+            ).first()
+            if not loan:
+                raise LoanRefused("Aucun prêt actif.")
+            held.enter_context(book_locks(loan.book_id))
+            loan.returned_date = timezone.now().date()
+            loan.save()
+            book = loan.book
+            book.available_copies += 1
+            book.save()
+        version = loan_changed(book)
+    return loan, version
+
+
+def loan_changed(book):
+    """
+    Publishes the new stock of `book` after a committed borrow or return;
+    returns the feed version. Called with book_locks(book.id)
+    held, so the events of a book follow the order of the commits.
+    """
+    availability_index.set(book.id, book.available_copies, book.total_copies)
+    version = inventory_feed.publish(InventoryEvent.STOCK_CHANGED, book_to_message(book))
+    data_versions.bump('loans')
+    return version
+
+
+def fuzzy_matches(query):
+    """Books whose title and author words are similar to those of `query` (FUZZY_SEARCH), best first."""
+    if not settings.FUZZY_SEARCH['limit'] or not trigram_index.loaded or not query.strip():
+        return []
+    ranked = trigram_index.search(query, **settings.FUZZY_SEARCH)
+    metrics.incr('search.fuzzy')
+    books = Book.objects.in_bulk([book_id for book_id, _ in ranked])
+    return [books[book_id] for book_id, _ in ranked if book_id in books]
+
+
+def publish_search_cache_metrics(hit):
+    metrics.incr('search_cache.hits' if hit else 'search_cache.misses')
+    metrics.set('search_cache.hit_rate', search_cache.hit_rate())
+
+
+def normalize_isbn(isbn):
+    """ISBN as stored: '978-2-07 ...' -> '97820...'."""
+    return isbn.replace('-', '').replace(' ', '').upper()
+
+
+def normalize_member_code(code):
+    """Member card code as stored: ' mem-3f…' -> 'MEM-3F…'."""
+    return code.strip().upper()
+
+
+def scanned_codes(request):
+    """(ISBN, member card code) of a ScanRequest, normalized."""
+    return normalize_isbn(request.isbn), normalize_member_code(request.member_code)
+
+
+# Clés acceptées par BatchGetBooks / BatchGetMembers : type -> (champ, normalisation).
+BOOK_BATCH_KEYS = {BatchGetRequest.ID: ('id', int), BatchGetRequest.ISBN: ('isbn', normalize_isbn)}
+MEMBER_BATCH_KEYS = {
+    BatchGetRequest.ID: ('id', int), BatchGetRequest.MEMBER_CODE: ('member_id', normalize_member_code),
+}
+
+
+def batch_lookup(queryset, request, key_fields):
+    """
+    [(key, instance or None)] for the keys of a BatchGetRequest, in request
+    order, resolved with a single `<field>__in` query. A key that cannot be
+    normalized (e.g. a non-numeric id) is simply not found. Raises ValueError
+    for a key type `key_fields` does not support or too many keys.
+    """
+    if request.key_type not in key_fields:
+        raise ValueError(f"Unsupported key_type: {BatchGetRequest.KeyType.Name(request.key_type)}.")
+    if len(request.keys) > settings.BATCH_GET_MAX_KEYS:
+        raise ValueError(f"At most {settings.BATCH_GET_MAX_KEYS} keys per call.")
+    field, normalize = key_fields[request.key_type]
+    values = {}
+    for key in request.keys:
+        try:
+            values[key] = normalize(key)
+        except ValueError:
+            values[key] = None
+    wanted = {value for value in values.values() if value is not None}
+    found = {getattr(obj, field): obj for obj in queryset.filter(**{f'{field}__in': wanted})} if wanted else {}
+    return [(key, found.get(values[key])) for key in request.keys]
+
+
+def search_members(request):
+    """
+    Members matching a MemberSearchRequest, newest first. `query` is matched
+    as a prefix (istartswith, i.e. LIKE 'q%' with MySQL's case-insensitive
+    collation) so that the indexes on full_name, email, phone and member_id
+    are used. Paging is by keyset on the id: `page_token` is the id of the
+    last member of the previous page. Raises ValueError on a bad page token.
+    """
+    members = Member.objects.order_by('-id')
+    query = request.query.strip()
+    if query:
+        members = members.filter(
+            Q(full_name__istartswith=query) | Q(email__istartswith=query)
+            | Q(phone__istartswith=query) | Q(member_id__istartswith=query)
+        )
+    if request.status == library_pb2.MemberSearchRequest.ACTIVE:
+        members = members.filter(is_active=True)
+    elif request.status == library_pb2.MemberSearchRequest.INACTIVE:
+        members = members.filter(is_active=False)
+    if request.page_token:
+        members = members.filter(id__lt=int(request.page_token))
+    if request.page_size > 0:
+        members = members[:min(request.page_size, settings.MEMBER_SEARCH_MAX_PAGE_SIZE)]
+    return members
 
 # ----------------------------------------------------
 # 3. The gRPC Servicer Implementation
@@ -41,12 +316,14 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
     
     # --- A. Authentication ---
     def UserLogin(self, request, context):
+        from django.contrib.auth import authenticate
         user = authenticate(username=request.username, password=request.password)
         response = library_pb2.LoginResponse()
         if user is not None and user.is_active:
             if user.is_staff or user.is_superuser:
                 response.success = True
                 response.user_id = str(user.id) 
+                response.staff_token = staff_token(user)
                 response.message = f"Staff login successful: {user.username}"
             else:
                 response.success = False
@@ -68,7 +345,12 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
                 available_copies=total_qty, 
                 image=request.image_url if request.image_url else None
             )
-            return library_pb2.StatusResponse(success=True, message=f"Book created.", entity_id=new_book.id)
+            trigram_index.set(new_book.id, new_book.title, new_book.author)
+            version = inventory_feed.publish(InventoryEvent.CREATED, book_to_message(new_book))
+            availability_index.set(new_book.id, new_book.available_copies, new_book.total_copies)
+            return library_pb2.StatusResponse(
+                success=True, message=f"Book created.", entity_id=new_book.id, inventory_version=version
+            )
         except IntegrityError:
             return library_pb2.StatusResponse(success=False, message="ISBN already exists.")
         except Exception as e:
@@ -76,19 +358,20 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
 
     def UpdateBookAvailability(self, request, context):
         try:
-            book = Book.objects.get(id=request.id)
-            book.title = request.title
-            book.author = request.author
-            book.isbn = request.isbn
-            book.total_copies = request.total_copies
-            book.available_copies = request.available_copies
-            
-            if request.image_url:
-                book.image = request.image_url
-            
-            book.save()
+            paths = list(request.update_mask.paths)
+            if not paths:
+                # Sans masque : tous les champs, l'image seulement si elle est fournie.
+                paths = [path for path in BOOK_MASK_FIELDS if path != 'image_url' or request.image_url]
+            with ExitStack() as held:
+                with transaction.atomic():
+                    book = Book.objects.select_for_update().get(id=request.id)
+                    held.enter_context(book_locks(book.id))
+                    update_masked_fields(book, request, paths, BOOK_MASK_FIELDS)
+                trigram_index.set(book.id, book.title, book.author)
+                version = inventory_feed.publish(InventoryEvent.UPDATED, book_to_message(book))
+                availability_index.set(book.id, book.available_copies, book.total_copies)
       
-            return library_pb2.StatusResponse(success=True, message="Livre mis à jour.")
+            return library_pb2.StatusResponse(success=True, message="Livre mis à jour.", inventory_version=version)
         except Exception as e:
   
             return library_pb2.StatusResponse(success=False, message=str(e))
@@ -96,67 +379,132 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
     def DeleteBook(self, request, context):
         try:
             book_id = int(request.query)
-            book = Book.objects.get(id=book_id)
-            book.delete()
-            return library_pb2.StatusResponse(success=True, message="Livre supprimé avec succès.")
+            with ExitStack() as held:
+                with transaction.atomic():
+                    book = Book.objects.select_for_update().get(id=book_id)
+                    held.enter_context(book_locks(book_id))
+                    book.delete()
+                trigram_index.remove(book_id)
+                version = inventory_feed.publish(InventoryEvent.DELETED, book_id=book_id)
+                availability_index.remove(book_id)
+            return library_pb2.StatusResponse(
+                success=True, message="Livre supprimé avec succès.", inventory_version=version
+            )
         except Exception as e:
             return library_pb2.StatusResponse(success=False, message=str(e))
 
     def GetBook(self, request, context):
         try:
             book = Book.objects.get(id=int(request.query))
-            return library_pb2.Book(
-                id=book.id, title=book.title, author=book.author,
-                isbn=book.isbn, total_copies=book.total_copies,
-                available_copies=book.available_copies,
-                image_url=str(book.image) if book.image else ""
-            )
+            return book_to_message(book)
         except Exception:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             return library_pb2.Book()
 
+    def BatchGetBooks(self, request, context):
+        try:
+            results = batch_lookup(Book.objects.all(), request, BOOK_BATCH_KEYS)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        response = library_pb2.BatchGetBooksResponse()
+        for key, book in results:
+            if book is None:
+                response.results.add(key=key, found=False)
+            else:
+                response.results.add(key=key, found=True, book=book_to_message(book))
+        return response
+
+    def GetAvailability(self, request, context):
+        """Stock of the requested books (all books if none) from the in-memory index, no SQL."""
+        if not availability_index.loaded:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "Availability index is loading.")
+        metrics.incr('availability.requests')
+        if request.book_ids:
+            book_ids = request.book_ids
+            available, total = availability_index.get_many(book_ids)
+        else:
+            book_ids, available, total = availability_index.columns()
+        return library_pb2.AvailabilityResponse(book_ids=book_ids, available_copies=available, total_copies=total)
+
     # --- C. Search ---SearchBooks
     def SearchBooks(self, request, context):
         query = request.query
+        key = normalize_query(query)
+        # Version lue avant la requête : une écriture commitée pendant la
+        # lecture rend l'entrée aussitôt périmée, jamais l'inverse.
+        version = inventory_feed.version
+        cached = search_cache.get(key, version)
+        publish_search_cache_metrics(cached is not None)
+        if cached is not None:
+            yield from cached[1]
+            return
         books = Book.objects.filter(Q(title__icontains=query) | Q(author__icontains=query)).order_by('title')
+        ids, payloads = [], []
         for book in books:
-            yield library_pb2.Book(
-                id=book.id, title=book.title, author=book.author, isbn=book.isbn,
-                total_copies=book.total_copies, available_copies=book.available_copies,
-                image_url=str(book.image) if book.image else ""
-            )
+            payload = book_to_message(book).SerializeToString()
+            ids.append(book.id)
+            payloads.append(payload)
+            yield payload
+        if not ids:
+            # Aucun titre ni auteur ne contient la requête : recherche
+            # tolérante aux fautes ("Dumass", "Camu"), par similarité.
+            for book in fuzzy_matches(query):
+                payload = book_to_message(book).SerializeToString()
+                ids.append(book.id)
+                payloads.append(payload)
+                yield payload
+        # Un réplica peut être en retard sur la version du flux : seules les
+        # lectures du primaire sont mises en cache.
+        if current_read_alias() is None:
+            search_cache.put(key, version, ids, payloads)
+            metrics.set('search_cache.bytes', search_cache.bytes)
+            metrics.set('search_cache.entries', len(search_cache))
+            metrics.set('search_cache.evictions', search_cache.evictions)
 
     # --- D. Members ---
     def CreateMember(self, request, context):
         try:
             member = Member.objects.create(full_name=request.full_name, email=request.email, phone=request.phone)
+            data_versions.bump('members')
             return library_pb2.StatusResponse(success=True, message="Membre créé.", entity_id=member.id)
         except Exception as e:
             return library_pb2.StatusResponse(success=False, message=str(e))
 
     def GetAllMembers(self, request, context):
-        members = Member.objects.all().order_by('-id')
+        try:
+            members = search_members(request)
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid page_token.")
         for m in members:
-            yield library_pb2.Member(
-                id=str(m.id), full_name=m.full_name, email=m.email, phone=m.phone,
-                date_joined=m.date_joined.isoformat() if m.date_joined else ""
-            )
+            yield member_to_message(m)
 
     def GetMemberDetail(self, request, context):
         try:
             m = Member.objects.get(id=int(request.user_id))
-            return library_pb2.Member(id=str(m.id), full_name=m.full_name, email=m.email, phone=m.phone)
+            return member_to_message(m)
         except Exception:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             return library_pb2.Member()
 
+    def BatchGetMembers(self, request, context):
+        try:
+            results = batch_lookup(Member.objects.all(), request, MEMBER_BATCH_KEYS)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        response = library_pb2.BatchGetMembersResponse()
+        for key, member in results:
+            if member is None:
+                response.results.add(key=key, found=False)
+            else:
+                response.results.add(key=key, found=True, member=member_to_message(member))
+        return response
+
     def UpdateMember(self, request, context):
         try:
             member = Member.objects.get(id=int(request.id))
-            member.full_name = request.full_name
-            member.email = request.email
-            member.phone = request.phone
-            member.save()
+            paths = list(request.update_mask.paths) or list(MEMBER_MASK_FIELDS)
+            update_masked_fields(member, request, paths, MEMBER_MASK_FIELDS)
+            data_versions.bump('members')
             return library_pb2.StatusResponse(success=True, message="Membre mis à jour.")
         except Exception as e:
             return library_pb2.StatusResponse(success=False, message=str(e))
@@ -165,6 +513,7 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
         try:
             member = Member.objects.get(id=int(request.user_id))
             member.delete() 
+            data_versions.bump('members', 'loans')
             return library_pb2.StatusResponse(success=True, message="Membre supprimé.")
         except Exception as e:
             return library_pb2.StatusResponse(success=False, message=str(e))
@@ -172,35 +521,71 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
     # --- E. Borrow & Return ---
     def BorrowBook(self, request, context):
         try:
-            from django.utils import timezone
-            from datetime import timedelta
-            with transaction.atomic():
-                book = Book.objects.select_for_update().get(id=int(request.book_id))
-                if book.available_copies <= 0:
-                    return library_pb2.StatusResponse(success=False, message="Stock épuisé.")
-                member = Member.objects.get(id=int(request.member_id))
-                Loan.objects.create(book=book, member=member, due_date=timezone.now().date() + timedelta(days=14))
-                book.available_copies -= 1
-                book.save()
-                return library_pb2.StatusResponse(success=True, message="Emprunt réussi.")
+            book, member, version = borrow_copy({'id': int(request.book_id)}, {'id': int(request.member_id)})
         except Exception as e:
             return library_pb2.StatusResponse(success=False, message=str(e))
+        return library_pb2.StatusResponse(success=True, message="Emprunt réussi.", inventory_version=version)
 
     def ReturnBook(self, request, context):
         try:
-            from django.utils import timezone
-            with transaction.atomic():
-                loan = Loan.objects.filter(book_id=request.book_id, member_id=int(request.member_id), returned_date__isnull=True).first()
-                if not loan:
-                    return library_pb2.StatusResponse(success=False, message="Aucun prêt actif.")
-                loan.returned_date = timezone.now().date()
-                loan.save()
-                book = loan.book
-                book.available_copies += 1
-                book.save()
-                return library_pb2.StatusResponse(success=True, message="Livre retourné.")
+            loan, version = return_copy(book_id=request.book_id, member_id=int(request.member_id))
         except Exception as e:
             return library_pb2.StatusResponse(success=False, message=str(e))
+        return library_pb2.StatusResponse(success=True, message="Livre retourné.", inventory_version=version)
+
+    # --- E1. Scan desk (ISBN + member card code) ---
+    def ScanCheckout(self, request, context):
+        isbn, member_code = scanned_codes(request)
+        try:
+            book, member, version = borrow_copy({'isbn': isbn}, {'member_id': member_code})
+        except Exception as e:
+            return library_pb2.StatusResponse(success=False, message=str(e))
+        return library_pb2.StatusResponse(
+            success=True, message=f"« {book.title} » prêté à {member.full_name}.",
+            entity_id=book.id, inventory_version=version,
+        )
+
+    def ScanReturn(self, request, context):
+        isbn, member_code = scanned_codes(request)
+        try:
+            loan, version = return_copy(book__isbn=isbn, member__member_id=member_code)
+        except Exception as e:
+            return library_pb2.StatusResponse(success=False, message=str(e))
+        return library_pb2.StatusResponse(
+            success=True, message=f"« {loan.book.title} » rendu par {loan.member.full_name}.",
+            entity_id=loan.book.id, inventory_version=version,
+        )
+
+    # --- E2. Inventory Change Feed ---
+    def WatchInventory(self, request, context):
+        """
+        Streams a snapshot of every book (RESET + SNAPSHOT events) unless the
+        client can resume from `since_version` in the same epoch, then the
+        changes it missed, a SYNCED marker, and each change as it happens.
+        """
+        feed = inventory_feed
+        epoch = feed.epoch
+        if feed.can_resume(request.epoch, request.since_version):
+            version = request.since_version
+        else:
+            version = feed.version
+            yield InventoryEvent(kind=InventoryEvent.RESET, version=version, epoch=epoch)
+            for book in Book.objects.order_by('id').iterator():
+                yield InventoryEvent(
+                    kind=InventoryEvent.SNAPSHOT, version=version, epoch=epoch, book=book_to_message(book)
+                )
+        for event in feed.events_after(version):
+            yield event
+            version = event.version
+        yield InventoryEvent(kind=InventoryEvent.SYNCED, version=version, epoch=epoch)
+
+        while context.is_active():
+            feed.wait(version, timeout=WATCH_POLL_SECONDS)
+            if not feed.can_resume(epoch, version):
+                context.abort(grpc.StatusCode.ABORTED, "Watcher fell behind the change log, resync needed.")
+            for event in feed.events_after(version):
+                yield event
+                version = event.version
 
     # --- F. Staff Management ---
     def GetAllUsers(self, request, context):
@@ -229,6 +614,7 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
             if user.is_superuser:
                 return library_pb2.StatusResponse(success=False, message="Cannot delete superuser.")
             user.delete()
+            data_versions.bump('users')
             return library_pb2.StatusResponse(success=True, message="User deleted.")
         except Exception as e:
             return library_pb2.StatusResponse(success=False, message=str(e))
@@ -242,6 +628,7 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
                     username=request.new_username, email=request.new_email,
                     password=request.new_password, is_staff=True, is_active=True
                 )
+                data_versions.bump('users')
                 response.success = True
                 response.message = f"Utilisateur '{user.username}' créé."
                 response.entity_id = user.id
@@ -250,6 +637,7 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
                 return library_pb2.StatusResponse(success=False, message=str(e))
 
         # MODE MISE À JOUR
+        from django.contrib.auth.hashers import check_password, make_password
         try:
             user = User.objects.get(id=int(request.staff_id))
             if request.current_password and not check_password(request.current_password, user.password):
@@ -260,6 +648,7 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
                 if request.new_email: user.email = request.new_email
                 if request.new_password: user.password = make_password(request.new_password)
                 user.save()
+            data_versions.bump('users')
             response.success = True
             response.message = "Profile updated."
             response.entity_id = user.id
@@ -268,21 +657,235 @@ class LibraryServicer(library_pb2_grpc.LibraryServiceServicer):
             response.message = str(e)
         return response
 
+    # --- G. Monitoring ---
+    def GetServerMetrics(self, request, context):
+        return library_pb2.MetricsResponse(values=metrics.snapshot(request.prefix))
+
+    def GetDataVersion(self, request, context):
+        return data_versions.message()
+
+    # --- H. Diagnostics ---
+    def CaptureProfile(self, request, context):
+        """Samples the stacks of the running RPCs for `seconds` (see profiler.py)."""
+        require_superuser(context)
+        seconds = min(request.seconds or DEFAULT_SECONDS, settings.PROFILE_MAX_SECONDS)
+        interval = request.interval_ms / 1000 if request.interval_ms > 0 else DEFAULT_INTERVAL
+        try:
+            stacks, samples, duration = rpc_profiler.capture(seconds, interval)
+        except RuntimeError as e:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+        return library_pb2.ProfileResponse(collapsed_stacks=collapsed(stacks), samples=samples, seconds=duration)
+
+    def TraceMemory(self, request, context):
+        """Starts / stops tracemalloc and returns the allocation sites that grew since START."""
+        require_superuser(context)
+        Action = library_pb2.MemoryTraceRequest
+        response = library_pb2.MemoryTraceResponse()
+        if request.action == Action.START:
+            memory_tracer.start(request.frames or 1)
+        elif request.action in (Action.SNAPSHOT, Action.STOP):
+            for stat in memory_tracer.diff(request.top or DEFAULT_TOP):
+                frame = stat.traceback[0]
+                response.sites.add(
+                    location=f"{frame.filename}:{frame.lineno}", size_diff_bytes=stat.size_diff,
+                    size_bytes=stat.size, count_diff=stat.count_diff,
+                )
+        response.current_bytes, response.peak_bytes = memory_tracer.memory()
+        if request.action == Action.STOP:
+            memory_tracer.stop()
+        response.tracing = memory_tracer.tracing
+        return response
+
+
+# Profils : on échantillonne les threads qui exécutent une méthode du servicer,
+# sauf les RPC inline (flux WatchInventory en attente, monitoring, le profil lui-même).
+PROFILED_RPCS = [
+    name for name in library_pb2.DESCRIPTOR.services_by_name['LibraryService'].methods_by_name
+    if name not in settings.GRPC_INLINE_RPCS
+]
+rpc_profiler = SamplingProfiler(getattr(LibraryServicer, name).__code__ for name in PROFILED_RPCS)
+
 # ----------------------------------------------------
 # 4. Server Initialization
 # ----------------------------------------------------
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+def check_connection_budget(lanes):
+    """Warns when the lane threads could open more connections than allowed."""
+    budget = settings.DATABASE_MAX_CONNECTIONS
+    # Une connexion par thread de voie, plus les threads de readiness et de
+    # l'index de disponibilité, et celui du health check des réplicas. Chaque
+    # flux WatchInventory ouvert en garde une aussi.
+    needed = sum(lane.workers for lane in lanes.values()) + 2 + (1 if replicas.aliases else 0)
+    if needed > budget:
+        print(f"⚠️ GRPC_LANES need up to {needed} connections per database, "
+              f"DATABASE_MAX_CONNECTIONS is {budget}.")
+    metrics.set('db.connections.budget', budget)
+    metrics.set('grpc.max_workers', settings.GRPC_MAX_WORKERS)
+
+
+def check_admission_limits(admission, lane_interceptor):
+    """
+    Warns when a method's admission limit is above the worker count of its
+    lane: the lane would queue the calls before the limiter sheds any.
+    """
+    for method in library_pb2.DESCRIPTOR.services_by_name['LibraryService'].methods_by_name:
+        lane = lane_interceptor.lane_of(method)
+        if lane is None or method in admission.exempt:
+            continue
+        limit = admission.method_limits.get(method, admission.max_limit)
+        if limit > lane.workers:
+            print(f"⚠️ GRPC_ADMISSION allows {limit} concurrent {method} calls, "
+                  f"its lane '{lane.name}' has {lane.workers} workers.")
+
+
+def warm_up_connections(executor, max_workers):
+    """
+    Opens the database connections of every thread of `executor`. Returns
+    the warm-up futures without waiting: tasks submitted afterwards (RPCs)
+    run once their thread has connected.
+    """
+    aliases = [alias for alias in connections if alias == 'default' or alias in replicas.aliases]
+    barrier = threading.Barrier(max_workers)
+
+    def open_connections():
+        # The barrier keeps each task on its own thread until all threads exist.
+        try:
+            barrier.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        for alias in aliases:
+            try:
+                connections[alias].ensure_connection()
+            except Exception as e:
+                print(f"⚠️ Warm-up of database '{alias}' failed: {e}")
+
+    return [executor.submit(open_connections) for _ in range(max_workers)]
+
+
+def keep_index(index, name, reload_interval):
+    """
+    Loads an in-memory index (availability_index, trigram_index) in the
+    background, then reloads it every `reload_interval` seconds (0 = never)
+    to pick up the writes made outside the RPCs (Django admin, scripts).
+    A failed load is retried. Metrics <name>.books, .bytes and .load_ms.
+    """
+    def loop():
+        while True:
+            started = time.perf_counter()
+            try:
+                index.load()
+            except Exception as e:
+                print(f"⚠️ Loading of the {name} index failed: {e}")
+                time.sleep(5)
+                continue
+            finally:
+                connections['default'].close()
+            metrics.set(f'{name}.books', len(index))
+            metrics.set(f'{name}.bytes', index.memory())
+            metrics.set(f'{name}.load_ms', (time.perf_counter() - started) * 1000)
+            if not reload_interval:
+                return
+            time.sleep(reload_interval)
+
+    threading.Thread(target=loop, name=f'{name}-index', daemon=True).start()
+
+
+def drain_on_sigterm(server, readiness):
+    """
+    On SIGTERM, reports NOT_SERVING on the health service for
+    GRPC_DRAIN_SECONDS, so that load-balanced clients move to the other
+    servers, then stops the server after the RPCs in flight.
+    """
+    def drain():
+        print("🛑 SIGTERM : drain...")
+        readiness.drain()
+        time.sleep(settings.GRPC_DRAIN_SECONDS)
+        server.stop(settings.GRPC_SHUTDOWN_GRACE)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=drain, daemon=True).start())
+
+
+def serve(compression=None, compression_threshold=None, method_compression=None, profile_startup=False,
+          port=None):
+    """
+    Starts the gRPC server on `port` (GRPC_PORT by default).
+    `compression` is the default algorithm ('gzip', 'deflate' or None),
+    `method_compression` overrides it per RPC name, e.g. {'SearchBooks': 'gzip'}.
+    Messages smaller than `compression_threshold` bytes are never compressed.
+    Unset arguments fall back to the GRPC_COMPRESSION* settings.
+    `profile_startup` prints the duration of each boot phase.
+    """
+    if compression is None:
+        compression = settings.GRPC_COMPRESSION
+    if compression_threshold is None:
+        compression_threshold = settings.GRPC_COMPRESSION_THRESHOLD
+    if method_compression is None:
+        method_compression = settings.GRPC_METHOD_COMPRESSION
+    if port is None:
+        port = settings.GRPC_PORT
+
+    lane_interceptor = LaneInterceptor(settings.GRPC_LANES, settings.GRPC_INLINE_RPCS)
+    check_connection_budget(lane_interceptor.lanes)
+    admission = AdmissionControlInterceptor(**settings.GRPC_ADMISSION)
+    check_admission_limits(admission, lane_interceptor)
+    # Toutes les voies se connectent en parallèle, pendant que le serveur
+    # démarre ; les premières RPC attendent derrière le warm-up de leur voie.
+    warm_ups = []
+    for lane in lane_interceptor.lanes.values():
+        warm_ups += warm_up_connections(lane.executor, lane.workers)
+    routing = DatabaseRoutingInterceptor(READ_ONLY_RPCS, settings.DATABASE_STICKY_SECONDS)
+
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=settings.GRPC_MAX_WORKERS),
+        compression=compression_algorithm(compression),
+        maximum_concurrent_rpcs=settings.GRPC_MAX_CONCURRENT_RPCS,
+        # Le service de health check n'est pas intercepté (voir ScopedInterceptor).
+        interceptors=[ScopedInterceptor(SERVICE_NAME, interceptor) for interceptor in (
+            # En premier : son sérialiseur est celui qu'utilise gRPC.
+            PreSerializedInterceptor(PRE_SERIALIZED_RPCS),
+            FirstRpcInterceptor(startup_timer.first_rpc),
+            CompressionInterceptor(compression_threshold, method_compression),
+            # Les lectures identiques en cours partagent une exécution, avant
+            # les voies et l'admission control.
+            SingleFlightInterceptor(**settings.SINGLE_FLIGHT, version=data_versions.key, routing=routing),
+            # Les intercepteurs suivants s'exécutent sur le thread de la voie,
+            # là où se trouvent la connexion et le routage de la base.
+            lane_interceptor,
+            # Sur le thread de la voie : l'attente mesurée inclut la file de la voie.
+            admission,
+            ConnectionLifecycleInterceptor(),
+            QueryCountInterceptor(settings.SQL_REPEATED_QUERY_THRESHOLD),
+            StreamMemoryInterceptor(),
+            routing,
+        )],
+    )
+    replicas.start_health_checks(settings.DATABASE_REPLICA_CHECK_INTERVAL)
+    readiness = ReadinessProbe([SERVICE_NAME])
     servicer_instance = LibraryServicer()
     library_pb2_grpc.add_LibraryServiceServicer_to_server(servicer_instance, server)
-    server.add_insecure_port('[::]:50051') 
+    health_pb2_grpc.add_HealthServicer_to_server(readiness.servicer, server)
+    server.add_insecure_port(f'[::]:{port}')
     server.start()
-    print("✅ SERVEUR gRPC DÉMARRÉ SUR LE PORT 50051")
+    readiness.start(settings.GRPC_HEALTH_CHECK_INTERVAL)
+    keep_index(availability_index, 'availability', settings.AVAILABILITY_INDEX_RELOAD_SECONDS)
+    keep_index(trigram_index, 'trigram', settings.TRIGRAM_INDEX_RELOAD_SECONDS)
+    drain_on_sigterm(server, readiness)
+    startup_timer.mark('server.start')
+    print(f"✅ SERVEUR gRPC DÉMARRÉ SUR LE PORT {port}")
+    futures.wait(warm_ups)
+    startup_timer.mark('db.warm_up')
+    if profile_startup:
+        print(startup_timer.report())
+        print_import_profile('grpc_handler')
     server.wait_for_termination()
 if __name__ == '__main__':
+    # --profile-startup : détail des imports (-X importtime) et durée de
+    # chaque phase du démarrage, jusqu'à la première RPC servie.
+    # --port N : plusieurs serveurs sur la même machine (répartition de charge).
+    profile_startup = '--profile-startup' in sys.argv
+    port = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else None
     try:
-        serve()
+        serve(profile_startup=profile_startup, port=port)
     except KeyboardInterrupt:
         print("\n🛑 Arrêt du serveur...")
         sys.exit(0)
\ No newline at end of file
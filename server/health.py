@@ -0,0 +1,62 @@
+import threading
+import time
+
+from django.db import connections
+from grpc_health.v1 import health, health_pb2
+
+# ----------------------------------------------------
+# gRPC health service (readiness for client-side load balancing)
+# ----------------------------------------------------
+
+SERVING = health_pb2.HealthCheckResponse.SERVING
+NOT_SERVING = health_pb2.HealthCheckResponse.NOT_SERVING
+
+
+class ReadinessProbe:
+    """
+    Publishes the readiness of the server on the standard gRPC health
+    service (grpc.health.v1.Health): `services` are SERVING while the primary
+    database answers a `SELECT 1`, NOT_SERVING otherwise. Clients with
+    client-side health checking stop sending RPCs to a NOT_SERVING server
+    and pick it again once it is back.
+
+    The status starts NOT_SERVING: the first check runs when the probe thread
+    starts. drain() reports NOT_SERVING for good, before a shutdown.
+    """
+
+    def __init__(self, services=()):
+        self.servicer = health.HealthServicer()
+        self.services = ('', *services)
+        self.ready = None
+        self._lock = threading.Lock()
+        self._set(NOT_SERVING)
+
+    def _set(self, status):
+        for service in self.services:
+            self.servicer.set(service, status)
+
+    def check(self):
+        try:
+            with connections['default'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            ready = True
+        except Exception:
+            connections['default'].close()
+            ready = False
+        with self._lock:
+            if ready != self.ready:
+                if self.ready is not None:
+                    print("✅ Database reachable: SERVING." if ready else "⚠️ Database unreachable: NOT_SERVING.")
+                self.ready = ready
+                self._set(SERVING if ready else NOT_SERVING)
+        return ready
+
+    def start(self, interval):
+        def loop():
+            while True:
+                self.check()
+                time.sleep(interval)
+        threading.Thread(target=loop, name='readiness-probe', daemon=True).start()
+
+    def drain(self):
+        self.servicer.enter_graceful_shutdown()
@@ -0,0 +1,928 @@
+import queue
+import threading
+import time
+import tracemalloc
+import weakref
+from concurrent import futures
+
+import grpc
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.db.utils import OperationalError
+
+from library_server.db_router import replicas, route_reads
+from metrics import metrics
+from query_counter import count_queries
+
+# ----------------------------------------------------
+# 1. Helpers
+# ----------------------------------------------------
+
+COMPRESSION_ALGORITHMS = {
+    None: grpc.Compression.NoCompression,
+    '': grpc.Compression.NoCompression,
+    'none': grpc.Compression.NoCompression,
+    'gzip': grpc.Compression.Gzip,
+    'deflate': grpc.Compression.Deflate,
+}
+
+
+def compression_algorithm(name):
+    """Traduit 'gzip' / 'deflate' / None en valeur grpc.Compression."""
+    if isinstance(name, grpc.Compression):
+        return name
+    try:
+        return COMPRESSION_ALGORITHMS[name.lower() if name else name]
+    except KeyError:
+        raise ValueError(f"Unknown compression algorithm: {name!r}")
+
+
+def rpc_method_name(handler_call_details):
+    """'/library_system.LibraryService/SearchBooks' -> 'SearchBooks'."""
+    return handler_call_details.method.rsplit('/', 1)[-1]
+
+
+def client_key(context):
+    """The calling client: its 'x-staff-id' metadata, or its peer address."""
+    for key, value in context.invocation_metadata():
+        if key == 'x-staff-id' and value:
+            return f"staff:{value}"
+    return f"peer:{context.peer()}"
+
+
+def wrap_rpc_handler(handler, unary_wrapper=None, stream_wrapper=None):
+    """
+    Returns a copy of `handler` whose behaviour is decorated.
+    `unary_wrapper(behavior)` is applied to unary-unary methods and
+    `stream_wrapper(behavior)` to unary-stream methods (our streaming RPCs).
+    """
+    if handler is None:
+        return None
+    if handler.unary_unary and unary_wrapper:
+        return grpc.unary_unary_rpc_method_handler(
+            unary_wrapper(handler.unary_unary),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    if handler.unary_stream and stream_wrapper:
+        return grpc.unary_stream_rpc_method_handler(
+            stream_wrapper(handler.unary_stream),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    return handler
+
+
+class ScopedInterceptor(grpc.ServerInterceptor):
+    """
+    Applies `interceptor` to the RPCs of `service` only. The other services
+    of the server (grpc.health.v1.Health, whose non-blocking Watch stream must
+    not be wrapped) are passed through untouched.
+    """
+
+    def __init__(self, service, interceptor):
+        self.prefix = f'/{service}/'
+        self.interceptor = interceptor
+
+    def intercept_service(self, continuation, handler_call_details):
+        if not handler_call_details.method.startswith(self.prefix):
+            return continuation(handler_call_details)
+        return self.interceptor.intercept_service(continuation, handler_call_details)
+
+
+# ----------------------------------------------------
+# 2. Compression
+# ----------------------------------------------------
+
+class CompressionInterceptor(grpc.ServerInterceptor):
+    """
+    Applies per-method compression and skips compression for messages smaller
+    than `threshold` bytes (StatusResponse, LoginResponse, ...).
+
+    gRPC compresses each message on its own, so the threshold is checked per
+    message: a small Book inside a SearchBooks stream is sent uncompressed too.
+    """
+
+    def __init__(self, threshold=1024, method_compression=None):
+        self.threshold = threshold
+        self.method_compression = {
+            method: compression_algorithm(name)
+            for method, name in (method_compression or {}).items()
+        }
+
+    def _maybe_skip(self, response, context):
+        # bytes : message déjà sérialisé (PreSerializedInterceptor).
+        size = len(response) if isinstance(response, bytes) else response.ByteSize()
+        if size < self.threshold:
+            context.disable_next_message_compression()
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        algorithm = self.method_compression.get(rpc_method_name(handler_call_details))
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                if algorithm is not None:
+                    context.set_compression(algorithm)
+                response = behavior(request, context)
+                self._maybe_skip(response, context)
+                return response
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                if algorithm is not None:
+                    context.set_compression(algorithm)
+                for response in behavior(request, context):
+                    self._maybe_skip(response, context)
+                    yield response
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 3. Database routing (primary / read replicas)
+# ----------------------------------------------------
+
+class DatabaseRoutingInterceptor(grpc.ServerInterceptor):
+    """
+    Sends the ORM reads of `read_methods` to a healthy replica and everything
+    else to the primary. After a write RPC, the same client (the 'x-staff-id'
+    metadata, or its peer address) reads from the primary for
+    `sticky_seconds`, so it always sees its own writes.
+    A replica raising OperationalError is excluded until its health check passes.
+    """
+
+    def __init__(self, read_methods, sticky_seconds=5.0):
+        self.read_methods = frozenset(read_methods)
+        self.sticky_seconds = sticky_seconds
+        self._last_write = {}
+        self._lock = threading.Lock()
+
+    def reads_primary(self, method, context):
+        """True if the reads of this call go to the primary (write RPC, or client that just wrote)."""
+        if method not in self.read_methods:
+            return True
+        with self._lock:
+            last_write = self._last_write.get(client_key(context))
+        return last_write is not None and time.monotonic() - last_write < self.sticky_seconds
+
+    def _read_alias(self, method, context):
+        if self.reads_primary(method, context):
+            return None
+        return replicas.pick()
+
+    def _remember_write(self, context):
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[client_key(context)] = now
+            if len(self._last_write) > 1000:
+                self._last_write = {
+                    k: t for k, t in self._last_write.items() if now - t < self.sticky_seconds
+                }
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        method = rpc_method_name(handler_call_details)
+        is_write = method not in self.read_methods
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                alias = self._read_alias(method, context)
+                try:
+                    with route_reads(alias):
+                        return behavior(request, context)
+                except OperationalError:
+                    if alias:
+                        replicas.mark_down(alias)
+                    raise
+                finally:
+                    if is_write:
+                        self._remember_write(context)
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                alias = self._read_alias(method, context)
+                try:
+                    with route_reads(alias):
+                        yield from behavior(request, context)
+                except OperationalError:
+                    if alias:
+                        replicas.mark_down(alias)
+                    raise
+                finally:
+                    if is_write:
+                        self._remember_write(context)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 4. Database connection lifecycle
+# ----------------------------------------------------
+
+def _count_connection_opened(sender, connection, **kwargs):
+    metrics.incr('db.connections.opened')
+    metrics.incr(f'db.connections.opened.{connection.alias}')
+
+connection_created.connect(_count_connection_opened)
+
+
+class ConnectionLifecycleInterceptor(grpc.ServerInterceptor):
+    """
+    Does around every RPC what Django's request_started / request_finished
+    signals do around an HTTP request: close_old_connections() drops the
+    worker thread's connections that are older than CONN_MAX_AGE or broken,
+    and re-arms the CONN_HEALTH_CHECKS ping before their next use. Without
+    it, a connection killed by MySQL's wait_timeout fails the next RPC.
+
+    Counts, per RPC, whether the thread's connection was reused or had to be
+    (re)opened.
+    """
+
+    def _before(self):
+        close_old_connections()
+        if connection.connection is not None:
+            metrics.incr('db.connections.reused')
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                self._before()
+                try:
+                    return behavior(request, context)
+                finally:
+                    close_old_connections()
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                self._before()
+                try:
+                    yield from behavior(request, context)
+                finally:
+                    close_old_connections()
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 5. Admission control / load shedding
+# ----------------------------------------------------
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one RPC method.
+
+    Each completed call is compared with the method's baseline latency (the
+    lowest latency observed, drifting slowly upwards): a call slower than
+    `tolerance` x baseline, or a failed one, multiplies the limit by
+    `backoff`; a fast call while the limit is at least half used adds
+    1/limit to it. The limit stays within [min_limit, max_limit].
+    """
+
+    def __init__(self, initial_limit, min_limit, max_limit, tolerance=2.0, backoff=0.9):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.inflight = 0
+        self.baseline = None
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.inflight >= int(self.limit):
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self, latency, failed=False):
+        with self._lock:
+            self.inflight -= 1
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * 0.01
+            if failed or latency > self.baseline * self.tolerance:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            elif self.inflight + 1 >= self.limit / 2:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class AdmissionControlInterceptor(grpc.ServerInterceptor):
+    """
+    Rejects RPCs early with RESOURCE_EXHAUSTED instead of letting them queue
+    behind the worker pool:
+      - an RPC that waited more than `max_queue_wait` seconds for a worker
+        thread is dropped before doing any database work;
+      - each method has an AdaptiveLimiter, bounded by `method_limits`
+        (e.g. {'SearchBooks': 4}) or `max_limit`.
+    Placed after LaneInterceptor, so that the wait includes the lane queue
+    and the limits apply to the lane threads: a limit above the workers of
+    the method's lane would never shed (see check_admission_limits).
+    Methods in `exempt` (circulation desk calls, long-lived watch streams)
+    are never shed. Rejections carry a `grpc-retry-pushback-ms` trailer,
+    which gRPC clients honour before retrying.
+
+    intercept_service runs on the server's polling thread when the call
+    arrives, the wrapped behaviour on the lane thread: the difference is
+    the queue wait. A call counts in the queue depth from its arrival until
+    it reaches this interceptor on a lane thread, or until its handler is
+    dropped without getting there (answered by SingleFlightInterceptor,
+    rejected by maximum_concurrent_rpcs, cancelled while queued).
+    """
+
+    def __init__(self, max_queue_wait=0.5, initial_limit=4, min_limit=1, max_limit=10,
+                 method_limits=None, exempt=(), retry_after=0.2):
+        self.max_queue_wait = max_queue_wait
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.method_limits = method_limits or {}
+        self.exempt = frozenset(exempt)
+        self.retry_after = retry_after
+        self._limiters = {}
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    def _limiter(self, method):
+        with self._lock:
+            limiter = self._limiters.get(method)
+            if limiter is None:
+                max_limit = self.method_limits.get(method, self.max_limit)
+                limiter = AdaptiveLimiter(min(self.initial_limit, max_limit), self.min_limit, max_limit)
+                self._limiters[method] = limiter
+            return limiter
+
+    def _queue(self, delta):
+        with self._lock:
+            self._queued += delta
+            metrics.set('admission.queue_depth', self._queued)
+
+    def _reject(self, method, context, reason):
+        metrics.incr(f'admission.{method}.rejected')
+        context.set_trailing_metadata((('grpc-retry-pushback-ms', str(int(self.retry_after * 1000))),))
+        context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Server overloaded ({reason}), retry later.")
+
+    def _enqueue(self, wrapper):
+        """Counts the call of `wrapper` as queued; returns the callable that dequeues it (once)."""
+        self._queue(+1)
+        return weakref.finalize(wrapper, self._queue, -1)
+
+    def _admit(self, method, context, arrived, dequeue):
+        """Returns the limiter slot taken by the call (None for exempt methods), or aborts."""
+        dequeue()
+        waited = time.monotonic() - arrived
+        metrics.set_max('admission.queue_wait_max_ms', waited * 1000)
+        if method in self.exempt:
+            return None
+        if waited > self.max_queue_wait:
+            self._reject(method, context, f"queued {waited * 1000:.0f} ms")
+        limiter = self._limiter(method)
+        if not limiter.try_acquire():
+            self._reject(method, context, f"{method} concurrency limit {int(limiter.limit)}")
+        return limiter
+
+    def _done(self, method, limiter, started, failed):
+        if limiter is None:
+            return
+        limiter.release(time.monotonic() - started, failed)
+        metrics.set(f'admission.{method}.limit', round(limiter.limit, 2))
+        metrics.set(f'admission.{method}.inflight', limiter.inflight)
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        method = rpc_method_name(handler_call_details)
+        arrived = time.monotonic()
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                limiter = self._admit(method, context, arrived, dequeue)
+                started = time.monotonic()
+                failed = True
+                try:
+                    response = behavior(request, context)
+                    failed = False
+                    return response
+                finally:
+                    self._done(method, limiter, started, failed)
+            dequeue = self._enqueue(wrapper)
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                limiter = self._admit(method, context, arrived, dequeue)
+                started = time.monotonic()
+                failed = True
+                try:
+                    yield from behavior(request, context)
+                    failed = False
+                finally:
+                    self._done(method, limiter, started, failed)
+            dequeue = self._enqueue(wrapper)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 6. Executor lanes
+# ----------------------------------------------------
+
+_END = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+class Lane:
+    """
+    A bounded pool of worker threads dedicated to a group of RPCs. The gRPC
+    thread that received the call only waits for the result (or relays the
+    stream items), so a full lane never takes threads from another one.
+    """
+
+    def __init__(self, name, workers, stream_buffer=64):
+        self.name = name
+        self.workers = workers
+        self.stream_buffer = stream_buffer
+        self.executor = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'lane-{name}')
+        self._busy = 0
+        self._queued = 0
+        self._lock = threading.Lock()
+        metrics.set(f'lanes.{name}.workers', workers)
+
+    def _update(self, busy=0, queued=0):
+        with self._lock:
+            self._busy += busy
+            self._queued += queued
+            metrics.set(f'lanes.{self.name}.busy', self._busy)
+            metrics.set(f'lanes.{self.name}.queued', self._queued)
+            metrics.set(f'lanes.{self.name}.utilization', round(self._busy / self.workers, 2))
+
+    def submit(self, fn):
+        self._update(queued=+1)
+
+        def run():
+            self._update(busy=+1, queued=-1)
+            started = time.monotonic()
+            try:
+                return fn()
+            finally:
+                metrics.incr(f'lanes.{self.name}.busy_seconds', time.monotonic() - started)
+                metrics.incr(f'lanes.{self.name}.calls')
+                self._update(busy=-1)
+        return self.executor.submit(run)
+
+    def call(self, behavior, request, context):
+        return self.submit(lambda: behavior(request, context)).result()
+
+    def stream(self, behavior, request, context):
+        items = queue.Queue(maxsize=self.stream_buffer)
+        cancelled = threading.Event()
+
+        def put(item):
+            # Bounded buffer: the lane thread waits for the gRPC thread to
+            # send, and gives up once the call is cancelled.
+            while not cancelled.is_set():
+                try:
+                    items.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            responses = behavior(request, context)
+            try:
+                for response in responses:
+                    if not put(response):
+                        return
+                put(_END)
+            except BaseException as e:
+                put(_Failure(e))
+            finally:
+                responses.close()
+
+        self.submit(produce)
+        try:
+            while True:
+                item = items.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            cancelled.set()
+
+
+class LaneInterceptor(grpc.ServerInterceptor):
+    """
+    Runs each RPC (and the interceptors listed after this one) on the lane
+    its method belongs to. Methods in `inline` keep running on the gRPC
+    thread; methods of no lane go to the 'default' lane.
+    """
+
+    def __init__(self, lanes, inline=()):
+        self.lanes = {name: Lane(name, config['workers']) for name, config in lanes.items()}
+        self.inline = frozenset(inline)
+        self._method_lanes = {
+            method: self.lanes[name]
+            for name, config in lanes.items()
+            for method in config.get('methods', ())
+        }
+
+    def lane_of(self, method):
+        """The lane running `method`, or None for an inline method."""
+        if method in self.inline:
+            return None
+        return self._method_lanes.get(method, self.lanes['default'])
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        lane = self.lane_of(rpc_method_name(handler_call_details))
+        if lane is None:
+            return handler
+
+        def unary_wrapper(behavior):
+            return lambda request, context: lane.call(behavior, request, context)
+
+        def stream_wrapper(behavior):
+            return lambda request, context: lane.stream(behavior, request, context)
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 7. Startup
+# ----------------------------------------------------
+
+class FirstRpcInterceptor(grpc.ServerInterceptor):
+    """
+    Calls `on_first_rpc()` when the first RPC has been served (a unary
+    response returned, or a first streamed message sent). Once it has fired,
+    handlers are returned unchanged.
+    """
+
+    def __init__(self, on_first_rpc):
+        self.on_first_rpc = on_first_rpc
+        self.fired = False
+
+    def _fire(self):
+        if not self.fired:
+            self.fired = True
+            self.on_first_rpc()
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if self.fired or handler is None:
+            return handler
+
+        def unary_wrapper(behavior):
+            def wrapped(request, context):
+                response = behavior(request, context)
+                self._fire()
+                return response
+            return wrapped
+
+        def stream_wrapper(behavior):
+            def wrapped(request, context):
+                for response in behavior(request, context):
+                    self._fire()
+                    yield response
+            return wrapped
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 8. SQL statements per RPC
+# ----------------------------------------------------
+
+class QueryCountInterceptor(grpc.ServerInterceptor):
+    """
+    Counts the SQL statements of every RPC and their time, through
+    connection.execute_wrapper (metrics sql.<method>.calls, .queries,
+    .time_ms, .last_queries and .max_queries).
+
+    A statement shape run at least `repeat_threshold` times by one call is
+    the N+1 pattern (one query per row of a previous query): the call is
+    counted in sql.<method>.n_plus_one and the shape printed once per method.
+    Must run on the thread that executes the handler (after LaneInterceptor).
+    """
+
+    def __init__(self, repeat_threshold=5):
+        self.repeat_threshold = repeat_threshold
+        self._reported = set()
+        self._lock = threading.Lock()
+
+    def _record(self, method, counter):
+        metrics.incr(f'sql.{method}.calls')
+        metrics.incr(f'sql.{method}.queries', counter.count)
+        metrics.incr(f'sql.{method}.time_ms', counter.duration * 1000)
+        metrics.set(f'sql.{method}.last_queries', counter.count)
+        metrics.set_max(f'sql.{method}.max_queries', counter.count)
+        repeated = counter.repeated(self.repeat_threshold)
+        if not repeated:
+            return
+        metrics.incr(f'sql.{method}.n_plus_one')
+        for sql, n in repeated.items():
+            with self._lock:
+                if (method, sql) in self._reported:
+                    continue
+                self._reported.add((method, sql))
+            print(f"⚠️ N+1 in {method}: {n} x {sql}")
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        method = rpc_method_name(handler_call_details)
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                with count_queries() as counter:
+                    try:
+                        return behavior(request, context)
+                    finally:
+                        self._record(method, counter)
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                with count_queries() as counter:
+                    try:
+                        yield from behavior(request, context)
+                    finally:
+                        self._record(method, counter)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 9. Memory of streaming RPCs
+# ----------------------------------------------------
+
+class StreamMemoryInterceptor(grpc.ServerInterceptor):
+    """
+    While tracemalloc is tracing (TraceMemory RPC), records for every call of
+    a streaming RPC how much the traced Python memory grew during the call:
+    the highest value seen at each message sent, minus the value at the
+    start (metrics memory.<method>.peak_kb, max over the calls, and
+    memory.<method>.last_peak_kb). A handler that loads a whole queryset
+    before its first message peaks at about the size of the result.
+
+    tracemalloc measures the whole process: concurrent calls add to each
+    other's peaks. When tracing is off, the cost is one is_tracing() per call.
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        method = rpc_method_name(handler_call_details)
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                if not tracemalloc.is_tracing():
+                    yield from behavior(request, context)
+                    return
+                start = peak = tracemalloc.get_traced_memory()[0]
+                try:
+                    for response in behavior(request, context):
+                        peak = max(peak, tracemalloc.get_traced_memory()[0])
+                        yield response
+                finally:
+                    peak_kb = round((peak - start) / 1024, 1)
+                    metrics.set(f'memory.{method}.last_peak_kb', peak_kb)
+                    metrics.set_max(f'memory.{method}.peak_kb', peak_kb)
+            return wrapper
+
+        return wrap_rpc_handler(handler, stream_wrapper=stream_wrapper)
+
+
+# ----------------------------------------------------
+# 10. Single-flight for identical reads
+# ----------------------------------------------------
+
+class _LeaderFailed(Exception):
+    pass
+
+
+class _Flight:
+    """One shared execution of a read: the responses of its leader, as they arrive."""
+
+    def __init__(self):
+        self.responses = []
+        self.done = False
+        self.failed = False
+        self.finished_at = None
+        self.followers = 0
+        self._changed = threading.Condition()
+
+    def add(self, response):
+        with self._changed:
+            self.responses.append(response)
+            self._changed.notify_all()
+
+    def finish(self, failed=False):
+        with self._changed:
+            self.done = True
+            self.failed = failed
+            self.finished_at = time.monotonic()
+            self._changed.notify_all()
+
+    def follow(self):
+        """Yields the responses as the leader produces them; raises _LeaderFailed if it fails."""
+        sent = 0
+        while True:
+            with self._changed:
+                while sent == len(self.responses) and not self.done:
+                    self._changed.wait()
+                if self.failed:
+                    raise _LeaderFailed()
+                responses, done = self.responses[sent:], self.done
+            for response in responses:
+                sent += 1
+                yield response
+            if done:
+                return
+
+
+class SingleFlightInterceptor(grpc.ServerInterceptor):
+    """
+    Concurrent calls of `methods` with the same request share one execution:
+    the first call (the leader) runs the handler, the others wait for it and
+    get the same responses, a stream being relayed to every follower as the
+    leader produces it (metrics single_flight.<method>.executions / .shared).
+
+    Calls are only grouped when they read the same data: same side of the
+    database for `routing` (primary after a write of the client, replicas
+    otherwise) and same `version()`, which changes at every committed write.
+    With scope 'client', only the calls of the same client are grouped.
+    With `window` > 0, a finished execution is also reused by the calls that
+    arrive up to `window` seconds after it, at the same version.
+
+    Runs before admission control and the lanes: followers take neither an
+    admission slot nor a lane thread. Only for handlers whose result depends
+    on the request alone (no metadata, no status set on the context).
+    """
+
+    def __init__(self, methods, window=0.0, scope='server', version=None, routing=None):
+        self.methods = frozenset(methods)
+        self.window = window
+        self.per_client = scope == 'client'
+        self.version = version
+        self.routing = routing
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _key(self, method, request, context):
+        return (
+            method,
+            request.SerializeToString(deterministic=True),
+            self.version() if self.version else None,
+            self.routing.reads_primary(method, context) if self.routing else None,
+            client_key(context) if self.per_client else None,
+        )
+
+    def _join(self, key):
+        """Returns (flight, True if this call leads it)."""
+        now = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not flight.failed and (
+                not flight.done or now - flight.finished_at < self.window
+            ):
+                flight.followers += 1
+                return flight, False
+            if self.window:
+                self._flights = {
+                    k: f for k, f in self._flights.items() if not f.done or now - f.finished_at < self.window
+                }
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _finish(self, key, flight, failed=False):
+        flight.finish(failed)
+        if failed or not self.window:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def _lead(self, key, flight, responses):
+        failed = True
+        try:
+            for response in responses:
+                flight.add(response)
+                yield response
+            failed = False
+        except GeneratorExit:
+            # The leader's client went away: the followers still get every response.
+            if flight.followers:
+                try:
+                    for response in responses:
+                        flight.add(response)
+                    failed = False
+                except Exception:
+                    pass  # Followers that have not received anything run the call themselves.
+            raise
+        finally:
+            responses.close()
+            self._finish(key, flight, failed)
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        method = rpc_method_name(handler_call_details)
+        if method not in self.methods:
+            return handler
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                key = self._key(method, request, context)
+                flight, leader = self._join(key)
+                if leader:
+                    metrics.incr(f'single_flight.{method}.executions')
+                    try:
+                        response = behavior(request, context)
+                    except BaseException:
+                        self._finish(key, flight, failed=True)
+                        raise
+                    flight.add(response)
+                    self._finish(key, flight)
+                    return response
+                metrics.incr(f'single_flight.{method}.shared')
+                try:
+                    return next(flight.follow())
+                except _LeaderFailed:
+                    return behavior(request, context)
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                key = self._key(method, request, context)
+                flight, leader = self._join(key)
+                if leader:
+                    metrics.incr(f'single_flight.{method}.executions')
+                    yield from self._lead(key, flight, behavior(request, context))
+                    return
+                metrics.incr(f'single_flight.{method}.shared')
+                sent = 0
+                try:
+                    for response in flight.follow():
+                        sent += 1
+                        yield response
+                except _LeaderFailed:
+                    if sent:
+                        context.abort(grpc.StatusCode.UNAVAILABLE, "Shared execution failed, retry the call.")
+                    yield from behavior(request, context)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary_wrapper, stream_wrapper)
+
+
+# ----------------------------------------------------
+# 11. Pre-serialized responses
+# ----------------------------------------------------
+
+def serialize_response(serializer):
+    """Response serializer that sends bytes (an already serialized message) as they are."""
+    def serialize(response):
+        return response if isinstance(response, bytes) else serializer(response)
+    return serialize
+
+
+class PreSerializedInterceptor(grpc.ServerInterceptor):
+    """
+    Lets the handlers of `methods` return or yield messages already
+    serialized (bytes, e.g. from search_cache), next to regular messages.
+    gRPC uses the serializer of the handler returned by the outermost
+    interceptor: this one must be first in the list.
+    """
+
+    def __init__(self, methods):
+        self.methods = frozenset(methods)
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or rpc_method_name(handler_call_details) not in self.methods:
+            return handler
+        if handler.unary_stream:
+            return grpc.unary_stream_rpc_method_handler(
+                handler.unary_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=serialize_response(handler.response_serializer),
+            )
+        return grpc.unary_unary_rpc_method_handler(
+            handler.unary_unary,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=serialize_response(handler.response_serializer),
+        )
@@ -0,0 +1,86 @@
+import threading
+import uuid
+from collections import deque
+
+import library_pb2
+
+# ----------------------------------------------------
+# Inventory change feed (used by the WatchInventory RPC)
+# ----------------------------------------------------
+
+Event = library_pb2.InventoryEvent
+
+
+class InventoryFeed:
+    """
+    In-memory, monotonically versioned log of Book changes.
+
+    Write handlers call `publish()` once their transaction has committed.
+    Each published event gets the next version; the last `history` events are
+    kept so a watcher that reconnects with (epoch, since_version) can catch
+    up without a new snapshot. `epoch` changes at every server start, so
+    versions from a previous process are never replayed.
+    """
+
+    def __init__(self, history=10000):
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self._events = deque(maxlen=history)
+        self._changed = threading.Condition()
+
+    def publish(self, kind, book=None, book_id=None):
+        """Records a change. `book` is a library_pb2.Book, or only `book_id` for a deletion."""
+        with self._changed:
+            self.version += 1
+            event = Event(kind=kind, version=self.version, epoch=self.epoch)
+            if book is not None:
+                event.book.CopyFrom(book)
+            else:
+                event.book.id = book_id
+            self._events.append(event)
+            self._changed.notify_all()
+            return self.version
+
+    def can_resume(self, epoch, since_version):
+        """True if every event after `since_version` is still in the log."""
+        with self._changed:
+            if epoch != self.epoch or since_version > self.version:
+                return False
+            oldest = self._events[0].version if self._events else self.version + 1
+            return since_version >= oldest - 1
+
+    def events_after(self, version):
+        with self._changed:
+            newer = []
+            for event in reversed(self._events):
+                if event.version <= version:
+                    break
+                newer.append(event)
+            newer.reverse()
+            return newer
+
+    def wait(self, version, timeout):
+        """Blocks until an event newer than `version` exists (or `timeout` expires)."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout=timeout)
+            return self.version > version
+
+
+class BookLocks:
+    """
+    Keeps the events of one book in the order of their commits. A write
+    handler takes the lock of the book as soon as its row is locked in the
+    transaction (select_for_update) and releases it once the change is
+    published, after the commit: the next write of the same book, waiting on
+    the row, cannot publish in between. Books share `stripes` locks.
+    """
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __call__(self, book_id):
+        return self._locks[book_id % len(self._locks)]
+
+
+inventory_feed = InventoryFeed()
+book_locks = BookLocks()
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.14 on 2026-10-19 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library_admin', '0007_alter_member_member_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['full_name'], name='member_full_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['phone'], name='member_phone_idx'),
+        ),
+    ]
@@ -12,6 +12,14 @@ class Member(models.Model):
     is_active = models.BooleanField(default=True)
     max_loans = models.IntegerField(default=5, verbose_name="Nombre maximum de prêts")
 
+    class Meta:
+        # Recherche par préfixe de GetAllMembers (email et member_id sont
+        # déjà indexés par leur contrainte unique).
+        indexes = [
+            models.Index(fields=['full_name'], name='member_full_name_idx'),
+            models.Index(fields=['phone'], name='member_phone_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         # Si le member_id est vide (chaîne vide ou None)
         if not self.member_id:
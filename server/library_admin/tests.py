@@ -1,3 +1,677 @@
-from django.test import TestCase
+import gc
+import threading
+import time
+from collections import namedtuple
+from unittest import mock
 
-# Create your tests here.
+import grpc
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+import grpc_handler
+import library_pb2
+from availability_index import MISSING, AvailabilityIndex, availability_index
+from benchmarks.startup_benchmark import cold_start, free_port
+from interceptors import AdaptiveLimiter, AdmissionControlInterceptor, LaneInterceptor, SingleFlightInterceptor
+from inventory_feed import inventory_feed
+from library_admin.models import Book, Member
+from query_counter import assert_max_queries
+from search_cache import BYTES_OVERHEAD, SearchCache
+from trigram_index import TrigramIndex, normalize_text, similarity, trigrams
+
+
+class LocalContext:
+    """Just enough of grpc.ServicerContext for the handlers."""
+
+    def __init__(self, metadata=()):
+        self.metadata = tuple(metadata)
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def peer(self):
+        return 'local'
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        self.details = details
+
+    def set_trailing_metadata(self, metadata):
+        self.trailing_metadata = tuple(metadata)
+
+    def abort(self, code, details):
+        self.code = code
+        raise RuntimeError(f"{code}: {details}")
+
+    def is_active(self):
+        return True
+
+
+HandlerCallDetails = namedtuple('HandlerCallDetails', 'method invocation_metadata')
+
+
+def intercepted(interceptors, behavior, method):
+    """The unary handler of `method` as the server gets it through `interceptors` (outermost first)."""
+    def continuation(index):
+        if index == len(interceptors):
+            return lambda details: grpc.unary_unary_rpc_method_handler(behavior)
+        return lambda details: interceptors[index].intercept_service(continuation(index + 1), details)
+    return continuation(0)(HandlerCallDetails(f'/{grpc_handler.SERVICE_NAME}/{method}', ()))
+
+
+# ----------------------------------------------------
+# Superuser RPCs
+# ----------------------------------------------------
+
+class RequireSuperuserTests(TestCase):
+    """CaptureProfile / TraceMemory trust the staff token signed by UserLogin, never x-staff-id."""
+
+    def setUp(self):
+        self.root = User.objects.create_superuser('root-token', 'root-token@example.org', 'secret')
+        User.objects.create_user('desk-token', 'desk-token@example.org', 'secret', is_staff=True)
+
+    def login(self, username):
+        response = grpc_handler.LibraryServicer().UserLogin(
+            library_pb2.LoginRequest(username=username, password='secret'), LocalContext(),
+        )
+        self.assertTrue(response.success)
+        return response.staff_token
+
+    def assertDenied(self, metadata):
+        context = LocalContext(metadata)
+        with self.assertRaises(RuntimeError):
+            grpc_handler.require_superuser(context)
+        self.assertEqual(context.code, grpc.StatusCode.PERMISSION_DENIED)
+
+    def test_superuser_token(self):
+        grpc_handler.require_superuser(LocalContext([('x-staff-token', self.login('root-token'))]))
+
+    def test_forged_staff_id(self):
+        self.assertDenied([('x-staff-id', str(self.root.id))])
+        self.assertDenied([('x-staff-token', str(self.root.id))])
+
+    def test_tampered_token(self):
+        token = self.login('desk-token')
+        self.assertDenied([('x-staff-token', token)])
+        # Même signature, id du superuser à la place de celui du guichetier.
+        _, rest = token.split(':', 1)
+        forged = signing.b64_encode(str(self.root.id).encode()).decode()
+        self.assertDenied([('x-staff-token', f"{forged}:{rest}")])
+
+    def test_expired_or_revoked_token(self):
+        token = self.login('root-token')
+        with self.settings(STAFF_TOKEN_MAX_AGE=-1):
+            self.assertDenied([('x-staff-token', token)])
+        User.objects.filter(id=self.root.id).update(is_superuser=False)
+        self.assertDenied([('x-staff-token', token)])
+
+
+# ----------------------------------------------------
+# Inventory change feed
+# ----------------------------------------------------
+
+class FeedOrderTests(TransactionTestCase):
+    """Events of one book are published in the order of the commits."""
+
+    def test_concurrent_borrows_publish_in_commit_order(self):
+        book = Book.objects.create(title="Germinal", author="Émile Zola", isbn="9990000000101",
+                                   total_copies=3, available_copies=3)
+        member = Member.objects.create(full_name="Feed Order", email="feed-order@example.org")
+        first_committed, release_first = threading.Event(), threading.Event()
+        publish = inventory_feed.publish
+        published = []
+
+        def slow_publish(kind, book=None, book_id=None):
+            # Le premier emprunt, déjà commité, publie en retard.
+            if not published and threading.current_thread().name == 'first':
+                first_committed.set()
+                release_first.wait(5)
+            version = publish(kind, book, book_id)
+            published.append((version, book.available_copies))
+            return version
+
+        def borrow():
+            try:
+                grpc_handler.borrow_copy({'id': book.id}, {'id': member.id})
+            finally:
+                grpc_handler.connections.close_all()
+
+        with mock.patch.object(inventory_feed, 'publish', slow_publish):
+            first = threading.Thread(target=borrow, name='first')
+            first.start()
+            self.assertTrue(first_committed.wait(5))
+            second = threading.Thread(target=borrow, name='second')
+            second.start()
+            time.sleep(0.3)
+            release_first.set()
+            first.join(5)
+            second.join(5)
+
+        self.assertEqual([available for _, available in sorted(published)], [2, 1])
+
+
+# ----------------------------------------------------
+# Availability index
+# ----------------------------------------------------
+
+class AvailabilityIndexTests(TestCase):
+
+    def setUp(self):
+        self.member = Member.objects.create(full_name="Index Reload", email="index-reload@example.org")
+        self.books = [
+            Book.objects.create(title=f"Index {n}", author="Auteur", isbn=f"99900000002{n:02d}",
+                                total_copies=3, available_copies=3)
+            for n in range(3)
+        ]
+
+    def test_borrow_during_reload(self):
+        """A borrow committed while load() scans, before or after its row, is counted once."""
+        first, _, last = self.books
+
+        def rows():
+            # Une ligne lue à la fois, comme un curseur qui avance dans la table.
+            for book in self.books:
+                yield Book.objects.values_list('id', 'available_copies', 'total_copies').get(id=book.id)
+                if book == first:
+                    # Le premier livre est déjà lu, le dernier pas encore.
+                    grpc_handler.borrow_copy({'id': first.id}, {'id': self.member.id})
+                    grpc_handler.borrow_copy({'id': last.id}, {'id': self.member.id})
+
+        availability_index.load(rows())
+        self.assertEqual(availability_index.get(first.id), (2, 3))
+        self.assertEqual(availability_index.get(last.id), (2, 3))
+        self.assertEqual(availability_index.get(self.books[1].id), (3, 3))
+
+    def test_lookups_during_reload(self):
+        index = AvailabilityIndex()
+        index.load([(1, 1, 2), (5, 0, 1)])
+
+        def rows():
+            yield (1, 1, 2)
+            # Les lectures et écritures ne sont pas bloquées par le chargement.
+            self.assertEqual(index.get(5), (0, 1))
+            index.remove(5)
+            index.set(9, 4, 4)
+            yield (5, 0, 1)
+
+        index.load(rows())
+        self.assertEqual(list(index.columns()[0]), [1, 9])
+        self.assertEqual(tuple(index.get_many([1, 5, 9])[0]), (1, MISSING, 4))
+
+
+# ----------------------------------------------------
+# SearchBooks result cache
+# ----------------------------------------------------
+
+class SearchCacheTests(SimpleTestCase):
+    # Une entrée d'un livre : 8 octets d'id et un message de 10 octets.
+    ENTRY = 8 + 10 + BYTES_OVERHEAD
+
+    def put(self, cache, query, version=1):
+        return cache.put(query, version, [len(query)], [query.encode().ljust(10)])
+
+    def test_lru_eviction(self):
+        cache = SearchCache(max_bytes=3 * self.ENTRY, max_entry_bytes=self.ENTRY)
+        for query in ('a', 'bb', 'ccc'):
+            self.assertTrue(self.put(cache, query))
+        self.assertIsNotNone(cache.get('a', 1))
+        self.put(cache, 'dddd')
+        self.assertIsNone(cache.get('bb', 1))
+        self.assertEqual([cache.get(query, 1)[0][0] for query in ('a', 'ccc', 'dddd')], [1, 3, 4])
+        self.assertEqual((len(cache), cache.bytes, cache.evictions), (3, 3 * self.ENTRY, 1))
+
+    def test_oversized_results_are_not_kept(self):
+        cache = SearchCache(max_bytes=3 * self.ENTRY, max_entry_bytes=self.ENTRY)
+        self.assertFalse(cache.put('big', 1, [1, 2], [b'x' * 10] * 2))
+        self.assertFalse(self.put(SearchCache(0), 'a'))
+
+    def test_newer_version_drops_every_entry(self):
+        cache = SearchCache()
+        self.put(cache, 'a', version=1)
+        self.put(cache, 'bb', version=1)
+        self.assertIsNone(cache.get('a', 2))
+        self.assertEqual((len(cache), cache.bytes), (0, 0))
+        # Un résultat lu avant l'écriture n'est plus gardé.
+        self.assertFalse(self.put(cache, 'a', version=1))
+        self.assertTrue(self.put(cache, 'a', version=2))
+        self.assertIsNone(cache.get('a', 1))
+        self.assertIsNotNone(cache.get('a', 2))
+
+    def test_max_age(self):
+        cache = SearchCache(max_age=0.05)
+        self.put(cache, 'a')
+        self.assertIsNotNone(cache.get('a', 1))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('a', 1))
+        self.assertEqual((len(cache), cache.bytes), (0, 0))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+# ----------------------------------------------------
+# Trigram index
+# ----------------------------------------------------
+
+class TrigramIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.load([
+            (1, "Les Trois Mousquetaires", "Alexandre Dumas"),
+            (2, "L'Étranger", "Albert Camus"),
+            (3, "La Peste", "Albert Camus"),
+            (4, "Les Misérables", "Victor Hugo"),
+        ])
+
+    def test_similarity(self):
+        self.assertEqual(normalize_text("Albert Camus — L'Étranger"), 'albert camus l etranger')
+        self.assertEqual(trigrams('camu'), {'  c', ' ca', 'cam', 'amu', 'mu '})
+        self.assertEqual(similarity(trigrams('camus'), trigrams('camus')), 1.0)
+        self.assertEqual(similarity(trigrams('camus'), trigrams('zola')), 0.0)
+        self.assertAlmostEqual(similarity(trigrams('dumas'), trigrams('dumass')), 5 / 8)
+
+    def test_misspelled_search(self):
+        self.assertEqual([book_id for book_id, _ in self.index.search('Dumass')], [1])
+        self.assertEqual([book_id for book_id, _ in self.index.search('camu')], [2, 3])
+        # Chaque mot de la requête doit trouver un mot du livre.
+        self.assertEqual([book_id for book_id, _ in self.index.search('peste camus')], [3])
+        self.assertEqual(self.index.search('peste hugo'), [])
+        self.assertEqual(self.index.search('  '), [])
+
+    def test_writes(self):
+        self.index.set(3, "La Chute", "Albert Camus")
+        self.index.remove(4)
+        self.assertEqual(self.index.search('peste'), [])
+        self.assertEqual([book_id for book_id, _ in self.index.search('chute')], [3])
+        self.assertEqual(self.index.search('miserables'), [])
+        self.assertEqual(len(self.index), 3)
+
+    def test_writes_during_load_are_replayed(self):
+        def rows():
+            yield (1, "Les Trois Mousquetaires", "Alexandre Dumas")
+            # Écritures commitées pendant le chargement, avant et après leur ligne.
+            self.index.set(1, "Vingt Ans Après", "Alexandre Dumas")
+            self.index.remove(2)
+            self.index.set(5, "Germinal", "Émile Zola")
+            # Les recherches ne sont pas bloquées et voient l'ancien index.
+            self.assertEqual([book_id for book_id, _ in self.index.search('peste')], [3])
+            yield (2, "L'Étranger", "Albert Camus")
+            yield (3, "La Peste", "Albert Camus")
+
+        self.index.load(rows())
+        self.assertIsNone(self.index._pending)
+        self.assertEqual([book_id for book_id, _ in self.index.search('vingt')], [1])
+        self.assertEqual(self.index.search('mousquetaires'), [])
+        self.assertEqual(self.index.search('etranger'), [])
+        self.assertEqual([book_id for book_id, _ in self.index.search('germinal')], [5])
+        self.assertEqual(len(self.index), 3)
+
+    def test_failed_load_keeps_the_index(self):
+        def rows():
+            yield (1, "Les Trois Mousquetaires", "Alexandre Dumas")
+            raise RuntimeError("database went away")
+
+        with self.assertRaises(RuntimeError):
+            self.index.load(rows())
+        self.assertIsNone(self.index._pending)
+        self.assertEqual(len(self.index), 4)
+
+
+# ----------------------------------------------------
+# Admission control
+# ----------------------------------------------------
+
+class AdaptiveLimiterTests(SimpleTestCase):
+
+    def complete(self, limiter, latency, failed=False):
+        self.assertTrue(limiter.try_acquire())
+        limiter.release(latency, failed)
+
+    def test_slow_completions_shrink_the_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=10)
+        self.complete(limiter, 0.010)
+        self.assertEqual(limiter.limit, 4)
+        self.complete(limiter, 0.050)
+        self.assertAlmostEqual(limiter.limit, 3.6)
+        for _ in range(30):
+            self.complete(limiter, 0.050)
+        self.assertEqual(limiter.limit, 1)
+        self.complete(limiter, 0.010, failed=True)
+        self.assertEqual(limiter.limit, 1)
+
+    def test_fast_completions_grow_the_limit_under_load(self):
+        limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=3)
+        self.complete(limiter, 0.010)
+        self.assertEqual(limiter.limit, 2.5)
+        # Une limite à moitié inutilisée ne grandit plus.
+        self.complete(limiter, 0.010)
+        self.assertEqual(limiter.limit, 2.5)
+        self.assertTrue(limiter.try_acquire())
+        for _ in range(10):
+            self.complete(limiter, 0.010)
+        self.assertEqual(limiter.limit, 3)
+
+    def test_limit_caps_inflight(self):
+        limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=10)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        limiter.release(0.010)
+        self.assertTrue(limiter.try_acquire())
+
+
+class AdmissionControlTests(SimpleTestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def behavior(self, request, context):
+        self.calls.append(request)
+        return library_pb2.Book(id=1)
+
+    def assertRejected(self, handler, request):
+        context = LocalContext()
+        with self.assertRaises(RuntimeError):
+            handler.unary_unary(request, context)
+        self.assertEqual(context.code, grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertEqual(context.trailing_metadata, (('grpc-retry-pushback-ms', '200'),))
+        self.assertNotIn(request, self.calls)
+
+    def test_queued_too_long(self):
+        admission = AdmissionControlInterceptor(max_queue_wait=0.05, retry_after=0.2)
+        late = intercepted([admission], self.behavior, 'SearchBooks')
+        time.sleep(0.1)
+        on_time = intercepted([admission], self.behavior, 'SearchBooks')
+        self.assertRejected(late, library_pb2.SearchRequest(query='late'))
+        self.assertEqual(on_time.unary_unary(library_pb2.SearchRequest(query='on time'), LocalContext()).id, 1)
+
+    def test_method_concurrency_limit(self):
+        admission = AdmissionControlInterceptor(method_limits={'SearchBooks': 1}, retry_after=0.2)
+        running, release = threading.Event(), threading.Event()
+
+        def slow_search(request, context):
+            running.set()
+            release.wait(5)
+            return library_pb2.Book(id=1)
+
+        first = threading.Thread(target=intercepted([admission], slow_search, 'SearchBooks').unary_unary,
+                                 args=(library_pb2.SearchRequest(query='first'), LocalContext()))
+        first.start()
+        self.assertTrue(running.wait(5))
+        try:
+            self.assertRejected(intercepted([admission], self.behavior, 'SearchBooks'),
+                                library_pb2.SearchRequest(query='second'))
+            # Les autres méthodes ont leur propre limite.
+            intercepted([admission], self.behavior, 'GetBook').unary_unary(library_pb2.SearchRequest(query='1'), LocalContext())
+        finally:
+            release.set()
+            first.join(5)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_exempt_methods_are_never_rejected(self):
+        admission = AdmissionControlInterceptor(max_queue_wait=0.01, max_limit=1, exempt=('BorrowBook',))
+        running, release = threading.Event(), threading.Event()
+
+        def slow_borrow(request, context):
+            running.set()
+            release.wait(5)
+            return library_pb2.Book(id=1)
+
+        first = threading.Thread(target=intercepted([admission], slow_borrow, 'BorrowBook').unary_unary,
+                                 args=(library_pb2.BorrowRequest(book_id=1), LocalContext()))
+        first.start()
+        self.assertTrue(running.wait(5))
+        try:
+            late = intercepted([admission], self.behavior, 'BorrowBook')
+            time.sleep(0.05)
+            request = library_pb2.BorrowRequest(book_id=2)
+            self.assertEqual(late.unary_unary(request, LocalContext()).id, 1)
+        finally:
+            release.set()
+            first.join(5)
+        self.assertEqual(self.calls, [request])
+
+    def test_wait_in_the_lane_queue(self):
+        """As in serve(), admission runs on the lane thread: the lane queue counts as queue wait."""
+        lanes = LaneInterceptor({'bulk': {'workers': 1, 'methods': ('SearchBooks',)}, 'default': {'workers': 1}})
+        self.addCleanup(lambda: [lane.executor.shutdown() for lane in lanes.lanes.values()])
+        admission = AdmissionControlInterceptor(max_queue_wait=0.1, retry_after=0.2)
+        running, release = threading.Event(), threading.Event()
+
+        def slow_search(request, context):
+            running.set()
+            release.wait(5)
+            return library_pb2.Book(id=1)
+
+        first = threading.Thread(target=intercepted([lanes, admission], slow_search, 'SearchBooks').unary_unary,
+                                 args=(library_pb2.SearchRequest(query='first'), LocalContext()))
+        first.start()
+        self.assertTrue(running.wait(5))
+        queued = intercepted([lanes, admission], self.behavior, 'SearchBooks')
+        threading.Timer(0.2, release.set).start()
+        self.assertRejected(queued, library_pb2.SearchRequest(query='queued'))
+        first.join(5)
+
+
+class AdmissionQueueDepthTests(SimpleTestCase):
+    """Calls that never reach the worker side of admission control leave the queue depth."""
+
+    def test_single_flight_followers(self):
+        admission = AdmissionControlInterceptor()
+        single_flight = SingleFlightInterceptor(['GetBook'])
+        leading, release = threading.Event(), threading.Event()
+
+        def get_book(request, context):
+            leading.set()
+            release.wait(5)
+            return library_pb2.Book(id=1)
+
+        request = library_pb2.SearchRequest(query='1')
+        handlers = [intercepted([single_flight, admission], get_book, 'GetBook') for _ in range(3)]
+        self.assertEqual(admission._queued, 3)
+        responses = []
+        threads = [
+            threading.Thread(target=lambda handler=handler: responses.append(handler.unary_unary(request, LocalContext())))
+            for handler in handlers[:2]
+        ]
+        threads[0].start()
+        self.assertTrue(leading.wait(5))
+        threads[1].start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual([response.id for response in responses], [1, 1])
+        # Le serveur lâche le handler d'un appel terminé : le follower sort de la file.
+        del threads, handlers[:2]
+        gc.collect()
+        self.assertEqual(admission._queued, 1)
+
+        # Le troisième appel est abandonné avant d'atteindre un worker.
+        del handlers
+        gc.collect()
+        self.assertEqual(admission._queued, 0)
+
+
+# ----------------------------------------------------
+# Single-flight
+# ----------------------------------------------------
+
+class SingleFlightTests(SimpleTestCase):
+
+    def setUp(self):
+        self.executions = 0
+        self.leading, self.release = threading.Event(), threading.Event()
+
+    def get_book(self, request, context):
+        self.executions += 1
+        execution = self.executions
+        if execution == 1:
+            self.leading.set()
+            self.release.wait(5)
+            if request.query == 'fail':
+                raise RuntimeError("leader failed")
+        return library_pb2.Book(id=execution)
+
+    def run_concurrently(self, single_flight, requests):
+        """Runs the first request as the leader, the others once it is running; returns the responses."""
+        responses = [None] * len(requests)
+
+        def call(position):
+            handler = intercepted([single_flight], self.get_book, 'GetBook')
+            try:
+                responses[position] = handler.unary_unary(requests[position], LocalContext())
+            except RuntimeError as error:
+                responses[position] = error
+
+        threads = [threading.Thread(target=call, args=(position,)) for position in range(len(requests))]
+        threads[0].start()
+        self.assertTrue(self.leading.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.2)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return responses
+
+    def test_identical_calls_share_one_execution(self):
+        single_flight = SingleFlightInterceptor(['GetBook'])
+        same = library_pb2.SearchRequest(query='1')
+        responses = self.run_concurrently(single_flight, [same, same, same, library_pb2.SearchRequest(query='2')])
+        self.assertEqual([response.id for response in responses], [1, 1, 1, 2])
+        self.assertEqual(self.executions, 2)
+        self.assertEqual(single_flight._flights, {})
+
+    def test_versions_are_not_shared(self):
+        versions = iter([1, 2])
+        single_flight = SingleFlightInterceptor(['GetBook'], version=lambda: next(versions))
+        same = library_pb2.SearchRequest(query='1')
+        self.assertEqual([response.id for response in self.run_concurrently(single_flight, [same, same])], [1, 2])
+
+    def test_followers_run_the_call_when_the_leader_fails(self):
+        single_flight = SingleFlightInterceptor(['GetBook'])
+        failing = library_pb2.SearchRequest(query='fail')
+        leader, follower = self.run_concurrently(single_flight, [failing, failing])
+        self.assertIsInstance(leader, RuntimeError)
+        self.assertEqual(follower.id, 2)
+
+    def test_window_reuses_a_finished_execution(self):
+        single_flight = SingleFlightInterceptor(['GetBook'], window=0.2)
+        self.release.set()
+        request = library_pb2.SearchRequest(query='1')
+        call = lambda: intercepted([single_flight], self.get_book, 'GetBook').unary_unary(request, LocalContext())
+        self.assertEqual([call().id, call().id], [1, 1])
+        time.sleep(0.25)
+        self.assertEqual(call().id, 2)
+
+    def test_other_methods_are_not_grouped(self):
+        single_flight = SingleFlightInterceptor(['SearchBooks'])
+        self.release.set()
+        handler = intercepted([single_flight], self.get_book, 'GetBook')
+        self.assertEqual(handler.unary_unary, self.get_book)
+
+
+# ----------------------------------------------------
+# Startup
+# ----------------------------------------------------
+
+# Temps maximal (ms) entre le lancement de grpc_handler.py et la première RPC
+# servie. benchmarks/startup_benchmark.py mesure la médiane de plusieurs
+# démarrages et le détail des phases.
+STARTUP_BUDGET_MS = 3000
+STARTUP_PHASES = ('imports', 'django.setup', 'app.imports', 'server.start', 'db.warm_up')
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """Cold start of a real server process, with the settings of the tests."""
+
+    def test_first_rpc_within_budget(self):
+        first_rpc_ms, values = cold_start(free_port())
+        for phase in STARTUP_PHASES:
+            self.assertIn(f'startup.{phase}_ms', values)
+        self.assertLessEqual(values['startup.first_rpc_ms'], first_rpc_ms)
+        self.assertLessEqual(first_rpc_ms, STARTUP_BUDGET_MS, f"startup phases: {values}")
+
+
+# ----------------------------------------------------
+# SQL statements per RPC (query budgets)
+# ----------------------------------------------------
+
+# Counted on SQLite, where transaction.atomic() issues a BEGIN statement
+# (one statement less on MySQL for the writes in a transaction). When a
+# handler legitimately needs more queries, raise its budget here in the same
+# change.
+QUERY_BUDGETS = {
+    'CreateBook': 1,
+    'GetBook': 1,
+    'BatchGetBooks': 1,
+    'UpdateBookAvailability': 3,
+    'SearchBooks': 1,
+    'CreateMember': 1,
+    'GetMemberDetail': 1,
+    'BatchGetMembers': 1,
+    'UpdateMember': 2,
+    'GetAllMembers': 1,
+    'BorrowBook': 5,
+    'ReturnBook': 4,
+    'ScanCheckout': 5,
+    'ScanReturn': 4,
+    'GetAllUsers': 1,
+    'DeleteMember': 4,
+    'DeleteBook': 4,
+}
+
+
+class QueryBudgetTests(TransactionTestCase):
+    """
+    Every handler of LibraryServicer stays within its SQL budget and runs no
+    statement shape SQL_REPEATED_QUERY_THRESHOLD times (N+1). Transactions
+    are real (TransactionTestCase), as in the server.
+    """
+
+    def call(self, method, request):
+        with self.subTest(method):
+            with assert_max_queries(QUERY_BUDGETS[method], method) as counter:
+                response = getattr(grpc_handler.LibraryServicer(), method)(request, LocalContext())
+                if not hasattr(response, 'SerializeToString'):
+                    response = list(response)
+            repeated = counter.repeated(settings.SQL_REPEATED_QUERY_THRESHOLD)
+            self.assertFalse(repeated, f"{method}: N+1\n{counter.report()}")
+            if getattr(response, 'success', True) is False:
+                self.fail(f"{method} failed: {response.message}")
+            return response
+
+    def test_query_budgets(self):
+        isbn, email = '9990000000017', 'query-budget@example.org'
+        book_id = self.call('CreateBook', library_pb2.Book(
+            title='Query budget', author='CI', isbn=isbn, total_copies=2,
+        )).entity_id
+        self.call('GetBook', library_pb2.SearchRequest(query=str(book_id)))
+        self.call('BatchGetBooks', library_pb2.BatchGetRequest(
+            keys=[isbn, '0000000000000'], key_type=library_pb2.BatchGetRequest.ISBN,
+        ))
+        self.call('UpdateBookAvailability', library_pb2.Book(
+            id=book_id, title='Query budget', update_mask={'paths': ['title']},
+        ))
+        self.call('SearchBooks', library_pb2.SearchRequest(query='Query budget'))
+
+        member_id = str(self.call('CreateMember', library_pb2.Member(full_name='Query Budget', email=email)).entity_id)
+        member_code = self.call('GetMemberDetail', library_pb2.UserIdRequest(user_id=member_id)).member_id
+        self.call('BatchGetMembers', library_pb2.BatchGetRequest(keys=[member_id, '0', member_id]))
+        self.call('UpdateMember', library_pb2.Member(id=member_id, full_name='Query Budget', email=email, phone='0'))
+        self.call('GetAllMembers', library_pb2.MemberSearchRequest(query='Query Budget', page_size=50))
+
+        loan = library_pb2.BorrowRequest(member_id=member_id, book_id=book_id)
+        self.call('BorrowBook', loan)
+        self.call('ReturnBook', loan)
+        scan = library_pb2.ScanRequest(member_code=member_code, isbn=isbn)
+        self.call('ScanCheckout', scan)
+        self.call('ScanReturn', scan)
+        self.call('GetAllUsers', library_pb2.SearchRequest())
+
+        self.call('DeleteMember', library_pb2.UserIdRequest(user_id=member_id))
+        self.call('DeleteBook', library_pb2.SearchRequest(query=str(book_id)))
@@ -56,7 +56,7 @@ class LibraryServiceStub(object):
                 _registered_method=True)
         self.GetAllMembers = channel.unary_stream(
                 '/library_system.LibraryService/GetAllMembers',
-                request_serializer=library__pb2.SearchRequest.SerializeToString,
+                request_serializer=library__pb2.MemberSearchRequest.SerializeToString,
                 response_deserializer=library__pb2.Member.FromString,
                 _registered_method=True)
         self.GetMemberDetail = channel.unary_unary(
@@ -64,6 +64,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__pb2.UserIdRequest.SerializeToString,
                 response_deserializer=library__pb2.Member.FromString,
                 _registered_method=True)
+        self.BatchGetMembers = channel.unary_unary(
+                '/library_system.LibraryService/BatchGetMembers',
+                request_serializer=library__pb2.BatchGetRequest.SerializeToString,
+                response_deserializer=library__pb2.BatchGetMembersResponse.FromString,
+                _registered_method=True)
         self.CreateBook = channel.unary_unary(
                 '/library_system.LibraryService/CreateBook',
                 request_serializer=library__pb2.Book.SerializeToString,
@@ -79,6 +84,16 @@ class LibraryServiceStub(object):
                 request_serializer=library__pb2.SearchRequest.SerializeToString,
                 response_deserializer=library__pb2.Book.FromString,
                 _registered_method=True)
+        self.BatchGetBooks = channel.unary_unary(
+                '/library_system.LibraryService/BatchGetBooks',
+                request_serializer=library__pb2.BatchGetRequest.SerializeToString,
+                response_deserializer=library__pb2.BatchGetBooksResponse.FromString,
+                _registered_method=True)
+        self.GetAvailability = channel.unary_unary(
+                '/library_system.LibraryService/GetAvailability',
+                request_serializer=library__pb2.AvailabilityRequest.SerializeToString,
+                response_deserializer=library__pb2.AvailabilityResponse.FromString,
+                _registered_method=True)
         self.UpdateBookAvailability = channel.unary_unary(
                 '/library_system.LibraryService/UpdateBookAvailability',
                 request_serializer=library__pb2.Book.SerializeToString,
@@ -99,6 +114,16 @@ class LibraryServiceStub(object):
                 request_serializer=library__pb2.BorrowRequest.SerializeToString,
                 response_deserializer=library__pb2.StatusResponse.FromString,
                 _registered_method=True)
+        self.ScanCheckout = channel.unary_unary(
+                '/library_system.LibraryService/ScanCheckout',
+                request_serializer=library__pb2.ScanRequest.SerializeToString,
+                response_deserializer=library__pb2.StatusResponse.FromString,
+                _registered_method=True)
+        self.ScanReturn = channel.unary_unary(
+                '/library_system.LibraryService/ScanReturn',
+                request_serializer=library__pb2.ScanRequest.SerializeToString,
+                response_deserializer=library__pb2.StatusResponse.FromString,
+                _registered_method=True)
         self.GetAllUsers = channel.unary_stream(
                 '/library_system.LibraryService/GetAllUsers',
                 request_serializer=library__pb2.SearchRequest.SerializeToString,
@@ -119,6 +144,31 @@ class LibraryServiceStub(object):
                 request_serializer=library__pb2.UpdateProfileRequest.SerializeToString,
                 response_deserializer=library__pb2.StatusResponse.FromString,
                 _registered_method=True)
+        self.WatchInventory = channel.unary_stream(
+                '/library_system.LibraryService/WatchInventory',
+                request_serializer=library__pb2.WatchInventoryRequest.SerializeToString,
+                response_deserializer=library__pb2.InventoryEvent.FromString,
+                _registered_method=True)
+        self.GetServerMetrics = channel.unary_unary(
+                '/library_system.LibraryService/GetServerMetrics',
+                request_serializer=library__pb2.MetricsRequest.SerializeToString,
+                response_deserializer=library__pb2.MetricsResponse.FromString,
+                _registered_method=True)
+        self.GetDataVersion = channel.unary_unary(
+                '/library_system.LibraryService/GetDataVersion',
+                request_serializer=library__pb2.DataVersionRequest.SerializeToString,
+                response_deserializer=library__pb2.DataVersionResponse.FromString,
+                _registered_method=True)
+        self.CaptureProfile = channel.unary_unary(
+                '/library_system.LibraryService/CaptureProfile',
+                request_serializer=library__pb2.ProfileRequest.SerializeToString,
+                response_deserializer=library__pb2.ProfileResponse.FromString,
+                _registered_method=True)
+        self.TraceMemory = channel.unary_unary(
+                '/library_system.LibraryService/TraceMemory',
+                request_serializer=library__pb2.MemoryTraceRequest.SerializeToString,
+                response_deserializer=library__pb2.MemoryTraceResponse.FromString,
+                _registered_method=True)
 
 
 class LibraryServiceServicer(object):
@@ -160,6 +210,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BatchGetMembers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def CreateBook(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -178,6 +234,18 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BatchGetBooks(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetAvailability(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def UpdateBookAvailability(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -202,6 +270,18 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ScanCheckout(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ScanReturn(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetAllUsers(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -226,6 +306,36 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchInventory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetServerMetrics(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetDataVersion(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CaptureProfile(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TraceMemory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LibraryServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -251,7 +361,7 @@ def add_LibraryServiceServicer_to_server(servicer, server):
             ),
             'GetAllMembers': grpc.unary_stream_rpc_method_handler(
                     servicer.GetAllMembers,
-                    request_deserializer=library__pb2.SearchRequest.FromString,
+                    request_deserializer=library__pb2.MemberSearchRequest.FromString,
                     response_serializer=library__pb2.Member.SerializeToString,
             ),
             'GetMemberDetail': grpc.unary_unary_rpc_method_handler(
@@ -259,6 +369,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__pb2.UserIdRequest.FromString,
                     response_serializer=library__pb2.Member.SerializeToString,
             ),
+            'BatchGetMembers': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetMembers,
+                    request_deserializer=library__pb2.BatchGetRequest.FromString,
+                    response_serializer=library__pb2.BatchGetMembersResponse.SerializeToString,
+            ),
             'CreateBook': grpc.unary_unary_rpc_method_handler(
                     servicer.CreateBook,
                     request_deserializer=library__pb2.Book.FromString,
@@ -274,6 +389,16 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__pb2.SearchRequest.FromString,
                     response_serializer=library__pb2.Book.SerializeToString,
             ),
+            'BatchGetBooks': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetBooks,
+                    request_deserializer=library__pb2.BatchGetRequest.FromString,
+                    response_serializer=library__pb2.BatchGetBooksResponse.SerializeToString,
+            ),
+            'GetAvailability': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetAvailability,
+                    request_deserializer=library__pb2.AvailabilityRequest.FromString,
+                    response_serializer=library__pb2.AvailabilityResponse.SerializeToString,
+            ),
             'UpdateBookAvailability': grpc.unary_unary_rpc_method_handler(
                     servicer.UpdateBookAvailability,
                     request_deserializer=library__pb2.Book.FromString,
@@ -294,6 +419,16 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__pb2.BorrowRequest.FromString,
                     response_serializer=library__pb2.StatusResponse.SerializeToString,
             ),
+            'ScanCheckout': grpc.unary_unary_rpc_method_handler(
+                    servicer.ScanCheckout,
+                    request_deserializer=library__pb2.ScanRequest.FromString,
+                    response_serializer=library__pb2.StatusResponse.SerializeToString,
+            ),
+            'ScanReturn': grpc.unary_unary_rpc_method_handler(
+                    servicer.ScanReturn,
+                    request_deserializer=library__pb2.ScanRequest.FromString,
+                    response_serializer=library__pb2.StatusResponse.SerializeToString,
+            ),
             'GetAllUsers': grpc.unary_stream_rpc_method_handler(
                     servicer.GetAllUsers,
                     request_deserializer=library__pb2.SearchRequest.FromString,
@@ -314,6 +449,31 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__pb2.UpdateProfileRequest.FromString,
                     response_serializer=library__pb2.StatusResponse.SerializeToString,
             ),
+            'WatchInventory': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchInventory,
+                    request_deserializer=library__pb2.WatchInventoryRequest.FromString,
+                    response_serializer=library__pb2.InventoryEvent.SerializeToString,
+            ),
+            'GetServerMetrics': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetServerMetrics,
+                    request_deserializer=library__pb2.MetricsRequest.FromString,
+                    response_serializer=library__pb2.MetricsResponse.SerializeToString,
+            ),
+            'GetDataVersion': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetDataVersion,
+                    request_deserializer=library__pb2.DataVersionRequest.FromString,
+                    response_serializer=library__pb2.DataVersionResponse.SerializeToString,
+            ),
+            'CaptureProfile': grpc.unary_unary_rpc_method_handler(
+                    servicer.CaptureProfile,
+                    request_deserializer=library__pb2.ProfileRequest.FromString,
+                    response_serializer=library__pb2.ProfileResponse.SerializeToString,
+            ),
+            'TraceMemory': grpc.unary_unary_rpc_method_handler(
+                    servicer.TraceMemory,
+                    request_deserializer=library__pb2.MemoryTraceRequest.FromString,
+                    response_serializer=library__pb2.MemoryTraceResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'library_system.LibraryService', rpc_method_handlers)
@@ -448,7 +608,7 @@ class LibraryService(object):
             request,
             target,
             '/library_system.LibraryService/GetAllMembers',
-            library__pb2.SearchRequest.SerializeToString,
+            library__pb2.MemberSearchRequest.SerializeToString,
             library__pb2.Member.FromString,
             options,
             channel_credentials,
@@ -487,6 +647,33 @@ class LibraryService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def BatchGetMembers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/BatchGetMembers',
+            library__pb2.BatchGetRequest.SerializeToString,
+            library__pb2.BatchGetMembersResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def CreateBook(request,
             target,
@@ -568,6 +755,60 @@ class LibraryService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def BatchGetBooks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/BatchGetBooks',
+            library__pb2.BatchGetRequest.SerializeToString,
+            library__pb2.BatchGetBooksResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetAvailability(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/GetAvailability',
+            library__pb2.AvailabilityRequest.SerializeToString,
+            library__pb2.AvailabilityResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def UpdateBookAvailability(request,
             target,
@@ -676,6 +917,60 @@ class LibraryService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ScanCheckout(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/ScanCheckout',
+            library__pb2.ScanRequest.SerializeToString,
+            library__pb2.StatusResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ScanReturn(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/ScanReturn',
+            library__pb2.ScanRequest.SerializeToString,
+            library__pb2.StatusResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetAllUsers(request,
             target,
@@ -783,3 +1078,138 @@ class LibraryService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def WatchInventory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/library_system.LibraryService/WatchInventory',
+            library__pb2.WatchInventoryRequest.SerializeToString,
+            library__pb2.InventoryEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetServerMetrics(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/GetServerMetrics',
+            library__pb2.MetricsRequest.SerializeToString,
+            library__pb2.MetricsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetDataVersion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/GetDataVersion',
+            library__pb2.DataVersionRequest.SerializeToString,
+            library__pb2.DataVersionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CaptureProfile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/CaptureProfile',
+            library__pb2.ProfileRequest.SerializeToString,
+            library__pb2.ProfileResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TraceMemory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/library_system.LibraryService/TraceMemory',
+            library__pb2.MemoryTraceRequest.SerializeToString,
+            library__pb2.MemoryTraceResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,107 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+
+# Alias used for reads by the RPC running on the current thread (None = primary).
+_routing = threading.local()
+
+
+@contextmanager
+def route_reads(alias):
+    """Sends the ORM reads made inside the block to `alias` (None = primary)."""
+    previous = getattr(_routing, 'alias', None)
+    _routing.alias = alias
+    try:
+        yield
+    finally:
+        _routing.alias = previous
+
+
+def current_read_alias():
+    """Alias the reads of the current thread go to (None = primary)."""
+    return getattr(_routing, 'alias', None)
+
+
+class ReplicaPool:
+    """
+    Round-robin over the aliases listed in DATABASE_REPLICAS, skipping the
+    ones marked down until `check()` sees them answer again.
+    """
+
+    def __init__(self, aliases):
+        self.aliases = list(aliases)
+        self._down = set()
+        self._cycle = itertools.cycle(self.aliases) if self.aliases else None
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """Returns a healthy replica alias, or None if reads must go to the primary."""
+        with self._lock:
+            for _ in range(len(self.aliases)):
+                alias = next(self._cycle)
+                if alias not in self._down:
+                    return alias
+        return None
+
+    def mark_down(self, alias):
+        with self._lock:
+            self._down.add(alias)
+        print(f"⚠️ Replica '{alias}' excluded from reads.")
+
+    def check(self):
+        """Pings every replica and updates the set of excluded ones."""
+        for alias in self.aliases:
+            try:
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except Exception:
+                connections[alias].close()
+                if alias not in self._down:
+                    self.mark_down(alias)
+            else:
+                with self._lock:
+                    if alias in self._down:
+                        self._down.discard(alias)
+                        print(f"✅ Replica '{alias}' back in the read pool.")
+
+    def start_health_checks(self, interval):
+        def loop():
+            while True:
+                self.check()
+                time.sleep(interval)
+        if self.aliases:
+            threading.Thread(target=loop, name='replica-health', daemon=True).start()
+
+
+replicas = ReplicaPool(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes always go to the primary. Reads go to the alias chosen for the
+    current RPC by interceptors.DatabaseRoutingInterceptor, and to the
+    primary outside of an RPC (manage.py, admin, ...).
+    """
+
+    def db_for_read(self, model, **hints):
+        return getattr(_routing, 'alias', None) or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {PRIMARY, *replicas.aliases}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas normally receive the schema through replication; allowing
+        # migrate on them keeps `migrate --database=replica` usable locally.
+        return True
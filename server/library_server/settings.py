@@ -80,10 +80,34 @@ DATABASES = {
         'USER': 'root',
         'PASSWORD': '',
         'HOST': 'localhost',
-        'PORT': '3306'
+        'PORT': '3306',
+        # Connexions persistantes : chaque thread du serveur gRPC garde sa
+        # connexion, vérifiée avant réutilisation (ConnectionLifecycleInterceptor).
+        'CONN_MAX_AGE': 300,
+        'CONN_HEALTH_CHECKS': True,
      }
 }
 
+# Read replicas
+# Alias de DATABASES utilisés par les RPC en lecture seule (SearchBooks,
+# GetAllMembers, GetBook, ...). Les écritures vont toujours sur 'default'.
+# Essai en local avec deux fichiers SQLite :
+#   DATABASES = {
+#       'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'primary.sqlite3'},
+#       'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3'},
+#   }
+#   DATABASE_REPLICAS = ['replica']
+# puis `python manage.py migrate` et `python manage.py migrate --database=replica`.
+
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['library_server.db_router.PrimaryReplicaRouter']
+# Après une écriture, le même membre du staff lit sur le primaire pendant ce délai (s).
+DATABASE_STICKY_SECONDS = 5.0
+DATABASE_REPLICA_CHECK_INTERVAL = 10.0
+# Nombre maximal de connexions que le serveur gRPC peut ouvrir sur chaque base
+# (max_connections de MySQL moins la marge des autres clients).
+DATABASE_MAX_CONNECTIONS = 100
+
 
 
 # Password validation
@@ -126,3 +150,137 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# gRPC server
+# Threads gRPC qui reçoivent les appels. Le travail (et les connexions à la
+# base) se fait dans les voies de GRPC_LANES ; ces threads ne font qu'attendre
+# le résultat, et portent les flux WatchInventory de longue durée.
+
+GRPC_MAX_WORKERS = 32
+
+# Voies d'exécution : chaque groupe de RPC a ses propres threads, pour qu'une
+# rafale de listes complètes ne bloque pas les emprunts au comptoir.
+GRPC_LANES = {
+    'circulation': {
+        'workers': 4,
+        'methods': (
+            'BorrowBook', 'ReturnBook', 'ScanCheckout', 'ScanReturn', 'GetBook', 'BatchGetBooks',
+            'BatchGetMembers', 'UserLogin',
+        ),
+    },
+    'bulk': {
+        'workers': 4,
+        'methods': ('SearchBooks', 'GetAllMembers', 'GetAllUsers'),
+    },
+    'default': {
+        'workers': 2,
+    },
+}
+# RPC exécutées directement sur le thread gRPC (flux longs, monitoring).
+GRPC_INLINE_RPCS = (
+    'WatchInventory', 'GetServerMetrics', 'GetDataVersion', 'GetAvailability', 'CaptureProfile', 'TraceMemory',
+)
+
+# Compression par défaut des réponses ('gzip', 'deflate' ou None) et taille
+# minimale (en octets) d'un message pour qu'il soit compressé.
+GRPC_COMPRESSION = None
+GRPC_COMPRESSION_THRESHOLD = 1024
+GRPC_METHOD_COMPRESSION = {}
+
+# Port d'écoute (python grpc_handler.py --port N pour lancer plusieurs serveurs).
+GRPC_PORT = 50051
+
+# Service de health check gRPC : SERVING tant que la base primaire répond,
+# vérifié toutes les GRPC_HEALTH_CHECK_INTERVAL secondes. Sur SIGTERM, le
+# serveur passe NOT_SERVING pendant GRPC_DRAIN_SECONDS (les clients répartis
+# basculent sur les autres serveurs), puis s'arrête en laissant
+# GRPC_SHUTDOWN_GRACE secondes aux RPC en cours.
+GRPC_HEALTH_CHECK_INTERVAL = 2.0
+GRPC_DRAIN_SECONDS = 5.0
+GRPC_SHUTDOWN_GRACE = 10.0
+
+# Admission control : au-delà de GRPC_MAX_CONCURRENT_RPCS appels (en cours +
+# en attente), gRPC refuse directement. En dessous, chaque RPC a une limite de
+# concurrence adaptative (AIMD) et un appel resté trop longtemps en file (file
+# de sa voie comprise) est rejeté (RESOURCE_EXHAUSTED) avant tout accès à la
+# base. Les limites ne dépassent pas le nombre de threads de la voie de la
+# RPC (GRPC_LANES) : au-delà, la voie ferait attendre avant tout rejet.
+# 'max_limit' vaut pour la voie 'default' (2 threads).
+GRPC_MAX_CONCURRENT_RPCS = 100
+GRPC_ADMISSION = {
+    'max_queue_wait': 0.5,
+    'initial_limit': 4,
+    'min_limit': 1,
+    'max_limit': 2,
+    'method_limits': {
+        'GetBook': 4,
+        'BatchGetBooks': 4,
+        'BatchGetMembers': 4,
+        'SearchBooks': 4,
+        'GetAllMembers': 4,
+        'GetAllUsers': 2,
+    },
+    'exempt': ('BorrowBook', 'ReturnBook', 'ScanCheckout', 'ScanReturn', 'UserLogin', 'WatchInventory',
+               'GetServerMetrics', 'GetDataVersion', 'GetAvailability', 'CaptureProfile', 'TraceMemory'),
+    'retry_after': 0.2,
+}
+
+# GetAllMembers : taille maximale d'une page demandée par le client
+# (MemberSearchRequest.page_size).
+MEMBER_SEARCH_MAX_PAGE_SIZE = 200
+
+# Comptage des requêtes SQL par RPC (métriques sql.*) : une même requête
+# exécutée au moins ce nombre de fois dans un appel est signalée comme N+1.
+SQL_REPEATED_QUERY_THRESHOLD = 5
+
+# CaptureProfile : durée maximale d'une capture (secondes), pendant laquelle
+# un thread gRPC reste occupé.
+PROFILE_MAX_SECONDS = 60
+
+# CaptureProfile / TraceMemory : réservées aux superusers, identifiés par le
+# jeton signé (SECRET_KEY) que renvoie UserLogin, valable ce nombre de secondes.
+STAFF_TOKEN_MAX_AGE = 12 * 3600
+
+# BatchGetBooks / BatchGetMembers : nombre maximal de clés par appel.
+BATCH_GET_MAX_KEYS = 500
+
+# GetAvailability : index en mémoire du stock de chaque livre, chargé au
+# démarrage et mis à jour par les RPC d'écriture. Rechargé depuis la base
+# toutes les AVAILABILITY_INDEX_RELOAD_SECONDS secondes (0 = jamais) pour les
+# écritures faites hors RPC (admin Django, scripts).
+AVAILABILITY_INDEX_RELOAD_SECONDS = 300
+
+# Single-flight : les appels identiques en cours au même moment (même RPC,
+# même requête, même version des données) partagent une seule exécution en
+# base. 'methods' : RPC concernées, dont le résultat ne dépend que de la
+# requête. 'window' : durée (s) pendant laquelle un résultat terminé sert
+# encore aux appels identiques (0 = seulement les appels simultanés).
+# 'scope' : 'server' (tous les clients) ou 'client' (appels d'un même client).
+SINGLE_FLIGHT = {
+    'methods': ('SearchBooks', 'GetAllMembers'),
+    'window': 0.0,
+    'scope': 'server',
+}
+
+# Cache des résultats de SearchBooks (messages déjà sérialisés), vidé dès
+# qu'une écriture d'un RPC touche un livre. Taille maximale en octets (LRU) ;
+# un résultat de plus du quart de cette taille n'est pas gardé. 0 = désactivé.
+# Les écritures faites hors RPC (admin Django, scripts) ne vident pas le
+# cache : une entrée est servie au plus SEARCH_CACHE_MAX_AGE_SECONDS secondes
+# (0 = sans limite), comme les index rechargés toutes les
+# AVAILABILITY_INDEX_RELOAD_SECONDS / TRIGRAM_INDEX_RELOAD_SECONDS secondes.
+SEARCH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+SEARCH_CACHE_MAX_AGE_SECONDS = 300
+
+# Recherche tolérante aux fautes : quand aucun titre ni auteur ne contient
+# la requête, SearchBooks renvoie les livres dont chaque mot de la requête
+# ressemble à un mot du titre ou de l'auteur (index de trigrammes en
+# mémoire, sans accents). 'threshold' : similarité minimale d'un mot (0 à 1,
+# comme pg_trgm). 'limit' : nombre maximal de livres (0 = désactivée).
+FUZZY_SEARCH = {
+    'threshold': 0.3,
+    'limit': 50,
+}
+# Rechargement de l'index de trigrammes depuis la base (0 = jamais).
+TRIGRAM_INDEX_RELOAD_SECONDS = 300
@@ -0,0 +1,61 @@
+import threading
+import tracemalloc
+
+# ----------------------------------------------------
+# Python memory tracing (used by the TraceMemory RPC)
+# ----------------------------------------------------
+
+DEFAULT_TOP = 25
+
+# Allocations of tracemalloc itself and of the import machinery.
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class MemoryTracer:
+    """
+    Starts and stops tracemalloc for the whole process. start() keeps a
+    reference snapshot; diff() compares a new snapshot to it and returns the
+    allocation sites (file:line) whose memory grew the most.
+
+    While tracing, every allocation of the server is slower (a few tens of
+    percent): tracing is meant to be left on for a diagnosis only.
+    """
+
+    def __init__(self):
+        self._baseline = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, frames=1):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._baseline = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def diff(self, top=DEFAULT_TOP):
+        """[StatisticDiff] of the `top` sites that grew most since start()."""
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._baseline is None:
+                return []
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            return snapshot.compare_to(self._baseline, 'lineno')[:top]
+
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+            tracemalloc.stop()
+
+    def memory(self):
+        """(current, peak) bytes traced, (0, 0) when not tracing."""
+        return tracemalloc.get_traced_memory()
+
+
+memory_tracer = MemoryTracer()
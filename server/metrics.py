@@ -0,0 +1,36 @@
+import threading
+
+# ----------------------------------------------------
+# In-process metrics (exposed by the GetServerMetrics RPC)
+# ----------------------------------------------------
+
+class Metrics:
+    """Thread-safe registry of named counters and gauges."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def set(self, name, value):
+        with self._lock:
+            self._values[name] = value
+
+    def set_max(self, name, value):
+        with self._lock:
+            if value > self._values.get(name, float('-inf')):
+                self._values[name] = value
+
+    def get(self, name, default=0):
+        with self._lock:
+            return self._values.get(name, default)
+
+    def snapshot(self, prefix=''):
+        with self._lock:
+            return {k: v for k, v in self._values.items() if k.startswith(prefix)}
+
+
+metrics = Metrics()
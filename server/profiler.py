@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# ----------------------------------------------------
+# Sampling CPU profiler (used by the CaptureProfile RPC)
+# ----------------------------------------------------
+
+DEFAULT_SECONDS = 5.0
+DEFAULT_INTERVAL = 0.01
+
+
+def frame_label(code):
+    """'LibraryServicer.SearchBooks (grpc_handler.py:193)': one label per function."""
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples, every `interval` seconds, the Python stack of every thread that
+    is running one of `root_codes` (the servicer methods) and counts each
+    stack from that frame down. Threads of the thread-pool server waiting for
+    work are not counted.
+
+    Sampling happens on the thread calling capture(), with sys._current_frames():
+    the handlers are not instrumented, so there is no overhead outside a
+    capture. One capture at a time.
+    """
+
+    def __init__(self, root_codes):
+        self.root_codes = frozenset(root_codes)
+        self._lock = threading.Lock()
+
+    def _stack(self, frame):
+        labels = []
+        while frame is not None:
+            labels.append(frame_label(frame.f_code))
+            if frame.f_code in self.root_codes:
+                labels.reverse()
+                return ';'.join(labels)
+            frame = frame.f_back
+        return None
+
+    def capture(self, seconds=DEFAULT_SECONDS, interval=DEFAULT_INTERVAL):
+        """Returns (Counter of collapsed stacks, number of samples, duration)."""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already being captured.")
+        try:
+            me = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            started = time.monotonic()
+            deadline = started + seconds
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stack = self._stack(frame)
+                    if stack:
+                        stacks[stack] += 1
+                samples += 1
+                time.sleep(interval)
+            return stacks, samples, time.monotonic() - started
+        finally:
+            self._lock.release()
+
+
+def collapsed(stacks):
+    """Counter of stacks -> collapsed-stack text (flamegraph.pl, speedscope)."""
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
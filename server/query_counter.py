@@ -0,0 +1,70 @@
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+# ----------------------------------------------------
+# SQL statement counting (QueryCountInterceptor, query budgets)
+# ----------------------------------------------------
+
+
+class QueryCounter:
+    """
+    connection.execute_wrapper that counts the SQL statements run through it
+    and their total time. Statements are grouped by shape: the SQL before
+    parameter substitution, so `WHERE id = %s` run for ten different ids is
+    one shape seen ten times (the N+1 pattern).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql] += 1
+
+    def repeated(self, threshold):
+        """{shape: count} of the shapes executed at least `threshold` times."""
+        return {sql: n for sql, n in self.shapes.items() if n >= threshold}
+
+    def report(self):
+        lines = [f"{self.count} SQL statements in {self.duration * 1000:.1f} ms"]
+        for sql, n in self.shapes.most_common():
+            lines.append(f"  {n:>4} x {sql}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries():
+    """
+    Counts the statements run by the current thread on every database alias
+    (the primary and the replicas) inside the block. Yields the QueryCounter.
+    """
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+        yield counter
+
+
+@contextmanager
+def assert_max_queries(limit, label='block'):
+    """
+    Fails (AssertionError listing the statements) if the block runs more than
+    `limit` SQL statements, e.g.:
+
+        with assert_max_queries(4, 'ReturnBook'):
+            servicer.ReturnBook(request, context)
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        raise AssertionError(f"{label}: {counter.count} queries, budget is {limit}.\n{counter.report()}")
@@ -0,0 +1,108 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+# ----------------------------------------------------
+# SearchBooks result cache
+# ----------------------------------------------------
+
+# Coût approximatif d'un objet bytes en plus de son contenu (CPython).
+BYTES_OVERHEAD = 33
+
+
+def normalize_query(query):
+    """
+    Cache key of a search. Only ASCII queries are lowercased: icontains
+    ignores the case of ASCII letters on every backend, but SQLite compares
+    the other characters case-sensitively.
+    """
+    return query.lower() if query.isascii() else query
+
+
+class SearchCache:
+    """
+    Results of SearchBooks by normalized query, for one catalogue version
+    (inventory_feed.version, bumped by every committed Book write, loans
+    included since the messages carry the stock). Each entry keeps the
+    ordered book ids and the serialized Book messages, so a hit is sent
+    without touching the ORM or protobuf.
+
+    A lookup or a store with a newer version drops every entry: invalidation
+    costs nothing on the write path. The writes made outside the RPCs (Django
+    admin, scripts) do not change the version: an entry older than `max_age`
+    seconds is a miss (None = kept until the next version). The entries are
+    bounded by `max_bytes` (LRU eviction); a result bigger than
+    `max_entry_bytes` is not kept.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_entry_bytes=None, max_age=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 4
+        self.max_age = max_age
+        self.version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _move_to(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.bytes = 0
+            self.version = version
+
+    def get(self, query, version):
+        """(ids, payloads) of `query` at `version`, or None."""
+        with self._lock:
+            if self.version is None or version > self.version:
+                self._move_to(version)
+            entry = self._entries.get(query) if version == self.version else None
+            if entry is not None and self.max_age is not None and time.monotonic() - entry[3] > self.max_age:
+                del self._entries[query]
+                self.bytes -= entry[2]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(query)
+            self.hits += 1
+            ids, payloads, _, _ = entry
+            return ids, payloads
+
+    def put(self, query, version, ids, payloads):
+        """Stores a complete result read at `version`. Returns False if it is not kept."""
+        if not self.max_bytes:
+            return False
+        ids = array('q', ids)
+        size = ids.itemsize * len(ids) + sum(len(payload) + BYTES_OVERHEAD for payload in payloads)
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            if self.version is not None and version < self.version:
+                return False
+            self._move_to(version)
+            previous = self._entries.pop(query, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._entries[query] = (ids, tuple(payloads), size, time.monotonic())
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
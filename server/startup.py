@@ -0,0 +1,88 @@
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# ----------------------------------------------------
+# Startup profiling (python grpc_handler.py --profile-startup)
+# ----------------------------------------------------
+
+# "import time:  self [us] | cumulative | imported package", the package name
+# being indented by two spaces per nesting level.
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(text):
+    """Parses `python -X importtime` output into (module, self_us, cumulative_us, depth) tuples."""
+    modules = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def profile_imports(module, top=15):
+    """
+    Imports `module` in a fresh interpreter with `-X importtime` and returns
+    the `top` slowest imports (by cumulative time), plus the total in ms.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    modules = parse_importtime(result.stderr)
+    total_ms = sum(m[2] for m in modules if m[3] == 0) / 1000
+    return sorted(modules, key=lambda m: m[2], reverse=True)[:top], total_ms
+
+
+class StartupTimer:
+    """
+    Records how long each boot phase took. Times are measured from the
+    creation of the timer, i.e. from the first import of this module.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self.first_rpc_ms = None
+        self._last = self.started
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        """Ends `phase` now."""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000, (now - self.started) * 1000))
+        self._last = now
+
+    def first_rpc(self):
+        """Called after every RPC; only the first one is recorded."""
+        if self.first_rpc_ms is not None:
+            return
+        with self._lock:
+            if self.first_rpc_ms is None:
+                self.first_rpc_ms = (time.perf_counter() - self.started) * 1000
+                from metrics import metrics
+                for phase, duration_ms, _ in self.phases:
+                    metrics.set(f'startup.{phase}_ms', duration_ms)
+                metrics.set('startup.first_rpc_ms', self.first_rpc_ms)
+                print(f"⏱️ First RPC served {self.first_rpc_ms:.0f} ms after start.")
+
+    def report(self):
+        lines = ["⏱️ Startup phases:"]
+        for phase, duration_ms, elapsed_ms in self.phases:
+            lines.append(f"   {phase:<16} {duration_ms:8.1f} ms   (t+{elapsed_ms:.1f} ms)")
+        return "\n".join(lines)
+
+
+startup_timer = StartupTimer()
+
+
+def print_import_profile(module, top=15):
+    modules, total_ms = profile_imports(module, top)
+    print(f"⏱️ import {module}: {total_ms:.0f} ms in total, slowest imports (cumulative):")
+    for name, self_us, cumulative_us, depth in modules:
+        print(f"   {cumulative_us / 1000:8.1f} ms  {self_us / 1000:7.1f} ms self   {'  ' * depth}{name}")
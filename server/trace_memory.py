@@ -0,0 +1,59 @@
+"""
+Drives tracemalloc on the running gRPC server (TraceMemory RPC):
+
+    python trace_memory.py admin start
+    ... run the load to analyse (big GetAllMembers / SearchBooks streams) ...
+    python trace_memory.py admin snapshot     # allocation sites that grew, tracing continues
+    python trace_memory.py admin stop         # same, then stops tracing
+
+While tracing, the server also records memory.<method>.peak_kb per
+streaming RPC (GetServerMetrics). `username` must be an active superuser
+(its password is asked, as in capture_profile.py).
+
+Usage: python trace_memory.py <username> status|start|snapshot|stop [top] [address]
+"""
+import sys
+
+import grpc
+
+import library_pb2
+import library_pb2_grpc
+from capture_profile import login
+
+ACTIONS = {
+    'status': library_pb2.MemoryTraceRequest.STATUS,
+    'start': library_pb2.MemoryTraceRequest.START,
+    'snapshot': library_pb2.MemoryTraceRequest.SNAPSHOT,
+    'stop': library_pb2.MemoryTraceRequest.STOP,
+}
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ACTIONS:
+        sys.exit(__doc__)
+    username, action = sys.argv[1:3]
+    top = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+    address = sys.argv[4] if len(sys.argv) > 4 else 'localhost:50051'
+
+    with grpc.insecure_channel(address) as channel:
+        stub = library_pb2_grpc.LibraryServiceStub(channel)
+        metadata = login(stub, username)
+        try:
+            response = stub.TraceMemory(
+                library_pb2.MemoryTraceRequest(action=ACTIONS[action], top=top), metadata=metadata, timeout=60,
+            )
+            peaks = stub.GetServerMetrics(library_pb2.MetricsRequest(prefix='memory.'), timeout=5).values
+        except grpc.RpcError as e:
+            sys.exit(f"TraceMemory failed: {e.code().name} {e.details()}")
+
+    print(f"tracing: {response.tracing}  current: {response.current_bytes / 1024:.0f} KiB  "
+          f"peak: {response.peak_bytes / 1024:.0f} KiB")
+    for site in response.sites:
+        print(f"{site.size_diff_bytes / 1024:>+10.1f} KiB {site.count_diff:>+8} blocks  {site.location}")
+    for name, value in sorted(peaks.items()):
+        if name.endswith('.peak_kb'):
+            print(f"{name}: {value:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
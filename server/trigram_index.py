@@ -0,0 +1,215 @@
+import heapq
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# ----------------------------------------------------
+# Trigram index of titles and authors (typo-tolerant SearchBooks)
+# ----------------------------------------------------
+
+NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_text(text):
+    """'Albert Camus — L'Étranger' -> 'albert camus l etranger' (accents and punctuation removed)."""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_ALNUM.sub(' ', stripped).strip()
+
+
+def trigrams(word):
+    """Trigrams of a word padded as in PostgreSQL pg_trgm: 'camu' -> {'  c', ' ca', 'cam', 'amu', 'mu '}."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Share of trigrams in common between two sets of trigrams (0 to 1)."""
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+class TrigramIndex:
+    """
+    Fuzzy search over the words of book titles and authors.
+
+    Two levels of posting lists: trigram -> ids of the distinct words
+    containing it, and word -> ids of the books containing it (sorted arrays
+    of int64). A query word is compared only with the words sharing one of
+    its trigrams, those at `threshold` similarity or more are kept, and their
+    books are read from the posting lists: the books themselves are never
+    scanned. Every word of the query must match a word of the book; books are
+    ranked by the mean similarity of their best matching words.
+
+    The write handlers update the index before publishing the change (the
+    result cache of SearchBooks relies on the feed version). load() builds
+    new lists from the database without blocking searches, then replays the
+    writes made meanwhile.
+    """
+
+    def __init__(self):
+        self._word_ids = {}
+        self._word_sizes = array('B')
+        self._trigrams = {}
+        self._postings = []
+        self._book_words = {}
+        self.loaded = False
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._book_words)
+
+    def _word_id(self, word):
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = self._word_ids[word] = len(self._postings)
+            grams = trigrams(word)
+            self._word_sizes.append(min(len(grams), 255))
+            self._postings.append(array('q'))
+            for gram in grams:
+                self._trigrams.setdefault(gram, array('i')).append(word_id)
+        return word_id
+
+    def _add(self, book_id, title, author):
+        words = set(normalize_text(f"{title} {author}").split())
+        word_ids = tuple(self._word_id(word) for word in words)
+        for word_id in word_ids:
+            posting = self._postings[word_id]
+            if posting and posting[-1] < book_id:
+                posting.append(book_id)
+            else:
+                # Ids auto-incrémentés : presque toujours un ajout en fin de liste.
+                position = bisect_left(posting, book_id)
+                if position == len(posting) or posting[position] != book_id:
+                    posting.insert(position, book_id)
+        self._book_words[book_id] = word_ids
+
+    def _remove(self, book_id):
+        for word_id in self._book_words.pop(book_id, ()):
+            posting = self._postings[word_id]
+            position = bisect_left(posting, book_id)
+            if position < len(posting) and posting[position] == book_id:
+                del posting[position]
+
+    def load(self, rows=None):
+        """
+        Rebuilds the index from `rows` of (id, title, author) ordered by id,
+        by default every Book row, and swaps it in.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._pending = []
+        building = TrigramIndex()
+        try:
+            if rows is None:
+                from library_admin.models import Book
+                rows = Book.objects.order_by('id').values_list('id', 'title', 'author').iterator()
+            for book_id, title, author in rows:
+                building._add(book_id, title, author)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._word_ids, self._word_sizes, self._trigrams = (
+                building._word_ids, building._word_sizes, building._trigrams
+            )
+            self._postings, self._book_words = building._postings, building._book_words
+            for write in self._pending:
+                self._apply(*write)
+            self._pending = None
+            self.loaded = True
+
+    def _apply(self, book_id, title=None, author=None):
+        self._remove(book_id)
+        if title is not None:
+            self._add(book_id, title, author)
+
+    def _write(self, book_id, title=None, author=None):
+        with self._lock:
+            self._apply(book_id, title, author)
+            if self._pending is not None:
+                self._pending.append((book_id, title, author))
+
+    def set(self, book_id, title, author):
+        """Indexes a new book, or the new title / author of a book."""
+        self._write(book_id, title, author)
+
+    def remove(self, book_id):
+        self._write(book_id)
+
+    def _matching_words(self, word, threshold):
+        """[(word id, similarity)] of the indexed words similar to `word`, best first."""
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            word_ids = self._trigrams.get(gram)
+            if word_ids is not None:
+                shared.update(word_ids)
+        size = len(grams)
+        matches = []
+        for word_id, count in shared.items():
+            score = count / (size + self._word_sizes[word_id] - count)
+            if score >= threshold:
+                matches.append((word_id, score))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def search(self, query, threshold=0.3, limit=50):
+        """[(book id, similarity)] of the books matching every word of `query`, best first."""
+        words = normalize_text(query).split()
+        if not words:
+            return []
+        with self._lock:
+            per_word = []
+            for word in set(words):
+                matches = self._matching_words(word, threshold)
+                if not matches:
+                    return []
+                volume = sum(len(self._postings[word_id]) for word_id, _ in matches)
+                per_word.append((volume, matches))
+            per_word.sort(key=lambda item: item[0])
+
+            scores = None
+            for volume, matches in per_word:
+                if scores is None or volume < len(scores):
+                    best = {}
+                    for word_id, score in matches:
+                        for book_id in self._postings[word_id]:
+                            if book_id not in best:
+                                best[book_id] = score
+                    if scores is None:
+                        scores = best
+                    else:
+                        scores = {book_id: total + best[book_id] for book_id, total in scores.items() if book_id in best}
+                else:
+                    # Peu de candidats restants : recherche de chacun dans les listes.
+                    narrowed = {}
+                    for book_id, total in scores.items():
+                        for word_id, score in matches:
+                            posting = self._postings[word_id]
+                            position = bisect_left(posting, book_id)
+                            if position < len(posting) and posting[position] == book_id:
+                                narrowed[book_id] = total + score
+                                break
+                    scores = narrowed
+                if not scores:
+                    return []
+
+        count = len(per_word)
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(book_id, total / count) for book_id, total in ranked]
+
+    def memory(self):
+        """Approximate bytes used by the posting lists (dicts and tuples not included)."""
+        postings = sum(len(posting) for posting in self._postings) * 8
+        grams = sum(len(word_ids) for word_ids in self._trigrams.values()) * 4
+        return postings + grams + len(self._word_sizes)
+
+
+trigram_index = TrigramIndex()